@@ -0,0 +1,185 @@
+"""
+Асинхронные версии часто вызываемых эндпоинтов чтения
+
+Работают через AsyncSession (SQLAlchemy asyncio + aiosqlite): пока запрос
+ждет базу, поток цикла событий обслуживает другие запросы, а пул потоков
+не занимается. Ответы совпадают с синхронными версиями:
+- /async/products/...        -> /products/...
+- /async/catalog/...         -> /catalog/...
+- /async/calculations/...    -> /calculations/...
+
+Расчеты, построенные на синхронных сервисах (кэш справочников, время
+изготовления), выполняются через AsyncSession.run_sync - обращения к БД
+внутри них тоже идут через aiosqlite.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.database.session import get_async_db
+from app.crud.products import product_crud
+from app.crud.product_types import product_type_crud
+from app.crud.material_types import material_type_crud
+from app.crud.pagination import MAX_PAGE_LIMIT, decode_cursor, next_cursor
+from app.services.production_time import calculate_total_production_times
+from app.services.raw_material_calculation import calculate_raw_material_with_details
+from app.schemas.product import ProductResponse
+from app.schemas.product_type import ProductTypeResponse
+from app.schemas.material_type import MaterialTypeResponse
+from app.schemas.calculation import (
+    RawMaterialRequest,
+    RawMaterialResponse,
+    ProductionTimeBatchRequest,
+    ProductionTimeBatchResponse
+)
+from app.api.endpoints.products import product_response
+from app.api.endpoints.calculations import (
+    build_production_details,
+    production_time_batch_response,
+    raw_material_response
+)
+
+router = APIRouter(prefix="/async", tags=["Async"])
+
+# Продукция
+@router.get("/products/", response_model=List[ProductResponse])
+async def get_products_async(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить список продукции (асинхронная версия GET /products/)
+    """
+    rows = await product_crud.get_all_with_details_async(
+        db, skip, limit, after_id=decode_cursor(after)
+    )
+
+    cursor = next_cursor(rows, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+
+    return [product_response(row) for row in rows]
+
+@router.get("/products/{product_id}", response_model=ProductResponse)
+async def get_product_async(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить один продукт по ID (асинхронная версия GET /products/{product_id})
+    """
+    row = await product_crud.get_details_row_async(db, product_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return product_response(row)
+
+# Справочники
+@router.get("/catalog/product-types", response_model=List[ProductTypeResponse])
+async def get_product_types_async(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить список типов продукции (асинхронная версия)
+    """
+    items = await product_type_crud.get_all_async(db, skip, limit, after_id=decode_cursor(after))
+
+    cursor = next_cursor(items, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return items
+
+@router.get("/catalog/product-types/{type_id}", response_model=ProductTypeResponse)
+async def get_product_type_async(
+    type_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить тип продукции по ID (асинхронная версия)
+    """
+    product_type = await product_type_crud.get_by_id_async(db, type_id)
+    if not product_type:
+        raise HTTPException(status_code=404, detail="Тип продукции не найден")
+    return product_type
+
+@router.get("/catalog/material-types", response_model=List[MaterialTypeResponse])
+async def get_material_types_async(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить список типов материалов (асинхронная версия)
+    """
+    items = await material_type_crud.get_all_async(db, skip, limit, after_id=decode_cursor(after))
+
+    cursor = next_cursor(items, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return items
+
+@router.get("/catalog/material-types/{material_id}", response_model=MaterialTypeResponse)
+async def get_material_type_async(
+    material_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Получить тип материала по ID (асинхронная версия)
+    """
+    material = await material_type_crud.get_by_id_async(db, material_id)
+    if not material:
+        raise HTTPException(status_code=404, detail="Тип материала не найден")
+    return material
+
+# Расчеты
+@router.get("/calculations/production-details/{product_id}")
+async def get_production_details_async(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Детальный расчет времени изготовления продукта (асинхронная версия)
+    """
+    details = await db.run_sync(build_production_details, product_id)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return details
+
+@router.post("/calculations/production-time/batch", response_model=ProductionTimeBatchResponse)
+async def get_production_time_batch_async(
+    request: ProductionTimeBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Время изготовления сразу для многих продуктов (асинхронная версия)
+    """
+    totals = await db.run_sync(calculate_total_production_times, request.product_ids)
+    return production_time_batch_response(request.product_ids, totals)
+
+@router.post("/calculations/raw-material", response_model=RawMaterialResponse)
+async def calculate_raw_material_async(
+    request: RawMaterialRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Расчет количества сырья (асинхронная версия POST /calculations/raw-material)
+    """
+    result, details = await db.run_sync(
+        lambda session: calculate_raw_material_with_details(
+            db=session,
+            product_type_id=request.product_type_id,
+            material_type_id=request.material_type_id,
+            product_quantity=request.product_quantity,
+            param1=request.param1,
+            param2=request.param2
+        )
+    )
+    return raw_material_response(request, result, details)
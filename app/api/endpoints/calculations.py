@@ -1,22 +1,41 @@
 """
 Эндпоинты для расчетов
 """
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 
 from app.database.session import get_db
 from app.database.database import Product, ProductType, MaterialType, Workshop, product_workshop_table
-from app.services.production_time import calculate_total_production_time
+from app.services.production_time import (
+    calculate_total_production_time,
+    calculate_total_production_times
+)
 from app.services.raw_material_calculation import (
     calculate_raw_material,
-    calculate_raw_material_with_details
+    calculate_raw_material_with_details,
+    calculate_raw_material_batch,
+    ERROR_INVALID_ROW
 )
 from app.schemas.calculation import (
     RawMaterialRequest,
     RawMaterialResponse,
-    ProductionDetailsRequest
+    ProductionDetailsRequest,
+    ProductionTimeBatchRequest,
+    ProductionTimeBatchResponse,
+    ProductionTimeItem,
+    RawMaterialBatchRequest,
+    RawMaterialBatchResponse,
+    RawMaterialMatrixRequest,
+    RawMaterialMatrixResponse,
+    MatrixProductType,
+    MatrixMaterialType
 )
+from app.services.material_matrix import material_matrix
 
 router = APIRouter(prefix="/calculations", tags=["Calculations"])
 
@@ -28,6 +47,13 @@ def get_production_details(
     """
     Детальный расчет времени изготовления продукта
     """
+    details = build_production_details(db, product_id)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Продукт не найден")
+    return details
+
+def build_production_details(db: Session, product_id: int):
+    """Данные для /production-details/{product_id} или None, если продукта нет"""
     # 1. Получаем продукт с названиями
     product = db.query(Product)\
         .join(ProductType, Product.product_type_id == ProductType.id)\
@@ -36,7 +62,7 @@ def get_production_details(
         .first()
     
     if not product:
-        raise HTTPException(status_code=404, detail="Продукт не найден")
+        return None
     
     # 2. Получаем цеха и время
     workshop_times = db.execute(
@@ -87,6 +113,40 @@ def get_production_details(
         "calculation_notes": "Время изготовления складывается из времени нахождения в каждом цехе"
     }
 
+@router.post(
+    "/production-time/batch",
+    response_model=ProductionTimeBatchResponse,
+    summary="Время изготовления для списка продуктов"
+)
+def get_production_time_batch(
+    request: ProductionTimeBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Время изготовления сразу для многих продуктов
+    
+    Заменяет множество вызовов /production-details/{product_id}:
+    суммы по цехам считаются одним сгруппированным запросом,
+    округление такое же, как в деталях производства.
+    """
+    totals = calculate_total_production_times(db, request.product_ids)
+    return production_time_batch_response(request.product_ids, totals)
+
+def production_time_batch_response(product_ids, totals) -> ProductionTimeBatchResponse:
+    """Ответ пакетного расчета времени в порядке запрошенных ID"""
+    items = []
+    not_found = []
+    for product_id in product_ids:
+        if product_id in totals:
+            items.append(ProductionTimeItem(
+                product_id=product_id,
+                production_time=totals[product_id]
+            ))
+        else:
+            not_found.append(product_id)
+    
+    return ProductionTimeBatchResponse(items=items, not_found=not_found)
+
 @router.post(
     "/raw-material",
     response_model=RawMaterialResponse,
@@ -126,7 +186,10 @@ def calculate_raw_material_endpoint(
         param1=request.param1,
         param2=request.param2
     )
-    
+    return raw_material_response(request, result, details)
+
+def raw_material_response(request: RawMaterialRequest, result: int, details) -> RawMaterialResponse:
+    """Ответ расчета сырья; ошибка 400, если расчет не удался"""
     if result == -1 or details is None:
         raise HTTPException(
             status_code=400,
@@ -147,6 +210,162 @@ def calculate_raw_material_endpoint(
         calculation_details=details
     )
 
+# Строк в одном пакетном запросе
+MAX_BATCH_ROWS = 100000
+
+@router.post(
+    "/raw-material/batch",
+    response_model=RawMaterialBatchResponse,
+    summary="Пакетный расчет сырья",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": RawMaterialBatchRequest.model_json_schema()
+                },
+                "application/x-ndjson": {
+                    "schema": {"type": "string", "description": "По одному RawMaterialRequest в строке"}
+                }
+            },
+            "required": True
+        }
+    }
+)
+async def calculate_raw_material_batch_endpoint(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Расчет сырья для многих строк за один запрос
+    
+    Форматы тела:
+    - **application/json** - колоночный формат (RawMaterialBatchRequest)
+    - **application/x-ndjson** - по одному объекту RawMaterialRequest в строке
+    
+    Справочники загружаются один раз, формула считается векторно.
+    Результаты возвращаются в порядке входных строк; для ошибочных строк
+    вместо -1 возвращается код ошибки.
+    """
+    body = await request.body()
+    
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        columns, invalid_rows = _parse_ndjson_rows(body)
+    else:
+        try:
+            batch = RawMaterialBatchRequest.model_validate_json(body)
+        except ValidationError as e:
+            # Без include_input=False в ошибке остается тело запроса (bytes) - ответ не сериализуется
+            raise HTTPException(
+                status_code=422,
+                detail=e.errors(include_url=False, include_context=False, include_input=False)
+            )
+        columns, invalid_rows = batch.model_dump(), []
+    
+    if len(columns["product_type_id"]) > MAX_BATCH_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много строк: максимум {MAX_BATCH_ROWS} за запрос"
+        )
+    
+    # Расчет и запросы к БД - синхронные, выполняем вне цикла событий
+    results, errors = await run_in_threadpool(
+        calculate_raw_material_batch,
+        db=db,
+        product_type_ids=columns["product_type_id"],
+        material_type_ids=columns["material_type_id"],
+        product_quantities=columns["product_quantity"],
+        params1=columns["param1"],
+        params2=columns["param2"]
+    )
+    
+    for index in invalid_rows:
+        results[index] = None
+        errors[index] = ERROR_INVALID_ROW
+    
+    return RawMaterialBatchResponse(
+        raw_material_quantity=results,
+        errors=errors,
+        total_rows=len(results),
+        error_rows=sum(1 for error in errors if error is not None)
+    )
+
+@router.post(
+    "/raw-material/matrix",
+    response_model=RawMaterialMatrixResponse,
+    summary="Сырье для всех сочетаний тип продукции × материал"
+)
+def calculate_raw_material_matrix(
+    request: RawMaterialMatrixRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Расчет сырья для заданных количества и параметров сразу по всем
+    типам продукции (строки) и материалам (столбцы)
+    
+    Множители справочников хранятся готовой матрицей и пересчитываются
+    только после изменения типов продукции или материалов. Поле multipliers
+    ответа - справочная информация: количество сырья считается не по ней,
+    а в порядке операций compute_raw_material (иначе округление на границах
+    целых чисел расходилось бы с расчетом одной пары).
+    
+    Если количество сырья не помещается в целое 64 бит - ошибка 400.
+    """
+    matrix = material_matrix.get(db)
+    try:
+        quantities = matrix.requirements(request.product_quantity, request.param1, request.param2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return RawMaterialMatrixResponse(
+        product_types=[
+            MatrixProductType(id=pt.id, name=pt.name, coefficient=pt.coefficient)
+            for pt in matrix.product_types
+        ],
+        material_types=[
+            MatrixMaterialType(id=mt.id, name=mt.name, loss_percentage=mt.loss_percentage)
+            for mt in matrix.material_types
+        ],
+        multipliers=matrix.multipliers.tolist(),
+        raw_material_quantity=quantities.tolist()
+    )
+
+def _parse_ndjson_rows(body: bytes):
+    """
+    Разобрать NDJSON в колонки
+    
+    Нераспознанные строки заменяются нулями и возвращаются списком индексов,
+    чтобы пометить их кодом INVALID_ROW, не сдвигая порядок результатов.
+    Тело не в UTF-8 - ошибка 400 (границы строк в нем неизвестны).
+    """
+    columns = {name: [] for name in RawMaterialRequest.model_fields}
+    invalid_rows = []
+    
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Тело NDJSON должно быть в кодировке UTF-8")
+    
+    lines = [line for line in text.splitlines() if line.strip()]
+    for index, line in enumerate(lines):
+        try:
+            row = json.loads(line)
+            values = {
+                "product_type_id": int(row["product_type_id"]),
+                "material_type_id": int(row["material_type_id"]),
+                "product_quantity": int(row["product_quantity"]),
+                "param1": float(row["param1"]),
+                "param2": float(row["param2"]),
+            }
+        except (ValueError, TypeError, KeyError, OverflowError):
+            # OverflowError - int(inf) для чисел вроде 1e400
+            values = dict.fromkeys(columns, 0)
+            invalid_rows.append(index)
+        
+        for name, value in values.items():
+            columns[name].append(value)
+    
+    return columns, invalid_rows
+
 @router.get("/product/{product_id}/workshops-detailed")
 def get_product_workshops_detailed(
     product_id: int,
@@ -1,29 +1,60 @@
 """
 Эндпоинты для справочников (типы продукции, материалы)
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database.session import get_db
 from app.crud.product_types import product_type_crud
 from app.crud.material_types import material_type_crud
+from app.crud.pagination import MAX_PAGE_LIMIT, decode_cursor, next_cursor
+from app.database.database import ProductType, MaterialType
+from app.services.catalog_cache import catalog_cache
+from app.services.response_cache import response_cache
+from app.services.page_cache import page_cache
 from app.schemas.product_type import ProductTypeResponse
 from app.schemas.material_type import MaterialTypeResponse
 
 router = APIRouter(prefix="/catalog", tags=["Catalog"])
 
+# Валидация и сериализация списков (выполняются только при промахе кэша)
+_product_types_json = TypeAdapter(List[ProductTypeResponse])
+_material_types_json = TypeAdapter(List[MaterialTypeResponse])
+
+def _to_json(adapter: TypeAdapter, items) -> bytes:
+    """Объекты ORM -> JSON по схеме ответа"""
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
 # Типы продукции
 @router.get("/product-types", response_model=List[ProductTypeResponse])
 def get_product_types(
+    request: Request,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     Получить список типов продукции
+    
+    Пагинация: skip/limit или курсор **after** из заголовка X-Next-Cursor
+    
+    Ответ кэшируется до изменения таблицы; поддерживаются ETag /
+    If-None-Match и Last-Modified / If-Modified-Since (ответ 304)
     """
-    return product_type_crud.get_all(db, skip, limit)
+    after_id = decode_cursor(after)
+    
+    def build():
+        items = product_type_crud.get_all(db, skip, limit, after_id=after_id)
+        cursor = next_cursor(items, limit)
+        body = _to_json(_product_types_json, items)
+        return body, ({"X-Next-Cursor": cursor} if cursor else {})
+    
+    return response_cache.respond(
+        request, db, ProductType.__tablename__, ("product-types", skip, limit, after_id), build
+    )
 
 @router.get("/product-types/{type_id}", response_model=ProductTypeResponse)
 def get_product_type(
@@ -41,14 +72,31 @@ def get_product_type(
 # Типы материалов  
 @router.get("/material-types", response_model=List[MaterialTypeResponse])
 def get_material_types(
+    request: Request,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     Получить список типов материалов
+    
+    Пагинация: skip/limit или курсор **after** из заголовка X-Next-Cursor
+    
+    Ответ кэшируется до изменения таблицы; поддерживаются ETag /
+    If-None-Match и Last-Modified / If-Modified-Since (ответ 304)
     """
-    return material_type_crud.get_all(db, skip, limit)
+    after_id = decode_cursor(after)
+    
+    def build():
+        items = material_type_crud.get_all(db, skip, limit, after_id=after_id)
+        cursor = next_cursor(items, limit)
+        body = _to_json(_material_types_json, items)
+        return body, ({"X-Next-Cursor": cursor} if cursor else {})
+    
+    return response_cache.respond(
+        request, db, MaterialType.__tablename__, ("material-types", skip, limit, after_id), build
+    )
 
 @router.get("/material-types/{material_id}", response_model=MaterialTypeResponse)
 def get_material_type(
@@ -61,4 +109,19 @@ def get_material_type(
     material = material_type_crud.get_by_id(db, material_id)
     if not material:
         raise HTTPException(status_code=404, detail="Тип материала не найден")
-    return material
\ No newline at end of file
+    return material
+
+# Кэш справочников
+@router.get("/cache-stats")
+def get_catalog_cache_stats():
+    """
+    Статистика кэша справочников: попадания, промахи, версии таблиц
+    
+    responses - кэш готовых ответов списков справочников,
+    pages - кэш HTML страниц фронтенда (доля попаданий, время построения)
+    """
+    return {
+        **catalog_cache.stats(),
+        "responses": response_cache.stats(),
+        "pages": page_cache.stats()
+    }
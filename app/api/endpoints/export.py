@@ -0,0 +1,37 @@
+"""
+Эндпоинты выгрузки каталога продукции
+"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db
+from app.services.product_export import iter_csv, iter_ndjson
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+@router.get("/products.csv")
+def export_products_csv(db: Session = Depends(get_db)):
+    """
+    Выгрузить всю продукцию в CSV (UTF-8, разделитель - запятая)
+
+    Строки передаются потоком по мере чтения из БД
+    """
+    return StreamingResponse(
+        iter_csv(db.get_bind()),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="products.csv"'}
+    )
+
+@router.get("/products.ndjson")
+def export_products_ndjson(db: Session = Depends(get_db)):
+    """
+    Выгрузить всю продукцию в NDJSON (одна запись JSON на строку)
+
+    Строки передаются потоком по мере чтения из БД
+    """
+    return StreamingResponse(
+        iter_ndjson(db.get_bind()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="products.ndjson"'}
+    )
@@ -0,0 +1,21 @@
+"""
+Эндпоинт метрик в формате Prometheus
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import metrics_registry
+
+router = APIRouter(tags=["Metrics"])
+
+# Тип содержимого текстового формата Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Метрики по маршрутам: число запросов и время ответа, SQL запросы
+    (всего и максимум на запрос), время в БД, полученные строки;
+    попадания и промахи кэшей справочников, ответов и страниц
+    """
+    return PlainTextResponse(metrics_registry.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
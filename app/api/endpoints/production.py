@@ -8,7 +8,9 @@ from typing import List
 from app.database.session import get_db
 from app.database.database import Product, Workshop, product_workshop_table
 from app.schemas.product import ProductResponse
-from app.services.production_time import calculate_total_production_time
+from app.schemas.production import ProductionLinksBulkRequest, ProductionLinksBulkResponse
+from app.crud.production import production_link_crud
+from app.services.production_time import calculate_total_production_time, refresh_production_times
 
 router = APIRouter(prefix="/production", tags=["Production"])
 
@@ -57,6 +59,7 @@ def add_product_to_workshop(
             manufacturing_time_hours=manufacturing_time_hours
         )
         db.execute(stmt)
+        refresh_production_times(db, [product_id])
         db.commit()
         
         return {
@@ -69,6 +72,24 @@ def add_product_to_workshop(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Ошибка при создании связи: {str(e)}")
 
+@router.post("/links/bulk", response_model=ProductionLinksBulkResponse)
+def bulk_product_workshop_links(
+    request: ProductionLinksBulkRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Пакетное изменение связей продукт-цех
+    
+    Все изменения сохраняются одной транзакцией: сначала удаление,
+    затем добавление связей (для существующей пары обновляется время).
+    Время изготовления затронутых продуктов пересчитывается.
+    
+    - **upsert**: список (product_id, workshop_id, manufacturing_time_hours)
+    - **delete**: список (product_id, workshop_id)
+    - **all_or_nothing**: при любой ошибке ничего не сохраняется
+    """
+    return production_link_crud.bulk_apply(db, request)
+
 @router.delete("/product/{product_id}/workshop/{workshop_id}")
 def remove_product_from_workshop(
     product_id: int,
@@ -85,6 +106,7 @@ def remove_product_from_workshop(
             (product_workshop_table.c.workshop_id == workshop_id)
         )
         result = db.execute(stmt)
+        refresh_production_times(db, [product_id])
         db.commit()
         
         if result.rowcount == 0:
@@ -1,22 +1,27 @@
 """
 Эндпоинты для продукции
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database.session import get_db
 from app.crud.products import product_crud
-from app.services.production_time import calculate_total_production_time
-from app.schemas.product import ProductResponse, ProductCreate, ProductUpdate
+from app.crud.pagination import MAX_PAGE_LIMIT, decode_cursor, next_cursor
+from app.services.production_time import calculate_total_production_time, round_production_time
+from app.schemas.product import (
+    ProductResponse, ProductCreate, ProductUpdate, ProductBulkRequest, ProductBulkResponse
+)
 
 # Создаем роутер с префиксом /products
 router = APIRouter(prefix="/products", tags=["Products"])
 
 @router.get("/", response_model=List[ProductResponse])
 def get_products(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
@@ -27,39 +32,31 @@ def get_products(
     - Артикул
     - Минимальная стоимость для партнера
     - Основной материал
+    
+    Пагинация: skip/limit или курсор **after** из заголовка X-Next-Cursor
+    предыдущей страницы
     """
-    products_response = []
-    
-    # Получаем продукты из БД
-    db_products = product_crud.get_all(db, skip, limit)
-    
-    for db_product in db_products:
-        try:
-            # Получаем связанные данные
-            product_with_details = product_crud.get_with_details(db, db_product.id)
-            
-            if product_with_details:
-                # Рассчитываем время
-                production_time = calculate_total_production_time(db, db_product.id)
-                
-                # Создаем ответ по макету
-                product_response = ProductResponse(
-                    id=db_product.id,
-                    product_type=product_with_details.product_type.name,
-                    product_name=product_with_details.name,
-                    production_time=production_time,
-                    article=product_with_details.article,
-                    min_partner_price=product_with_details.min_partner_price,
-                    main_material=product_with_details.material.name
-                )
-                products_response.append(product_response)
-                
-        except Exception as e:
-            # Пропускаем продукты с ошибками
-            print(f"Ошибка обработки продукта {db_product.id}: {e}")
-            continue
-    
-    return products_response
+    # Одна выборка: продукт + тип + материал + суммарное время по цехам
+    rows = product_crud.get_all_with_details(db, skip, limit, after_id=decode_cursor(after))
+    
+    cursor = next_cursor(rows, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    
+    return [product_response(row) for row in rows]
+
+
+def product_response(row) -> ProductResponse:
+    """Ответ по строке ProductCRUD.details_statement()"""
+    return ProductResponse(
+        id=row.id,
+        product_type=row.product_type_name,
+        product_name=row.name,
+        production_time=round_production_time(row.total_hours),
+        article=row.article,
+        min_partner_price=row.min_partner_price,
+        main_material=row.material_name
+    )
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -127,6 +124,24 @@ def create_product(
     )
 
 
+@router.post("/bulk", response_model=ProductBulkResponse)
+def bulk_products(
+    request: ProductBulkRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Пакетное создание, изменение и удаление продукции
+    
+    Все изменения сохраняются одной транзакцией в порядке: удаление,
+    изменение, создание. Результат возвращается по каждому элементу
+    (operation + index - позиция в своем списке запроса).
+    
+    - **all_or_nothing**: при любой ошибке ничего не сохраняется,
+      корректные элементы получают статус skipped
+    """
+    return product_crud.bulk_apply(db, request)
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
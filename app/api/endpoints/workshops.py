@@ -1,13 +1,15 @@
 """
 Эндпоинты для цехов
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database.session import get_db
-from app.database.database import Product, ProductType
+from app.database.database import Workshop
 from app.crud.workshops import workshop_crud
+from app.crud.pagination import MAX_PAGE_LIMIT, decode_cursor, next_cursor
+from app.services.workshop_report import build_production_report, build_production_reports
 from app.schemas.workshop import (
     WorkshopResponse, WorkshopCreate, WorkshopUpdate, WorkshopProductResponse
 )
@@ -17,16 +19,43 @@ router = APIRouter(prefix="/workshops", tags=["Workshops"])
 
 @router.get("/", response_model=List[WorkshopResponse])
 def get_workshops(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     Получить список цехов
+    
+    Пагинация: skip/limit или курсор **after** из заголовка X-Next-Cursor
     """
-    workshops = workshop_crud.get_all(db, skip, limit)
+    workshops = workshop_crud.get_all(db, skip, limit, after_id=decode_cursor(after))
+    
+    cursor = next_cursor(workshops, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
     return workshops
 
+@router.get("/reports/production")
+def get_all_workshops_production_report(db: Session = Depends(get_db)):
+    """
+    Отчет о производстве по всем цехам (для ежедневной сводки)
+    
+    Без списков продуктов: только итоги и разбивки по типам и материалам
+    """
+    workshops = db.query(Workshop).order_by(Workshop.id).all()
+    reports = build_production_reports(db, workshops)
+    
+    return {
+        "workshops": list(reports.values()),
+        "total_workshops": len(reports),
+        "total_manufacturing_hours": round(
+            sum(r["production_data"]["total_manufacturing_hours"] for r in reports.values()),
+            2
+        )
+    }
+
 @router.get("/{workshop_id}", response_model=WorkshopResponse)
 def get_workshop(
     workshop_id: int,
@@ -93,43 +122,18 @@ def get_workshop_products(
 ):
     """
     Получить продукты для цеха
-    """
-    from app.database.database import Product, ProductType, MaterialType
-    from app.services.production_time import calculate_total_production_time
     
+    Продукты, названия типа и материала и время изготовления в цехе
+    загружаются одним запросом
+    """
     # 1. Получаем цех
     workshop = workshop_crud.get_by_id(db, workshop_id)
     if not workshop:
         raise HTTPException(status_code=404, detail="Цех не найден")
     
-    # 2. Обрабатываем каждый продукт
-    products_response = []
-    
-    for product in workshop.products:
-        try:
-            # Получаем связанные данные (тип и материал)
-            product_with_details = db.query(Product)\
-                .join(ProductType, Product.product_type_id == ProductType.id)\
-                .join(MaterialType, Product.material_id == MaterialType.id)\
-                .filter(Product.id == product.id)\
-                .first()
-            
-            if product_with_details:
-                # Создаем ответ по новой схеме
-                product_response = WorkshopProductResponse(
-                    id=product.id,
-                    name=product.name,
-                    article=product.article,
-                    min_partner_price=product.min_partner_price,
-                    product_type_name=product_with_details.product_type.name,
-                    material_name=product_with_details.material.name
-                )
-                products_response.append(product_response)
-                
-        except Exception as e:
-            # Пропускаем продукты с ошибками
-            print(f"Ошибка обработки продукта {product.id} в цехе {workshop_id}: {e}")
-            continue
+    # 2. Продукты цеха вместе со справочными данными
+    rows = workshop_crud.get_products_with_details(db, workshop_id)
+    products_response = [WorkshopProductResponse.model_validate(row) for row in rows]
     
     # 3. Возвращаем структурированный ответ
     return {
@@ -151,70 +155,28 @@ def get_workshop_production_report(
     - Название цеха
     - Количество человек для производства  
     - Время, затрачиваемое на изготовление продукции
-    """
-    from app.database.database import product_workshop_table
-    from sqlalchemy import select, func
     
+    Итоги и разбивки по типам продукции и материалам считаются в SQL
+    """
     # 1. Получаем цех
     workshop = workshop_crud.get_by_id(db, workshop_id)
     if not workshop:
         raise HTTPException(status_code=404, detail="Цех не найден")
     
-    # 2. Получаем продукты с временем изготовления
-    products_data = db.execute(
-        select(
-            product_workshop_table.c.product_id,
-            Product.name,
-            Product.article,
-            product_workshop_table.c.manufacturing_time_hours
-        )
-        .select_from(product_workshop_table)
-        .join(Product, Product.id == product_workshop_table.c.product_id)
-        .where(product_workshop_table.c.workshop_id == workshop_id)
-    ).fetchall()
-    
-    # 3. Рассчитываем статистику
-    products_list = []
-    total_hours = 0.0
+    # 2. Агрегаты одним запросом
+    report = build_production_report(db, workshop)
     
-    for prod_id, name, article, time in products_data:
-        time_float = float(time) if time else 0.0
-        products_list.append({
-            "product_id": prod_id,
-            "product_name": name,
-            "article": article,
-            "manufacturing_time_hours": time_float
-        })
-        total_hours += time_float
+    # 3. Список продуктов с типом и временем изготовления
+    report["production_data"]["products"] = [
+        {
+            "product_id": row.id,
+            "product_name": row.name,
+            "article": row.article,
+            "manufacturing_time_hours": float(row.manufacturing_time_hours or 0),
+            "product_type": row.product_type_name
+        }
+        for row in workshop_crud.get_products_with_details(db, workshop_id)
+    ]
     
-    # 4. Получаем тип продукции для каждого продукта
-    for product in products_list:
-        product_details = db.query(Product)\
-            .join(ProductType, Product.product_type_id == ProductType.id)\
-            .filter(Product.id == product["product_id"])\
-            .first()
-        if product_details:
-            product["product_type"] = product_details.product_type.name
-    
-    return {
-        "workshop": {
-            "id": workshop.id,
-            "name": workshop.name,
-            "type": workshop.workshop_type,
-            "employee_count": workshop.employee_count
-        },
-        "production_data": {
-            "products": products_list,
-            "total_products": len(products_list),
-            "total_manufacturing_hours": round(total_hours, 2),
-            "average_hours_per_product": round(
-                total_hours / len(products_list) if products_list else 0, 
-                2
-            ),
-            "employee_productivity": round(
-                total_hours / workshop.employee_count if workshop.employee_count > 0 else 0,
-                2
-            )
-        },
-        "report_generated": "Для интеграции в интерфейс системы"
-    }
\ No newline at end of file
+    report["report_generated"] = "Для интеграции в интерфейс системы"
+    return report
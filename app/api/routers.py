@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import products, workshops, catalog, calculations, production
+from app.api.endpoints import products, workshops, catalog, calculations, production, async_reads, export, metrics
 
 # Создаем главный роутер
 router = APIRouter()
@@ -8,4 +8,7 @@ router.include_router(products.router, tags=["Products"])
 router.include_router(workshops.router, tags=["Workshops"])
 router.include_router(production.router, tags=["Production"])
 router.include_router(calculations.router, tags=["Calculations"])
-router.include_router(catalog.router, tags=["Catalog"])
\ No newline at end of file
+router.include_router(catalog.router, tags=["Catalog"])
+router.include_router(async_reads.router, tags=["Async"])
+router.include_router(export.router, tags=["Export"])
+router.include_router(metrics.router, tags=["Metrics"])
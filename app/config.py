@@ -23,4 +23,47 @@ EXCEL_FILES = {
     'product_workshop': SOURCE_DATA_DIR / 'Product_workshops_import.xlsx',
 }
 
+# Размер пачки строк для потокового импорта (python -m app.scripts.import_data --stream)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
 
+# Максимум HTML страниц в кэше фронтенда (app.services.page_cache)
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", "512"))
+
+# Заголовок X-Debug-Metrics (число SQL запросов, время в БД) в каждом ответе -
+# для тестовых стендов; метрики всех маршрутов доступны в /api/metrics
+METRICS_DEBUG_HEADER = os.getenv("METRICS_DEBUG_HEADER", "0") == "1"
+
+# Обновление схемы furniture.db при старте приложения (app.database.migrations):
+# отсутствующие таблицы и индексы. 0 - только вручную (python -m app.database.migrations)
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
+
+# Профиль движка SQLite: development (по умолчанию) или production.
+# Выбирается переменной окружения DB_PROFILE
+DB_PROFILE = os.getenv("DB_PROFILE", "development")
+
+# Настройки профилей: echo - логирование SQL, pragmas - PRAGMA при каждом подключении
+SQLITE_PROFILES = {
+    # Разработка: все SQL запросы в консоли, стандартный журнал SQLite
+    'development': {
+        'echo': True,
+        'pragmas': {
+            'foreign_keys': 'ON',
+            'busy_timeout': 5000,
+        },
+    },
+    # Работа под нагрузкой (несколько воркеров uvicorn):
+    # WAL - читатели не блокируют писателя, synchronous=NORMAL безопасен в WAL,
+    # mmap и кэш страниц ускоряют чтение, busy_timeout вместо "database is locked"
+    'production': {
+        'echo': False,
+        'pragmas': {
+            'foreign_keys': 'ON',
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'cache_size': -64000,       # в КиБ (отрицательное значение) - около 64 МБ
+            'mmap_size': 268435456,     # 256 МБ
+            'temp_store': 'MEMORY',
+        },
+    },
+}
@@ -1,21 +1,48 @@
 """
 CRUD для типов материалов
 """
+from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import MaterialType
 
 class MaterialTypeCRUD:
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100):
-        """Получить все типы материалов"""
-        return db.query(MaterialType).offset(skip).limit(limit).all()
+    def get_all(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+        """
+        Получить все типы материалов
+        
+        Если передан after_id - курсорный режим (записи с id > after_id),
+        иначе постраничный режим через skip/limit
+        """
+        query = db.query(MaterialType).order_by(MaterialType.id)
+        if after_id is not None:
+            return query.filter(MaterialType.id > after_id).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
+    
+    @staticmethod
+    async def get_all_async(db: AsyncSession, skip: int = 0, limit: int = 100,
+                            after_id: Optional[int] = None):
+        """Асинхронная версия get_all"""
+        stmt = select(MaterialType).order_by(MaterialType.id).limit(limit)
+        if after_id is not None:
+            stmt = stmt.where(MaterialType.id > after_id)
+        else:
+            stmt = stmt.offset(skip)
+        return (await db.execute(stmt)).scalars().all()
     
     @staticmethod
     def get_by_id(db: Session, material_id: int):
         """Получить тип материала по ID"""
         return db.query(MaterialType).filter(MaterialType.id == material_id).first()
     
+    @staticmethod
+    async def get_by_id_async(db: AsyncSession, material_id: int):
+        """Асинхронная версия get_by_id"""
+        return await db.get(MaterialType, material_id)
+    
     @staticmethod
     def get_material_products(db: Session, material_id: int):
         """Получить продукты из этого материала"""
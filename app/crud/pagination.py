@@ -0,0 +1,51 @@
+"""
+Курсорная (keyset) пагинация
+
+Курсор - непрозрачная строка, в которой закодирован ID последней
+записи страницы. Следующая страница выбирается условием id > курсора
+по индексу первичного ключа, без пропуска строк через OFFSET.
+"""
+import base64
+import binascii
+from typing import Optional
+
+from fastapi import HTTPException
+
+CURSOR_PREFIX = "id:"
+
+# Наибольший размер страницы (параметр limit списков)
+MAX_PAGE_LIMIT = 1000
+
+# Наибольший ID записи (INTEGER SQLite - 64 бит): больший ID не передать в запрос
+MAX_CURSOR_ID = 2 ** 63 - 1
+
+
+def encode_cursor(last_id: int) -> str:
+    """Закодировать ID последней записи страницы в курсор"""
+    raw = f"{CURSOR_PREFIX}{last_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Получить ID из курсора (None, если курсор не передан)"""
+    if not cursor:
+        return None
+    
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+        if not raw.startswith(CURSOR_PREFIX):
+            raise ValueError(raw)
+        last_id = int(raw[len(CURSOR_PREFIX):])
+        if not 0 <= last_id <= MAX_CURSOR_ID:
+            raise ValueError(raw)
+        return last_id
+    except (ValueError, binascii.Error, UnicodeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор пагинации")
+
+
+def next_cursor(items, limit: int, id_attr: str = "id") -> Optional[str]:
+    """Курсор следующей страницы или None, если страница неполная"""
+    if limit <= 0 or len(items) < limit:
+        return None
+    return encode_cursor(getattr(items[-1], id_attr))
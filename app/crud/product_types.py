@@ -1,21 +1,48 @@
 """
 CRUD для типов продукции
 """
+from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import ProductType
 
 class ProductTypeCRUD:
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100):
-        """Получить все типы продукции"""
-        return db.query(ProductType).offset(skip).limit(limit).all()
+    def get_all(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+        """
+        Получить все типы продукции
+        
+        Если передан after_id - курсорный режим (записи с id > after_id),
+        иначе постраничный режим через skip/limit
+        """
+        query = db.query(ProductType).order_by(ProductType.id)
+        if after_id is not None:
+            return query.filter(ProductType.id > after_id).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
+    
+    @staticmethod
+    async def get_all_async(db: AsyncSession, skip: int = 0, limit: int = 100,
+                            after_id: Optional[int] = None):
+        """Асинхронная версия get_all"""
+        stmt = select(ProductType).order_by(ProductType.id).limit(limit)
+        if after_id is not None:
+            stmt = stmt.where(ProductType.id > after_id)
+        else:
+            stmt = stmt.offset(skip)
+        return (await db.execute(stmt)).scalars().all()
     
     @staticmethod
     def get_by_id(db: Session, type_id: int):
         """Получить тип по ID"""
         return db.query(ProductType).filter(ProductType.id == type_id).first()
     
+    @staticmethod
+    async def get_by_id_async(db: AsyncSession, type_id: int):
+        """Асинхронная версия get_by_id"""
+        return await db.get(ProductType, type_id)
+    
     @staticmethod
     def get_type_products(db: Session, type_id: int):
         """Получить продукты этого типа"""
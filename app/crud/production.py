@@ -0,0 +1,174 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_, bindparam, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from fastapi import HTTPException
+from app.database.database import Product, Workshop, product_workshop_table
+from app.services.production_time import refresh_production_times
+from app.schemas.production import (
+    ProductionLinksBulkRequest, ProductionLinksBulkResponse, ProductionLinkResult
+)
+
+# Размер пачки в запросах с IN (...)
+LINK_CHUNK_SIZE = 400
+# Максимум элементов (upsert + delete) в одном пакетном запросе
+MAX_BULK_LINKS = 50000
+
+class ProductionLinkCRUD:
+    """Пакетные операции со связями продукт-цех"""
+    
+    @staticmethod
+    def bulk_apply(db: Session, request: ProductionLinksBulkRequest) -> ProductionLinksBulkResponse:
+        """
+        Добавить, изменить и удалить связи продукт-цех одной транзакцией
+        
+        Продукты, цеха и существующие связи проверяются по множествам,
+        загруженным запросами по пачкам. Связи записываются executemany:
+        удаление по паре, вставка с ON CONFLICT по уникальному индексу
+        (product_id, workshop_id). Сохраненное время изготовления
+        пересчитывается для всех затронутых продуктов.
+        """
+        if len(request.upsert) + len(request.delete) > MAX_BULK_LINKS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"В одном запросе не более {MAX_BULK_LINKS} элементов"
+            )
+        
+        table = product_workshop_table
+        
+        # 1. Предзагрузка: существующие продукты, цеха и связи
+        product_ids = {item.product_id for item in request.upsert}
+        workshop_ids = {item.workshop_id for item in request.upsert}
+        
+        existing_products = set()
+        for chunk in _chunks(sorted(product_ids)):
+            existing_products.update(db.scalars(select(Product.id).where(Product.id.in_(chunk))))
+        
+        existing_workshops = set()
+        for chunk in _chunks(sorted(workshop_ids)):
+            existing_workshops.update(db.scalars(select(Workshop.id).where(Workshop.id.in_(chunk))))
+        
+        pairs = {(item.product_id, item.workshop_id) for item in request.upsert + request.delete}
+        existing_links = set()
+        for chunk in _chunks(sorted(pairs)):
+            existing_links.update(
+                tuple(row) for row in db.execute(
+                    select(table.c.product_id, table.c.workshop_id)
+                    .where(tuple_(table.c.product_id, table.c.workshop_id).in_(chunk))
+                )
+            )
+        
+        results = []
+        
+        def result(operation, index, item, status, error=None):
+            results.append(ProductionLinkResult(
+                operation=operation, index=index,
+                product_id=item.product_id, workshop_id=item.workshop_id,
+                status=status, error=error
+            ))
+        
+        # 2. Удаление
+        deletes = []
+        deleted_pairs = set()
+        for index, item in enumerate(request.delete):
+            pair = (item.product_id, item.workshop_id)
+            if pair not in existing_links or pair in deleted_pairs:
+                result("delete", index, item, "error", "Связь продукт-цех не найдена")
+            else:
+                deleted_pairs.add(pair)
+                deletes.append((index, item))
+        
+        # 3. Добавление или изменение времени
+        upserts = []
+        upserted_pairs = set()
+        for index, item in enumerate(request.upsert):
+            pair = (item.product_id, item.workshop_id)
+            if item.product_id not in existing_products:
+                result("upsert", index, item, "error", "Продукт не найден")
+            elif item.workshop_id not in existing_workshops:
+                result("upsert", index, item, "error", "Цех не найден")
+            elif pair in upserted_pairs:
+                result("upsert", index, item, "error", "Связь уже указана в этом запросе")
+            else:
+                upserted_pairs.add(pair)
+                # Удаленная в этом же запросе связь создается заново
+                is_new = pair not in existing_links or pair in deleted_pairs
+                upserts.append((index, item, "created" if is_new else "updated"))
+        
+        errors = len(results)
+        if errors and request.all_or_nothing:
+            results += [
+                ProductionLinkResult(operation="delete", index=index, product_id=item.product_id,
+                                     workshop_id=item.workshop_id, status="skipped")
+                for index, item in deletes
+            ]
+            results += [
+                ProductionLinkResult(operation="upsert", index=index, product_id=item.product_id,
+                                     workshop_id=item.workshop_id, status="skipped")
+                for index, item, _ in upserts
+            ]
+            return ProductionLinksBulkResponse(
+                applied=False, created=0, updated=0, deleted=0, errors=errors,
+                refreshed_products=0, results=_sorted_results(results)
+            )
+        
+        # 4. Запись одной транзакцией
+        touched_products = {item.product_id for _, item in deletes}
+        touched_products.update(item.product_id for _, item, _ in upserts)
+        try:
+            if deletes:
+                db.execute(
+                    table.delete().where(and_(
+                        table.c.product_id == bindparam("p_id"),
+                        table.c.workshop_id == bindparam("w_id")
+                    )),
+                    [{"p_id": item.product_id, "w_id": item.workshop_id} for _, item in deletes]
+                )
+            
+            if upserts:
+                stmt = sqlite_insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.product_id, table.c.workshop_id],
+                    set_={"manufacturing_time_hours": stmt.excluded.manufacturing_time_hours}
+                )
+                db.execute(stmt, [
+                    {
+                        "product_id": item.product_id,
+                        "workshop_id": item.workshop_id,
+                        "manufacturing_time_hours": item.manufacturing_time_hours
+                    }
+                    for _, item, _ in upserts
+                ])
+            
+            if touched_products:
+                refresh_production_times(db, touched_products)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Ошибка при изменении связей: {str(e)}")
+        
+        for index, item in deletes:
+            result("delete", index, item, "deleted")
+        for index, item, status in upserts:
+            result("upsert", index, item, status)
+        
+        return ProductionLinksBulkResponse(
+            applied=True,
+            created=sum(1 for *_, status in upserts if status == "created"),
+            updated=sum(1 for *_, status in upserts if status == "updated"),
+            deleted=len(deletes),
+            errors=errors,
+            refreshed_products=len(touched_products),
+            results=_sorted_results(results)
+        )
+
+def _chunks(items: list):
+    """Пачки по LINK_CHUNK_SIZE для IN (...)"""
+    for start in range(0, len(items), LINK_CHUNK_SIZE):
+        yield items[start:start + LINK_CHUNK_SIZE]
+
+def _sorted_results(results):
+    """Результаты в порядке применения: удаление, затем добавление"""
+    return sorted(results, key=lambda r: (r.operation != "delete", r.index))
+
+# Создаем экземпляр для использования
+production_link_crud = ProductionLinkCRUD()
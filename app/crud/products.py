@@ -1,16 +1,105 @@
+from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, insert, update, delete
 from fastapi import HTTPException
-from app.database.database import Product, ProductType, MaterialType
-from app.schemas.product import ProductCreate, ProductUpdate
+from app.database.database import (
+    Product, ProductType, MaterialType, product_production_time_table, product_workshop_table
+)
+from app.services.production_time import production_time_column
+from app.services.catalog_cache import catalog_cache
+from app.schemas.product import (
+    ProductCreate, ProductUpdate,
+    ProductBulkRequest, ProductBulkResponse, ProductBulkItemResult
+)
+
+# Размер пачки ID в запросах с IN (...) пакетных операций
+BULK_ID_CHUNK_SIZE = 500
+# Максимум элементов (create + update + delete) в одном пакетном запросе
+MAX_BULK_ITEMS = 50000
 
 class ProductCRUD:
     """CRUD операции для продукции"""
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100):
-        """Получить все продукты"""
-        return db.query(Product).offset(skip).limit(limit).all()
+    def get_all(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+        """
+        Получить все продукты
+        
+        Если передан after_id - курсорный режим (записи с id > after_id),
+        иначе постраничный режим через skip/limit
+        """
+        query = db.query(Product).order_by(Product.id)
+        if after_id is not None:
+            return query.filter(Product.id > after_id).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def details_statement():
+        """
+        Выборка продуктов для списка и карточки
+        
+        Каждая строка содержит поля продукта, названия типа и материала
+        и сумму manufacturing_time_hours по всем цехам (total_hours),
+        взятую из сохраненных итогов product_production_time
+        """
+        return select(
+            Product.id,
+            Product.article,
+            Product.name,
+            Product.min_partner_price,
+            ProductType.name.label("product_type_name"),
+            MaterialType.name.label("material_name"),
+            production_time_column().label("total_hours")
+        )\
+            .join(ProductType, Product.product_type_id == ProductType.id)\
+            .join(MaterialType, Product.material_id == MaterialType.id)\
+            .outerjoin(
+                product_production_time_table,
+                product_production_time_table.c.product_id == Product.id
+            )
+    
+    @staticmethod
+    def page_statement(skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+        """
+        Страница списка продуктов
+        
+        Если передан after_id - курсорный режим вместо skip
+        """
+        stmt = ProductCRUD.details_statement().order_by(Product.id).limit(limit)
+        if after_id is not None:
+            return stmt.where(Product.id > after_id)
+        return stmt.offset(skip)
+    
+    @staticmethod
+    def get_all_with_details(db: Session, skip: int = 0, limit: int = 100,
+                             after_id: Optional[int] = None):
+        """
+        Получить страницу продуктов для списка одним запросом
+        
+        Количество запросов не зависит от limit (см. details_statement)
+        """
+        return db.execute(ProductCRUD.page_statement(skip, limit, after_id)).all()
+    
+    @staticmethod
+    async def get_all_with_details_async(db: AsyncSession, skip: int = 0, limit: int = 100,
+                                         after_id: Optional[int] = None):
+        """Асинхронная версия get_all_with_details"""
+        result = await db.execute(ProductCRUD.page_statement(skip, limit, after_id))
+        return result.all()
+    
+    @staticmethod
+    def get_details_row(db: Session, product_id: int):
+        """Продукт с названиями типа и материала и total_hours или None"""
+        stmt = ProductCRUD.details_statement().where(Product.id == product_id)
+        return db.execute(stmt).first()
+    
+    @staticmethod
+    async def get_details_row_async(db: AsyncSession, product_id: int):
+        """Асинхронная версия get_details_row"""
+        stmt = ProductCRUD.details_statement().where(Product.id == product_id)
+        return (await db.execute(stmt)).first()
     
     @staticmethod
     def get_with_details(db: Session, product_id: int):
@@ -29,13 +118,14 @@ class ProductCRUD:
     @staticmethod
     def create(db: Session, product_data: ProductCreate):
         """Создать новый продукт"""
-        # Проверяем существование связанных записей
-        product_type = db.query(ProductType).filter(ProductType.id == product_data.product_type_id).first()
-        if not product_type:
+        # Проверяем существование связанных записей (справочники из кэша,
+        # промах кэша перепроверяется по БД)
+        type_id = product_data.product_type_id
+        if not catalog_cache.get_product_type(db, type_id) and not _found_in_db(db, ProductType, [type_id]):
             raise HTTPException(status_code=400, detail="Тип продукции не найден")
         
-        material = db.query(MaterialType).filter(MaterialType.id == product_data.material_id).first()
-        if not material:
+        material_id = product_data.material_id
+        if not catalog_cache.get_material_type(db, material_id) and not _found_in_db(db, MaterialType, [material_id]):
             raise HTTPException(status_code=400, detail="Материал не найден")
         
         # Проверяем уникальность артикула (опционально, по ТЗ не обязательно)
@@ -44,7 +134,7 @@ class ProductCRUD:
             raise HTTPException(status_code=400, detail="Продукт с таким артикулом уже существует")
         
         try:
-            product = Product(**product_data.dict())
+            product = Product(**product_data.model_dump())
             db.add(product)
             db.commit()
             db.refresh(product)
@@ -64,16 +154,16 @@ class ProductCRUD:
             return None
         
         # Проверяем существование связанных записей, если они обновляются
-        update_data = product_data.dict(exclude_unset=True)
+        update_data = product_data.model_dump(exclude_unset=True)
         
         if 'product_type_id' in update_data:
-            product_type = db.query(ProductType).filter(ProductType.id == update_data['product_type_id']).first()
-            if not product_type:
+            type_id = update_data['product_type_id']
+            if not catalog_cache.get_product_type(db, type_id) and not _found_in_db(db, ProductType, [type_id]):
                 raise HTTPException(status_code=400, detail="Тип продукции не найден")
         
         if 'material_id' in update_data:
-            material = db.query(MaterialType).filter(MaterialType.id == update_data['material_id']).first()
-            if not material:
+            material_id = update_data['material_id']
+            if not catalog_cache.get_material_type(db, material_id) and not _found_in_db(db, MaterialType, [material_id]):
                 raise HTTPException(status_code=400, detail="Материал не найден")
         
         # Проверяем уникальность артикула, если он обновляется
@@ -109,5 +199,211 @@ class ProductCRUD:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Ошибка при удалении продукта: {str(e)}")
 
+    @staticmethod
+    def bulk_apply(db: Session, request: ProductBulkRequest) -> ProductBulkResponse:
+        """
+        Применить пакет изменений продукции в одной транзакции
+        
+        Ссылки проверяются по заранее загруженным множествам (справочники
+        из кэша с перепроверкой промахов по БД, существующие ID и артикулы -
+        запросами по пачкам),
+        изменения записываются executemany. Ошибочные элементы пропускаются
+        и попадают в результаты; при all_or_nothing ошибка отменяет весь пакет.
+        """
+        if len(request.create) + len(request.update) + len(request.delete) > MAX_BULK_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"В одном запросе не более {MAX_BULK_ITEMS} элементов"
+            )
+        
+        referenced_ids = list({*request.delete, *(item.id for item in request.update)})
+        
+        # 1. Предзагрузка: справочники, существующие продукты и артикулы
+        catalog_cache.ensure_loaded(db)
+        type_ids = {pt.id for pt in catalog_cache.product_types(db)}
+        material_ids = {mt.id for mt in catalog_cache.material_types(db)}
+        items = [*request.create, *request.update]
+        type_ids |= _found_in_db(db, ProductType, {
+            item.product_type_id for item in items if item.product_type_id is not None
+        } - type_ids)
+        material_ids |= _found_in_db(db, MaterialType, {
+            item.material_id for item in items if item.material_id is not None
+        } - material_ids)
+        
+        existing = {}   # id -> article
+        for chunk in _chunks(referenced_ids):
+            existing.update(db.execute(
+                select(Product.id, Product.article).where(Product.id.in_(chunk))
+            ).all())
+        
+        articles = [item.article for item in request.create]
+        articles += [item.article for item in request.update if item.article]
+        taken_articles = {}     # article -> id
+        for chunk in _chunks(list(set(articles))):
+            taken_articles.update(db.execute(
+                select(Product.article, Product.id).where(Product.article.in_(chunk))
+            ).all())
+        
+        results = []
+        
+        def fail(operation, index, product_id, message):
+            results.append(ProductBulkItemResult(
+                operation=operation, index=index, id=product_id, status="error", error=message
+            ))
+        
+        # 2. Удаление
+        deletes = []
+        deleted_set = set()
+        for index, product_id in enumerate(request.delete):
+            if product_id not in existing:
+                fail("delete", index, product_id, "Продукт не найден")
+            elif product_id in deleted_set:
+                fail("delete", index, product_id, "Продукт уже удаляется в этом запросе")
+            else:
+                deleted_set.add(product_id)
+                deletes.append((index, product_id))
+                # Артикул удаляемого продукта освобождается
+                taken_articles.pop(existing[product_id], None)
+        
+        # 3. Изменение
+        updates = []
+        updated_set = set()
+        for index, item in enumerate(request.update):
+            values = {
+                field: value
+                for field, value in item.model_dump(exclude_unset=True, exclude={"id"}).items()
+                if value is not None
+            }
+            error = None
+            if item.id not in existing or item.id in deleted_set:
+                error = "Продукт не найден"
+            elif item.id in updated_set:
+                error = "Продукт уже изменяется в этом запросе"
+            elif "product_type_id" in values and values["product_type_id"] not in type_ids:
+                error = "Тип продукции не найден"
+            elif "material_id" in values and values["material_id"] not in material_ids:
+                error = "Материал не найден"
+            elif "article" in values and taken_articles.get(values["article"], item.id) != item.id:
+                error = "Продукт с таким артикулом уже существует"
+            
+            if error:
+                fail("update", index, item.id, error)
+                continue
+            
+            if "article" in values:
+                taken_articles.pop(existing[item.id], None)
+                taken_articles[values["article"]] = item.id
+            updated_set.add(item.id)
+            updates.append((index, item.id, values))
+        
+        # 4. Создание
+        creates = []
+        for index, item in enumerate(request.create):
+            if item.product_type_id not in type_ids:
+                fail("create", index, None, "Тип продукции не найден")
+            elif item.material_id not in material_ids:
+                fail("create", index, None, "Материал не найден")
+            elif item.article in taken_articles:
+                fail("create", index, None, "Продукт с таким артикулом уже существует")
+            else:
+                # Место под артикул, ID появится после вставки
+                taken_articles[item.article] = None
+                creates.append((index, None, item.model_dump()))
+        
+        errors = len(results)
+        if errors and request.all_or_nothing:
+            for operation, items in (("delete", deletes), ("update", updates), ("create", creates)):
+                results += [
+                    ProductBulkItemResult(
+                        operation=operation, index=entry[0], id=entry[1], status="skipped"
+                    )
+                    for entry in items
+                ]
+            return ProductBulkResponse(
+                applied=False, created=0, updated=0, deleted=0, errors=errors,
+                results=_sorted_results(results)
+            )
+        
+        # 5. Запись одной транзакцией
+        try:
+            for chunk in _chunks([product_id for _, product_id in deletes]):
+                db.execute(delete(product_workshop_table)
+                           .where(product_workshop_table.c.product_id.in_(chunk)))
+                db.execute(delete(product_production_time_table)
+                           .where(product_production_time_table.c.product_id.in_(chunk)))
+                db.execute(delete(Product).where(Product.id.in_(chunk)))
+            
+            # executemany по группам с одинаковым набором полей
+            groups = {}
+            for _, product_id, values in updates:
+                groups.setdefault(tuple(sorted(values)), []).append({"id": product_id, **values})
+            for rows in groups.values():
+                db.execute(update(Product), rows)
+            
+            created_ids = {}   # article -> id
+            if creates:
+                db.execute(insert(Product), [values for _, _, values in creates])
+                # ID новых записей - по уникальному артикулу (RETURNING с
+                # сохранением порядка SQLite выполняет построчно)
+                for chunk in _chunks([values["article"] for _, _, values in creates]):
+                    created_ids.update(db.execute(
+                        select(Product.article, Product.id).where(Product.article.in_(chunk))
+                    ).all())
+            
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Ошибка при пакетном изменении продукции: {str(e)}")
+        
+        results += [
+            ProductBulkItemResult(operation="delete", index=index, id=product_id, status="deleted")
+            for index, product_id in deletes
+        ]
+        results += [
+            ProductBulkItemResult(operation="update", index=index, id=product_id, status="updated")
+            for index, product_id, _ in updates
+        ]
+        results += [
+            ProductBulkItemResult(
+                operation="create", index=index, id=created_ids[values["article"]], status="created"
+            )
+            for index, _, values in creates
+        ]
+        
+        return ProductBulkResponse(
+            applied=True,
+            created=len(creates),
+            updated=len(updates),
+            deleted=len(deletes),
+            errors=errors,
+            results=_sorted_results(results)
+        )
+
+def _chunks(ids: list):
+    """Пачки по BULK_ID_CHUNK_SIZE для IN (...)"""
+    for start in range(0, len(ids), BULK_ID_CHUNK_SIZE):
+        yield ids[start:start + BULK_ID_CHUNK_SIZE]
+
+def _found_in_db(db: Session, model, ids) -> set:
+    """
+    ID справочника, которых нет в кэше, но которые есть в БД
+    
+    Снимок кэша может отставать от записи другого процесса до
+    CACHE_TTL_SECONDS, поэтому промах кэша проверяется запросом;
+    найденная запись означает устаревший снимок - он сбрасывается.
+    """
+    found = set()
+    for chunk in _chunks(list(ids)):
+        found.update(db.scalars(select(model.id).where(model.id.in_(chunk))))
+    if found:
+        catalog_cache.invalidate()
+    return found
+
+_OPERATION_ORDER = {"delete": 0, "update": 1, "create": 2}
+
+def _sorted_results(results):
+    """Результаты в порядке применения: удаление, изменение, создание"""
+    return sorted(results, key=lambda r: (_OPERATION_ORDER[r.operation], r.index))
+
 # Создаем экземпляр для использования
 product_crud = ProductCRUD()
\ No newline at end of file
@@ -1,22 +1,58 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from app.database.database import Workshop
+from app.database.database import (
+    Workshop, Product, ProductType, MaterialType, product_workshop_table
+)
 from app.schemas.workshop import WorkshopCreate, WorkshopUpdate
 
 class WorkshopCRUD:
     """CRUD операции для цехов"""
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100):
-        """Получить все цехи"""
-        return db.query(Workshop).offset(skip).limit(limit).all()
+    def get_all(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+        """
+        Получить все цехи
+        
+        Если передан after_id - курсорный режим (записи с id > after_id),
+        иначе постраничный режим через skip/limit
+        """
+        query = db.query(Workshop).order_by(Workshop.id)
+        if after_id is not None:
+            return query.filter(Workshop.id > after_id).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
     
     @staticmethod
     def get_by_id(db: Session, workshop_id: int):
         """Получить цех по ID"""
         return db.query(Workshop).filter(Workshop.id == workshop_id).first()
     
+    @staticmethod
+    def get_products_with_details(db: Session, workshop_id: int):
+        """
+        Продукты цеха с названиями типа и материала и временем изготовления
+        
+        Один запрос: связи цеха JOIN продукты JOIN справочники
+        """
+        links = product_workshop_table
+        return db.query(
+            Product.id,
+            Product.name,
+            Product.article,
+            Product.min_partner_price,
+            ProductType.name.label("product_type_name"),
+            MaterialType.name.label("material_name"),
+            links.c.manufacturing_time_hours
+        )\
+            .select_from(links)\
+            .join(Product, Product.id == links.c.product_id)\
+            .join(ProductType, Product.product_type_id == ProductType.id)\
+            .join(MaterialType, Product.material_id == MaterialType.id)\
+            .filter(links.c.workshop_id == workshop_id)\
+            .order_by(Product.id)\
+            .all()
+    
     @staticmethod
     def create(db: Session, workshop_data: WorkshopCreate):
         """Создать новый цех"""
@@ -26,7 +62,7 @@ class WorkshopCRUD:
             raise HTTPException(status_code=400, detail="Цех с таким названием уже существует")
         
         try:
-            workshop = Workshop(**workshop_data.dict())
+            workshop = Workshop(**workshop_data.model_dump())
             db.add(workshop)
             db.commit()
             db.refresh(workshop)
@@ -45,7 +81,7 @@ class WorkshopCRUD:
         if not workshop:
             return None
         
-        update_data = workshop_data.dict(exclude_unset=True)
+        update_data = workshop_data.model_dump(exclude_unset=True)
         
         # Проверяем уникальность названия, если оно обновляется
         if 'name' in update_data and update_data['name'] != workshop.name:
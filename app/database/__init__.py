@@ -3,22 +3,32 @@ from .database import (
     Base,
     engine,
     get_session,
+    get_async_engine,
+    get_async_session,
     create_all_tables,
     MaterialType,
     ProductType,
     Workshop,
     Product,
-    product_workshop_table
+    product_workshop_table,
+    product_production_time_table,
+    import_row_hashes_table
 )
+# Регистрирует события сессий для учета версий таблиц
+from . import table_versions
 
 __all__ = [
     'Base',
     'engine',
     'get_session',
+    'get_async_engine',
+    'get_async_session',
     'create_all_tables',
     'MaterialType',
     'ProductType',
     'Workshop', 
     'Product',
-    'product_workshop_table'
+    'product_workshop_table',
+    'product_production_time_table',
+    'import_row_hashes_table'
 ]
\ No newline at end of file
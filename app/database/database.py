@@ -1,7 +1,7 @@
 
 from sqlalchemy import (
     create_engine, String, Float, Integer, 
-    ForeignKey, Table, Column, event
+    ForeignKey, Table, Column, Index, event
 )
 from sqlalchemy.orm import (
     DeclarativeBase, Mapped, 
@@ -11,33 +11,74 @@ from typing import List
 import logging
 from pathlib import Path
 
+from app.config import DB_PROFILE, SQLITE_PROFILES
+
 # Путь к базе данных
 DB_PATH = Path(__file__).parent / "furniture.db"
 DATABASE_URL = f"sqlite:///{DB_PATH}"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
 
-# Создаем движок SQLAlchemy
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,  # Показывает SQL запросы (удобно для отладки)
-    connect_args={"check_same_thread": False}
-)
+def create_sqlite_engine(database_url: str, profile_name: str = DB_PROFILE):
+    """
+    Создать движок SQLite с настройками профиля из app.config.SQLITE_PROFILES
+    """
+    profile = _get_profile(profile_name)
+    
+    sqlite_engine = create_engine(
+        database_url,
+        echo=profile['echo'],  # Показывает SQL запросы (удобно для отладки)
+        connect_args={"check_same_thread": False}
+    )
+    _setup_sqlite_connections(sqlite_engine, profile)
+    
+    return sqlite_engine
 
-# Настройка SQLite
-@event.listens_for(engine, "connect")
-def setup_sqlite(dbapi_connection, connection_record):
-    """Настройка SQLite при подключении"""
-    cursor = dbapi_connection.cursor()
-    # ВКЛЮЧАЕМ внешние ключи (обязательно для SQLite!)
-    cursor.execute("PRAGMA foreign_keys = ON")
+def create_async_sqlite_engine(database_url: str, profile_name: str = DB_PROFILE):
+    """
+    Создать асинхронный движок SQLite (драйвер aiosqlite) с настройками профиля
+    
+    database_url вида sqlite+aiosqlite:///path/to/file.db
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
     
-    # Пробуем включить строгий режим (если версия поддерживает)
-    try:
-        cursor.execute("PRAGMA strict = ON")
-        logging.info("SQLite strict mode enabled")
-    except:
-        logging.warning("SQLite version doesn't support strict mode")
+    profile = _get_profile(profile_name)
     
-    cursor.close()
+    async_engine = create_async_engine(database_url, echo=profile['echo'])
+    # События подключения вешаются на синхронный движок-обертку
+    _setup_sqlite_connections(async_engine.sync_engine, profile)
+    
+    return async_engine
+
+def _get_profile(profile_name: str) -> dict:
+    """Настройки профиля из app.config.SQLITE_PROFILES"""
+    if profile_name not in SQLITE_PROFILES:
+        raise ValueError(
+            f"Неизвестный профиль БД '{profile_name}'. "
+            f"Доступные профили: {', '.join(SQLITE_PROFILES)}"
+        )
+    return SQLITE_PROFILES[profile_name]
+
+def _setup_sqlite_connections(sqlite_engine, profile: dict):
+    """PRAGMA профиля при каждом новом подключении"""
+    @event.listens_for(sqlite_engine, "connect")
+    def setup_sqlite(dbapi_connection, connection_record):
+        """Настройка SQLite при подключении"""
+        cursor = dbapi_connection.cursor()
+        # Внешние ключи (обязательно для SQLite!) и остальные PRAGMA профиля
+        for name, value in profile['pragmas'].items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        
+        # Пробуем включить строгий режим (если версия поддерживает)
+        try:
+            cursor.execute("PRAGMA strict = ON")
+            logging.info("SQLite strict mode enabled")
+        except:
+            logging.warning("SQLite version doesn't support strict mode")
+        
+        cursor.close()
+
+# Создаем движок SQLAlchemy
+engine = create_sqlite_engine(DATABASE_URL)
 
 # Базовый класс для всех моделей
 class Base(DeclarativeBase):
@@ -55,9 +96,42 @@ product_workshop_table = Table(
            ForeignKey("workshops.id", ondelete="CASCADE"), 
            nullable=False),
     Column("manufacturing_time_hours", Float, 
+           nullable=False, default=0.0),
+    # Одна связь на пару продукт-цех; индекс также обслуживает
+    # суммирование времени по product_id
+    Index("ux_product_workshop_product_workshop", "product_id", "workshop_id", unique=True),
+    # Отчеты по цеху: покрывающий индекс, время читается без обращения к таблице
+    Index(
+        "ix_product_workshop_workshop_product_time",
+        "workshop_id", "product_id", "manufacturing_time_hours"
+    )
+)
+
+# Суммарное время изготовления продукта по всем цехам.
+# Хранится отдельно и пересчитывается при изменении связей product_workshop,
+# чтобы чтение времени стоило одного обращения по первичному ключу
+product_production_time_table = Table(
+    "product_production_time",
+    Base.metadata,
+    Column("product_id", Integer,
+           ForeignKey("products.id", ondelete="CASCADE"),
+           primary_key=True),
+    Column("total_hours", Float,
            nullable=False, default=0.0)
 )
 
+# Хэши строк исходных файлов для инкрементального импорта
+# (python -m app.scripts.import_data --incremental): строка, хэш которой
+# не изменился с прошлого импорта, повторно не записывается.
+# natural_key - естественный ключ строки в своем файле (название, артикул)
+import_row_hashes_table = Table(
+    "import_row_hashes",
+    Base.metadata,
+    Column("source", String(50), primary_key=True),
+    Column("natural_key", String(400), primary_key=True),
+    Column("row_hash", String(32), nullable=False)
+)
+
 # Модель: Тип материала
 class MaterialType(Base):
     __tablename__ = "material_types"
@@ -116,11 +190,13 @@ class Product(Base):
     # Внешние ключи
     product_type_id: Mapped[int] = mapped_column(
         ForeignKey("product_types.id", ondelete="RESTRICT"), 
-        nullable=False
+        nullable=False,
+        index=True
     )
     material_id: Mapped[int] = mapped_column(
         ForeignKey("material_types.id", ondelete="RESTRICT"), 
-        nullable=False
+        nullable=False,
+        index=True
     )
     
     min_partner_price: Mapped[float] = mapped_column(Float, nullable=False)
@@ -141,11 +217,31 @@ class Product(Base):
 
 # Функция для создания таблиц
 def create_all_tables():
-    """Создает все таблицы в базе данных"""
-    Base.metadata.create_all(bind=engine)
+    """Создает все таблицы в базе данных и обновляет схему существующей"""
+    from app.database.migrations import migrate
+    
+    # migrate создает отсутствующие таблицы сам и заполняет новую таблицу итогов
+    migrate(engine)
     print("Все таблицы созданы")
 
 # Функция для получения сессии
 def get_session():
     """Возвращает сессию для работы с БД"""
-    return Session(engine)
\ No newline at end of file
+    return Session(engine)
+
+# Асинхронный движок создается при первом обращении:
+# синхронной части приложения драйвер aiosqlite не нужен
+_async_engine = None
+
+def get_async_engine():
+    """Асинхронный движок для ASYNC_DATABASE_URL"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_sqlite_engine(ASYNC_DATABASE_URL)
+    return _async_engine
+
+def get_async_session():
+    """Возвращает асинхронную сессию (AsyncSession) для работы с БД"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    
+    return AsyncSession(get_async_engine())
\ No newline at end of file
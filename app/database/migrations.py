@@ -0,0 +1,137 @@
+"""
+Обновление схемы существующей базы furniture.db
+
+Base.metadata.create_all создает только отсутствующие таблицы, а индексы
+новых версий схемы в уже существующих таблицах не появляются.
+migrate() доводит базу до текущей схемы:
+1. Создает отсутствующие таблицы
+2. Удаляет дубликаты связей продукт-цех (перед созданием уникального индекса;
+   каждая удаляемая строка записывается в журнал, остается связь с минимальным id)
+3. Создает отсутствующие индексы
+4. Заполняет таблицу итогов product_production_time, если ее не было
+
+Повторный запуск безопасен. Выполняется при старте приложения (app.main,
+отключается MIGRATE_ON_STARTUP=0) и в скриптах импорта. Запуск вручную:
+    python -m app.database.migrations
+"""
+import logging
+
+from sqlalchemy import inspect, select, func
+from sqlalchemy.orm import Session
+
+from app.database.database import (
+    Base, engine as default_engine, product_workshop_table, product_production_time_table
+)
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_LINK_INDEX = "ux_product_workshop_product_workshop"
+
+
+def migrate(target_engine=None) -> dict:
+    """
+    Привести схему базы к текущей версии
+
+    Returns:
+        Отчет: созданные индексы, количество удаленных дубликатов связей и
+        количество продуктов, для которых заполнена новая таблица итогов
+    """
+    target_engine = target_engine or default_engine
+    report = {"created_indexes": [], "removed_duplicate_links": 0, "backfilled_production_times": 0}
+
+    with target_engine.connect() as connection:
+        missing_totals = not inspect(connection).has_table(product_production_time_table.name)
+    Base.metadata.create_all(bind=target_engine)
+
+    with Session(target_engine) as session:
+        connection = session.connection()
+        existing_indexes = {
+            index["name"]
+            for table_name in inspect(connection).get_table_names()
+            for index in inspect(connection).get_indexes(table_name)
+        }
+
+        if UNIQUE_LINK_INDEX not in existing_indexes:
+            report["removed_duplicate_links"] = _remove_duplicate_links(session)
+
+        if missing_totals:
+            # Таблица итогов только что создана: заполняем ее для всех продуктов,
+            # иначе чтение вернет время 0 до первого изменения связей
+            from app.services.production_time import refresh_production_times
+            refresh_production_times(session)
+            report["backfilled_production_times"] = session.scalar(
+                select(func.count()).select_from(product_production_time_table)
+            )
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=connection)
+                    report["created_indexes"].append(index.name)
+
+        session.commit()
+
+    if report["created_indexes"]:
+        logger.info(f"Созданы индексы: {', '.join(report['created_indexes'])}")
+    if missing_totals:
+        logger.info(f"Заполнено время изготовления продуктов: {report['backfilled_production_times']}")
+    return report
+
+
+def _remove_duplicate_links(session: Session) -> int:
+    """
+    Оставить по одной связи (с минимальным id) на пару продукт-цех
+
+    Сохраненное время изготовления затронутых продуктов пересчитывается.
+    """
+    from app.services.production_time import refresh_production_times
+
+    links = product_workshop_table
+    keep_ids = select(func.min(links.c.id)).group_by(links.c.product_id, links.c.workshop_id)
+
+    duplicates = session.execute(
+        select(links.c.id, links.c.product_id, links.c.workshop_id, links.c.manufacturing_time_hours)
+        .where(links.c.id.not_in(keep_ids))
+        .order_by(links.c.product_id, links.c.workshop_id, links.c.id)
+    ).all()
+    if not duplicates:
+        return 0
+
+    # Удаляемые строки - в журнал, чтобы их можно было восстановить вручную
+    for link_id, product_id, workshop_id, hours in duplicates:
+        logger.warning(
+            f"Удаляется дубликат связи id={link_id}: продукт {product_id}, "
+            f"цех {workshop_id}, время {hours} ч"
+        )
+    affected_products = sorted({product_id for _, product_id, _, _ in duplicates})
+
+    removed = session.execute(links.delete().where(links.c.id.not_in(keep_ids))).rowcount
+    refresh_production_times(session, affected_products)
+
+    logger.warning(
+        f"Удалено дубликатов связей продукт-цех: {removed} "
+        f"(продуктов затронуто: {len(affected_products)})"
+    )
+    return removed
+
+
+def main():
+    """Точка входа"""
+    print("=" * 70)
+    print("ОБНОВЛЕНИЕ СХЕМЫ БАЗЫ ДАННЫХ")
+    print("=" * 70)
+
+    report = migrate()
+
+    print(f"Удалено дубликатов связей: {report['removed_duplicate_links']}")
+    print(f"Заполнено время изготовления продуктов: {report['backfilled_production_times']}")
+    if report["created_indexes"]:
+        print("Созданы индексы:")
+        for name in report["created_indexes"]:
+            print(f"  - {name}")
+    else:
+        print("Все индексы уже существуют")
+
+
+if __name__ == "__main__":
+    main()
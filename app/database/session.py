@@ -1,4 +1,4 @@
-from app.database.database import get_session
+from app.database.database import get_session, get_async_session
 
 def get_db():
     """Простой генератор сессий"""
@@ -6,4 +6,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Генератор асинхронных сессий (aiosqlite)"""
+    async with get_async_session() as db:
+        yield db
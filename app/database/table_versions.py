@@ -0,0 +1,76 @@
+"""
+Версии таблиц для инвалидации кэшей
+
+Каждая таблица имеет счетчик версии, который увеличивается после
+успешного commit сессии, изменившей таблицу. Изменения отслеживаются
+событиями SQLAlchemy для всех сессий:
+- after_flush - объекты ORM (add / изменение / delete)
+- do_orm_execute - INSERT / UPDATE / DELETE через session.execute()
+
+Счетчики живут в памяти процесса: изменения, сделанные другим процессом
+(например, скриптом импорта), сюда не попадают.
+"""
+import threading
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Ключ в session.info со списком измененных таблиц до commit
+_PENDING_KEY = "written_tables"
+
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def get_version(table_name: str) -> int:
+    """Текущая версия таблицы"""
+    return _versions.get(table_name, 0)
+
+
+def get_versions(table_names: Iterable[str]) -> Tuple[int, ...]:
+    """Версии нескольких таблиц (удобно как часть ключа кэша)"""
+    return tuple(_versions.get(name, 0) for name in table_names)
+
+
+def bump(*table_names: str) -> None:
+    """Увеличить версии таблиц (вызывается после commit или вручную)"""
+    with _lock:
+        for name in table_names:
+            _versions[name] = _versions.get(name, 0) + 1
+
+
+def _pending(session: Session) -> set:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    """Таблицы объектов ORM, записанных во flush"""
+    pending = _pending(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            pending.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_execute(orm_execute_state):
+    """Таблицы из INSERT / UPDATE / DELETE, выполненных через session.execute()"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        name = getattr(table, "name", None)
+        if name:
+            _pending(orm_execute_state.session).add(name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -2,8 +2,10 @@
 Основное приложение - объединяет API и фронтенд
 """
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI, Request, Form, HTTPException, Depends
+from typing import Optional
+from fastapi import FastAPI, Request, Form, HTTPException, Depends, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -12,14 +14,36 @@ from sqlalchemy.orm import Session
 # Получаем путь к папке app
 BASE_DIR = Path(__file__).parent
 
+from app.config import MIGRATE_ON_STARTUP
+from app.database.migrations import migrate
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Обновить схему базы при старте (отсутствующие таблицы и индексы)
+    
+    Схема базы, созданной старой версией, доводится до текущей до первого
+    запроса: без таблицы итогов и уникального индекса связей чтение и
+    запись падают с 500
+    """
+    if MIGRATE_ON_STARTUP:
+        migrate()
+    yield
+
 # Создаем приложение
 app = FastAPI(
     title="Мебельная компания - Система учета",
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    lifespan=lifespan,
 )
 
+# Счетчики SQL запросов и времени ответа по маршрутам (/api/metrics)
+from app.config import METRICS_DEBUG_HEADER
+from app.services.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware, debug_header=METRICS_DEBUG_HEADER)
+
 # Подключаем статические файлы фронтенда
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "frontend/static")), name="static")
 
@@ -29,13 +53,24 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "frontend/templates"))
 # Импортируем существующие модули
 from app.api.config_fastapi import config
 from app.api.routers import router as api_router
+from app.crud.pagination import MAX_PAGE_LIMIT
 from app.database.session import get_db
+from app.services.page_cache import page_cache
 
 # Подключаем API роутер с префиксом /api
 app.include_router(api_router, prefix="/api")
 
 # =========== ФРОНТЕНД РОУТЫ ===========
 
+# Таблицы, данные которых выводятся на кэшируемых страницах (app.services.page_cache)
+PRODUCTS_PAGE_TABLES = (
+    "products", "product_types", "material_types", "product_workshop", "product_production_time"
+)
+WORKSHOPS_PAGE_TABLES = ("workshops",)
+WORKSHOP_DETAIL_PAGE_TABLES = (
+    "workshops", "product_workshop", "products", "product_types", "material_types"
+)
+
 @app.get("/", response_class=HTMLResponse)
 def frontend_index(request: Request):
     """Главная страница фронтенда"""
@@ -49,51 +84,51 @@ def frontend_index(request: Request):
 @app.get("/products", response_class=HTMLResponse)
 def products_page(
     request: Request,
-    page: int = 1,
-    limit: int = 20,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Страница списка продукции"""
     from app.crud.products import product_crud
-    from app.services.production_time import calculate_total_production_time
+    from app.crud.pagination import decode_cursor, encode_cursor
+    from app.services.production_time import round_production_time
     
-    skip = (page - 1) * limit
-    
-    # Используем существующую логику из API
-    products_response = []
-    db_products = product_crud.get_all(db, skip, limit)
-    
-    for db_product in db_products:
-        try:
-            product_with_details = product_crud.get_with_details(db, db_product.id)
-            if product_with_details:
-                production_time = calculate_total_production_time(db, db_product.id)
-                
-                products_response.append({
-                    "id": db_product.id,
-                    "product_type": product_with_details.product_type.name,
-                    "product_name": product_with_details.name,
-                    "production_time": production_time,
-                    "article": product_with_details.article,
-                    "min_partner_price": product_with_details.min_partner_price,
-                    "main_material": product_with_details.material.name
-                })
-        except Exception as e:
-            print(f"Ошибка обработки продукта {db_product.id}: {e}")
-            continue
-    
-    has_next = len(products_response) == limit
+    def build():
+        skip = (page - 1) * limit
+        # Курсор "Вперед" позволяет не сканировать пропущенные страницы
+        after_id = decode_cursor(after)
+        
+        # Используем ту же выборку, что и API: один запрос на страницу
+        products_response = [
+            {
+                "id": row.id,
+                "product_type": row.product_type_name,
+                "product_name": row.name,
+                "production_time": round_production_time(row.total_hours),
+                "article": row.article,
+                "min_partner_price": row.min_partner_price,
+                "main_material": row.material_name
+            }
+            for row in product_crud.get_all_with_details(db, skip, limit, after_id=after_id)
+        ]
+        
+        has_next = len(products_response) == limit
+        cursor = encode_cursor(products_response[-1]["id"]) if products_response and has_next else None
+        
+        return templates.TemplateResponse(
+            "products.html",
+            {
+                "request": request,
+                "title": "Продукция",
+                "products": products_response,
+                "page": page,
+                "has_next": has_next,
+                "next_cursor": cursor
+            }
+        )
     
-    return templates.TemplateResponse(
-        "products.html",
-        {
-            "request": request,
-            "title": "Продукция",
-            "products": products_response,
-            "page": page,
-            "has_next": has_next
-        }
-    )
+    return page_cache.render(request, db, PRODUCTS_PAGE_TABLES, build)
 
 @app.get("/products/add", response_class=HTMLResponse)
 def add_product_form(request: Request, db: Session = Depends(get_db)):
@@ -353,16 +388,19 @@ def workshops_page(request: Request, db: Session = Depends(get_db)):
     """Страница списка цехов"""
     from app.crud.workshops import workshop_crud
     
-    workshops = workshop_crud.get_all(db)
+    def build():
+        workshops = workshop_crud.get_all(db)
+        
+        return templates.TemplateResponse(
+            "workshops.html",
+            {
+                "request": request,
+                "title": "Цеха",
+                "workshops": workshops
+            }
+        )
     
-    return templates.TemplateResponse(
-        "workshops.html",
-        {
-            "request": request,
-            "title": "Цеха",
-            "workshops": workshops
-        }
-    )
+    return page_cache.render(request, db, WORKSHOPS_PAGE_TABLES, build)
 
 @app.get("/workshops/add", response_class=HTMLResponse)
 def add_workshop_form(request: Request):
@@ -492,80 +530,40 @@ def workshop_detail_page(
 ):
     """Детали цеха"""
     from app.crud.workshops import workshop_crud
-    from app.database.database import Product, product_workshop_table
-    from sqlalchemy import select
+    from app.services.workshop_report import build_production_report
     
-    workshop = workshop_crud.get_by_id(db, workshop_id)
-    if not workshop:
+    def build():
+        workshop = workshop_crud.get_by_id(db, workshop_id)
+        if not workshop:
+            return templates.TemplateResponse(
+                "error.html",
+                {
+                    "request": request,
+                    "title": "Ошибка",
+                    "status_code": 404,
+                    "error_title": "Цех не найден",
+                    "error_detail": f"Цех с ID {workshop_id} не существует"
+                }
+            )
+        
+        # Продукты цеха с деталями (один запрос)
+        products_list = workshop_crud.get_products_with_details(db, workshop_id)
+        
+        # Отчет: итоги и разбивки считаются в SQL
+        report = build_production_report(db, workshop)
+        
         return templates.TemplateResponse(
-            "error.html",
+            "workshop_detail.html",
             {
                 "request": request,
-                "title": "Ошибка",
-                "status_code": 404,
-                "error_title": "Цех не найден",
-                "error_detail": f"Цех с ID {workshop_id} не существует"
+                "title": f"Цех: {workshop.name}",
+                "workshop": workshop,
+                "products": products_list,
+                "report": report
             }
         )
     
-    # Получаем продукты цеха с деталями
-    from app.database.database import ProductType, MaterialType
-    products_data = db.execute(
-        select(
-            product_workshop_table.c.product_id,
-            Product.name,
-            Product.article,
-            Product.min_partner_price,
-            ProductType.name.label("product_type_name"),
-            MaterialType.name.label("material_name"),
-            product_workshop_table.c.manufacturing_time_hours
-        )
-        .select_from(product_workshop_table)
-        .join(Product, Product.id == product_workshop_table.c.product_id)
-        .join(ProductType, ProductType.id == Product.product_type_id)
-        .join(MaterialType, MaterialType.id == Product.material_id)
-        .where(product_workshop_table.c.workshop_id == workshop_id)
-    ).fetchall()
-    
-    # Форматируем продукты
-    products_list = []
-    for prod_id, name, article, price, type_name, material_name, time in products_data:
-        products_list.append({
-            "product_id": prod_id,
-            "name": name,
-            "article": article,
-            "min_partner_price": price,
-            "product_type_name": type_name,
-            "material_name": material_name,
-            "manufacturing_time_hours": float(time) if time else 0.0
-        })
-    
-    # Получаем отчет
-    total_hours = sum(p["manufacturing_time_hours"] for p in products_list)
-    
-    return templates.TemplateResponse(
-        "workshop_detail.html",
-        {
-            "request": request,
-            "title": f"Цех: {workshop.name}",
-            "workshop": workshop,
-            "products": products_list,
-            "report": {
-                "production_data": {
-                    "total_products": len(products_list),
-                    "total_manufacturing_hours": round(total_hours, 2),
-                    "average_hours_per_product": round(
-                        total_hours / len(products_list) if products_list else 0, 
-                        2
-                    ),
-                    "employee_productivity": round(
-                        total_hours / workshop.employee_count if workshop.employee_count > 0 else 0,
-                        2
-                    )
-                }
-            }
-        }
-    )
+    return page_cache.render(request, db, WORKSHOP_DETAIL_PAGE_TABLES, build)
 
 @app.get("/workshops/{workshop_id}/products", response_class=HTMLResponse)
 def workshop_products_page(
@@ -647,58 +645,7 @@ def delete_workshop(
 @app.get("/calculations", response_class=HTMLResponse)
 def calculations_page(request: Request, db: Session = Depends(get_db)):
     """Страница расчета сырья"""
-    try:
-        # Используем прямые SQLAlchemy запросы вместо CRUD
-        from app.database.database import ProductType, MaterialType
-        
-        # Получаем типы продукции
-        product_types = db.query(ProductType).all()
-        # Преобразуем в список словарей для шаблона
-        product_types_list = [
-            {
-                "id": pt.id,
-                "name": pt.name,
-                "coefficient": pt.coefficient
-            }
-            for pt in product_types
-        ]
-        
-        # Получаем типы материалов
-        material_types = db.query(MaterialType).all()
-        # Преобразуем в список словарей для шаблона
-        material_types_list = [
-            {
-                "id": mt.id,
-                "name": mt.name,
-                "loss_percentage": mt.loss_percentage
-            }
-            for mt in material_types
-        ]
-        
-        return templates.TemplateResponse(
-            "calculations.html",
-            {
-                "request": request,
-                "title": "Расчет сырья",
-                "product_types": product_types_list,
-                "material_types": material_types_list,
-                "result": None
-            }
-        )
-    except Exception as e:
-        import traceback
-        print(f"Ошибка в calculations_page: {e}")
-        traceback.print_exc()
-        return templates.TemplateResponse(
-            "error.html",
-            {
-                "request": request,
-                "title": "Ошибка сервера",
-                "status_code": 500,
-                "error_title": "Внутренняя ошибка сервера",
-                "error_detail": f"Не удалось загрузить страницу расчетов: {str(e)}"
-            }
-        )
+    return _calculations_form(request, db)
 
 @app.post("/calculations")
 def calculate_raw_material_submit(
@@ -710,177 +657,51 @@ def calculate_raw_material_submit(
     param2: float = Form(...),
     db: Session = Depends(get_db)
 ):
-    """Обработка расчета сырья"""
-    try:
-        print(f"Получены данные для расчета: product_type_id={product_type_id}, "
-              f"material_type_id={material_type_id}, quantity={product_quantity}, "
-              f"param1={param1}, param2={param2}")
-        
-        # Используем прямые SQLAlchemy запросы для справочников
-        from app.database.database import ProductType, MaterialType
-        
-        # Получаем справочники для формы
-        product_types = db.query(ProductType).all()
-        material_types = db.query(MaterialType).all()
-        
-        # Преобразуем в список словарей
-        product_types_list = [
-            {
-                "id": pt.id,
-                "name": pt.name,
-                "coefficient": pt.coefficient
-            }
-            for pt in product_types
-        ]
-        
-        material_types_list = [
-            {
-                "id": mt.id,
-                "name": mt.name,
-                "loss_percentage": mt.loss_percentage
-            }
-            for mt in material_types
-        ]
-        
-        try:
-            from app.services.raw_material_calculation import calculate_raw_material_with_details
-            
-            # Выполняем расчет
-            print("Вызываем calculate_raw_material_with_details...")
-            result, details = calculate_raw_material_with_details(
-                db=db,
-                product_type_id=product_type_id,
-                material_type_id=material_type_id,
-                product_quantity=product_quantity,
-                param1=param1,
-                param2=param2
-            )
-            print(f"Результат расчета: {result}")
-            print(f"Детали расчета: {details}")
-            
-        except ImportError as e:
-            print(f"Ошибка импорта calculate_raw_material_with_details: {e}")
-            # Если функция недоступна, делаем простой расчет
-            result, details = -1, None
-            
-        except Exception as e:
-            print(f"Ошибка в calculate_raw_material_with_details: {e}")
-            import traceback
-            traceback.print_exc()
-            result, details = -1, None
-        
-        if result == -1 or details is None:
-            print("Расчет не удался, возвращаем форму с ошибкой")
-            # Попробуем сделать простой расчет вручную
-            try:
-                # Прямой запрос к базе для проверки
-                product_type = db.query(ProductType).filter(ProductType.id == product_type_id).first()
-                material_type = db.query(MaterialType).filter(MaterialType.id == material_type_id).first()
-                
-                if product_type and material_type:
-                    import math
-                    params_product = param1 * param2
-                    material_per_unit = params_product * product_type.coefficient
-                    total_without_loss = material_per_unit * product_quantity
-                    loss_factor = 1 + (material_type.loss_percentage / 100)
-                    total_with_loss = total_without_loss * loss_factor
-                    total_rounded = math.ceil(total_with_loss)
-                    
-                    result = total_rounded
-                    details = {
-                        "product_type_name": product_type.name,
-                        "material_name": material_type.name,
-                        "coefficient": product_type.coefficient,
-                        "loss_percentage": material_type.loss_percentage,
-                        "product_quantity": product_quantity,
-                        "param1": param1,
-                        "param2": param2,
-                        "params_product": params_product,
-                        "material_per_unit": material_per_unit,
-                        "total_without_loss": total_without_loss,
-                        "loss_factor": loss_factor,
-                        "total_with_loss": total_with_loss,
-                        "total_rounded": total_rounded
-                    }
-                    print(f"Ручной расчет успешен: {result}")
-                else:
-                    print("Не найдены product_type или material_type в БД")
-                    
-            except Exception as calc_error:
-                print(f"Ошибка в ручном расчете: {calc_error}")
-                return templates.TemplateResponse(
-                    "calculations.html",
-                    {
-                        "request": request,
-                        "title": "Расчет сырья",
-                        "product_types": product_types_list,
-                        "material_types": material_types_list,
-                        "error": f"Ошибка при расчете: {str(calc_error)}"
-                    }
-                )
-        
-        print("Возвращаем результат...")
-        return templates.TemplateResponse(
-            "calculations.html",
-            {
-                "request": request,
-                "title": "Расчет сырья",
-                "product_types": product_types_list,
-                "material_types": material_types_list,
-                "result": {
-                    "raw_material_quantity": result,
-                    "product_type_id": product_type_id,
-                    "material_type_id": material_type_id,
-                    "product_quantity": product_quantity,
-                    "param1": param1,
-                    "param2": param2,
-                    "calculation_details": details
-                }
-            }
-        )
-        
-    except Exception as e:
-        import traceback
-        print(f"Общая ошибка в calculate_raw_material_submit: {e}")
-        traceback.print_exc()
-        
-        try:
-            # Пытаемся получить справочники для показа формы с ошибкой
-            from app.database.database import ProductType, MaterialType
-            product_types = db.query(ProductType).all()
-            material_types = db.query(MaterialType).all()
-            
-            product_types_list = [
-                {
-                    "id": pt.id,
-                    "name": pt.name,
-                    "coefficient": pt.coefficient
-                }
-                for pt in product_types
-            ]
-            
-            material_types_list = [
-                {
-                    "id": mt.id,
-                    "name": mt.name,
-                    "loss_percentage": mt.loss_percentage
-                }
-                for mt in material_types
-            ]
-        except:
-            product_types_list = []
-            material_types_list = []
-        
-        return templates.TemplateResponse(
-            "calculations.html",
-            {
-                "request": request,
-                "title": "Расчет сырья",
-                "product_types": product_types_list,
-                "material_types": material_types_list,
-                "error": f"Ошибка при расчете: {str(e)}"
-            }
-        )
+    """
+    Обработка расчета сырья
+    
+    Тот же расчет, что и POST /api/calculations/raw-material;
+    справочники из кэша - не больше одного запроса к БД
+    """
+    from app.services.raw_material_calculation import calculate_raw_material_with_details
+    
+    result, details = calculate_raw_material_with_details(
+        db=db,
+        product_type_id=product_type_id,
+        material_type_id=material_type_id,
+        product_quantity=product_quantity,
+        param1=param1,
+        param2=param2
+    )
+    
+    # При ошибке (-1) шаблон показывает сообщение вместо результата
+    return _calculations_form(request, db, result={
+        "raw_material_quantity": result,
+        "product_type_id": product_type_id,
+        "material_type_id": material_type_id,
+        "product_quantity": product_quantity,
+        "param1": param1,
+        "param2": param2,
+        "calculation_details": details
+    })
+
+def _calculations_form(request: Request, db: Session, result: Optional[dict] = None):
+    """Форма расчета сырья; выпадающие списки - из кэша справочников"""
+    from app.services.catalog_cache import catalog_cache
+    
+    # Оба справочника - одним запросом, если кэш устарел
+    catalog_cache.ensure_loaded(db)
+    
+    return templates.TemplateResponse(
+        "calculations.html",
+        {
+            "request": request,
+            "title": "Расчет сырья",
+            "product_types": catalog_cache.product_types(db),
+            "material_types": catalog_cache.material_types(db),
+            "result": result
+        }
+    )
 
 # =========== ОБРАБОТЧИКИ ОШИБОК ===========
 
@@ -1,8 +1,11 @@
 """
 Pydantic схемы для расчетов
 """
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, Field, conint, validator
+from typing import List, Optional
+
+# Наибольший ID в SQLite (INTEGER - 64 бит); больший ID не передать даже в запрос
+MAX_DB_ID = 2 ** 63 - 1
 
 class RawMaterialRequest(BaseModel):
     """Запрос на расчет сырья"""
@@ -38,4 +41,80 @@ class ProductionDetailsRequest(BaseModel):
 
 class WorkshopProductionRequest(BaseModel):
     """Запрос деталей производства цеха"""
-    workshop_id: int = Field(..., gt=0, description="ID цеха")
\ No newline at end of file
+    workshop_id: int = Field(..., gt=0, description="ID цеха")
+
+class ProductionTimeBatchRequest(BaseModel):
+    """Запрос времени изготовления для списка продуктов"""
+    product_ids: List[conint(ge=1, le=MAX_DB_ID)] = Field(
+        ..., min_length=1, max_length=10000,
+        description="ID продуктов (не более 10000 за запрос)"
+    )
+
+class ProductionTimeItem(BaseModel):
+    """Время изготовления одного продукта"""
+    product_id: int
+    production_time: int = Field(ge=0)
+
+class ProductionTimeBatchResponse(BaseModel):
+    """Ответ пакетного расчета времени изготовления"""
+    items: List[ProductionTimeItem] = Field(..., description="Результаты в порядке запроса")
+    not_found: List[int] = Field(default_factory=list, description="ID несуществующих продуктов")
+
+class RawMaterialBatchRequest(BaseModel):
+    """
+    Пакетный расчет сырья в колоночном формате:
+    i-я строка задается i-ми элементами всех списков
+    """
+    product_type_id: List[int] = Field(..., max_length=100000, description="ID типов продукции")
+    material_type_id: List[int] = Field(..., max_length=100000, description="ID типов материалов")
+    product_quantity: List[int] = Field(..., max_length=100000, description="Количество продукции")
+    param1: List[float] = Field(..., max_length=100000, description="Первые параметры (м)")
+    param2: List[float] = Field(..., max_length=100000, description="Вторые параметры (м)")
+    
+    @validator('material_type_id', 'product_quantity', 'param1', 'param2')
+    def validate_same_length(cls, v, values):
+        """Все колонки должны быть одной длины"""
+        if 'product_type_id' in values and len(v) != len(values['product_type_id']):
+            raise ValueError('Все колонки должны содержать одинаковое количество строк')
+        return v
+
+class RawMaterialBatchResponse(BaseModel):
+    """Результаты пакетного расчета в порядке входных строк"""
+    raw_material_quantity: List[Optional[int]] = Field(..., description="Количество сырья или null")
+    errors: List[Optional[str]] = Field(..., description="Код ошибки строки или null")
+    total_rows: int
+    error_rows: int
+
+class RawMaterialMatrixRequest(BaseModel):
+    """Параметры продукции для расчета сырья по всем типам и материалам"""
+    product_quantity: int = Field(..., gt=0, description="Количество продукции (штук)")
+    param1: float = Field(..., gt=0, description="Первый параметр продукции (м)")
+    param2: float = Field(..., gt=0, description="Второй параметр продукции (м)")
+    
+    @validator('param1', 'param2')
+    def validate_positive(cls, v):
+        """Округление как в RawMaterialRequest"""
+        return round(v, 4)
+
+class MatrixProductType(BaseModel):
+    """Строка матрицы - тип продукции"""
+    id: int
+    name: str
+    coefficient: float
+
+class MatrixMaterialType(BaseModel):
+    """Столбец матрицы - тип материала"""
+    id: int
+    name: str
+    loss_percentage: float
+
+class RawMaterialMatrixResponse(BaseModel):
+    """Потребность в сырье для всех сочетаний тип продукции × материал"""
+    product_types: List[MatrixProductType] = Field(..., description="Строки матрицы")
+    material_types: List[MatrixMaterialType] = Field(..., description="Столбцы матрицы")
+    multipliers: List[List[float]] = Field(
+        ..., description="Коэффициент типа × (1 + потери / 100)"
+    )
+    raw_material_quantity: List[List[int]] = Field(
+        ..., description="Количество сырья [тип продукции][материал]"
+    )
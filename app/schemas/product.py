@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, validator
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
 class ProductBase(BaseModel):
     """Базовые поля продукта"""
@@ -57,4 +57,38 @@ class ProductResponse(BaseModel):
     id: int
     
     class Config:
-        from_attributes = True  # Позволяет создать из SQLAlchemy объекта
\ No newline at end of file
+        from_attributes = True  # Позволяет создать из SQLAlchemy объекта
+
+class ProductBulkUpdateItem(ProductUpdate):
+    """Изменение продукта в пакетном запросе"""
+    id: int = Field(..., gt=0, description="ID продукта")
+
+class ProductBulkRequest(BaseModel):
+    """
+    Пакет изменений продукции (одна транзакция)
+    
+    Порядок применения: удаление, изменение, создание
+    """
+    create: List[ProductCreate] = Field(default_factory=list, description="Новые продукты")
+    update: List[ProductBulkUpdateItem] = Field(default_factory=list, description="Изменения")
+    delete: List[int] = Field(default_factory=list, description="ID удаляемых продуктов")
+    all_or_nothing: bool = Field(
+        False, description="При любой ошибке не применять ни одного изменения"
+    )
+
+class ProductBulkItemResult(BaseModel):
+    """Результат одного элемента пакета"""
+    operation: str = Field(..., description="create / update / delete")
+    index: int = Field(..., description="Позиция элемента в своем списке запроса")
+    id: Optional[int] = Field(None, description="ID продукта")
+    status: str = Field(..., description="created / updated / deleted / error / skipped")
+    error: Optional[str] = None
+
+class ProductBulkResponse(BaseModel):
+    """Итог пакетного запроса"""
+    applied: bool = Field(..., description="Изменения сохранены")
+    created: int
+    updated: int
+    deleted: int
+    errors: int
+    results: List[ProductBulkItemResult]
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class ProductWorkshopLinkKey(BaseModel):
+    """Пара продукт-цех"""
+    product_id: int = Field(..., gt=0, description="ID продукта")
+    workshop_id: int = Field(..., gt=0, description="ID цеха")
+
+class ProductWorkshopLink(ProductWorkshopLinkKey):
+    """Связь продукт-цех с временем изготовления"""
+    manufacturing_time_hours: float = Field(..., ge=0, description="Время изготовления в цехе (часы)")
+
+class ProductionLinksBulkRequest(BaseModel):
+    """
+    Пакет изменений связей продукт-цех (одна транзакция)
+
+    Порядок применения: удаление, затем добавление или изменение времени
+    """
+    upsert: List[ProductWorkshopLink] = Field(
+        default_factory=list, description="Новые связи или новое время существующих"
+    )
+    delete: List[ProductWorkshopLinkKey] = Field(default_factory=list, description="Удаляемые связи")
+    all_or_nothing: bool = Field(
+        False, description="При любой ошибке не применять ни одного изменения"
+    )
+
+class ProductionLinkResult(BaseModel):
+    """Результат одного элемента пакета"""
+    operation: str = Field(..., description="upsert / delete")
+    index: int = Field(..., description="Позиция элемента в своем списке запроса")
+    product_id: int
+    workshop_id: int
+    status: str = Field(..., description="created / updated / deleted / error / skipped")
+    error: Optional[str] = None
+
+class ProductionLinksBulkResponse(BaseModel):
+    """Итог пакетного запроса"""
+    applied: bool = Field(..., description="Изменения сохранены")
+    created: int
+    updated: int
+    deleted: int
+    errors: int
+    refreshed_products: int = Field(..., description="Продуктов с пересчитанным временем")
+    results: List[ProductionLinkResult]
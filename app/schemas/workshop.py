@@ -32,6 +32,7 @@ class WorkshopProductResponse(BaseModel):
     min_partner_price: float
     product_type_name: str
     material_name: str
+    manufacturing_time_hours: Optional[float] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
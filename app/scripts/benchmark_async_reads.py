@@ -0,0 +1,196 @@
+"""
+Нагрузочное сравнение синхронных и асинхронных эндпоинтов чтения
+
+Во временной базе создаются синтетические данные, приложение запускается
+в uvicorn (один воркер) в отдельном процессе, после чего N конкурентных
+клиентов запрашивают одни и те же данные через:
+- sync  - /api/products/...        (Session, пул потоков)
+- async - /api/async/products/...  (AsyncSession, aiosqlite)
+
+Выводится пропускная способность и задержки p50 / p99.
+
+Запуск:
+    python -m app.scripts.benchmark_async_reads
+    python -m app.scripts.benchmark_async_reads --concurrency 200 --seconds 10 --profile production
+"""
+import sys
+import asyncio
+import argparse
+import multiprocessing
+import random
+import socket
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+import uvicorn
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import DB_PROFILE
+from app.database.database import create_sqlite_engine, create_async_sqlite_engine
+from app.database.session import get_db, get_async_db
+from app.crud.pagination import encode_cursor
+from app.main import app
+from app.scripts.benchmark_sqlite_profiles import seed
+
+# Сценарии: (название, путь синхронной версии); асинхронная - с префиксом /api/async
+SCENARIOS = [
+    ("Список продукции", "/products/?limit=50&after={after}"),
+    ("Карточка продукта", "/products/{product_id}"),
+    ("Типы продукции", "/catalog/product-types"),
+    ("Детали производства", "/calculations/production-details/{product_id}"),
+]
+
+
+def free_port() -> int:
+    """Свободный TCP порт на localhost"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(database_path: Path, profile_name: str, port: int):
+    """Процесс сервера: приложение на временной базе"""
+    use_database(database_path, profile_name)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(database_path: Path, profile_name: str, port: int) -> multiprocessing.Process:
+    """Запустить сервер в отдельном процессе и дождаться готовности"""
+    process = multiprocessing.Process(
+        target=serve, args=(database_path, profile_name, port), daemon=True
+    )
+    process.start()
+
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/catalog/cache-stats")
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Сервер не запустился за 30 секунд")
+
+
+def use_database(database_path: Path, profile_name: str):
+    """Направить get_db и get_async_db приложения во временную базу"""
+    engine = create_sqlite_engine(f"sqlite:///{database_path}", profile_name)
+    async_engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{database_path}", profile_name)
+    # Логирование SQL исказило бы замеры
+    engine.echo = False
+    async_engine.echo = False
+
+    def override_get_db():
+        db = Session(engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession(async_engine) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+
+async def run_load(base_url: str, path_template: str, products_count: int,
+                   concurrency: int, seconds: float) -> dict:
+    """
+    concurrency клиентов в течение seconds секунд запрашивают path_template
+
+    Returns:
+        Запросов в секунду, p50 / p99 в миллисекундах, ошибок
+    """
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        async def worker():
+            nonlocal errors
+            rnd = random.Random()
+            while time.perf_counter() < stop_at:
+                path = path_template.format(
+                    product_id=rnd.randint(1, products_count),
+                    after=encode_cursor(rnd.randint(1, max(products_count - 50, 1)))
+                )
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Сравнение sync и async эндпоинтов чтения")
+    parser.add_argument("--products", type=int, default=5000, help="количество продуктов")
+    parser.add_argument("--concurrency", type=int, default=100, help="конкурентных клиентов")
+    parser.add_argument("--seconds", type=float, default=5.0, help="длительность каждого замера")
+    parser.add_argument("--profile", default=DB_PROFILE, help="профиль движка SQLite")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("НАГРУЗОЧНОЕ СРАВНЕНИЕ SYNC / ASYNC")
+    print(f"Продуктов: {args.products}, клиентов: {args.concurrency}, "
+          f"длительность: {args.seconds} с, профиль: {args.profile}")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_path = Path(tmp_dir) / "benchmark.db"
+        engine = create_sqlite_engine(f"sqlite:///{database_path}", args.profile)
+        engine.echo = False
+        seed(engine, args.products)
+        engine.dispose()
+
+        port = free_port()
+        server = start_server(database_path, args.profile, port)
+        base_url = f"http://127.0.0.1:{port}"
+
+        print(f"{'Сценарий':<22}{'Режим':<7}{'Запр/с':>10}{'p50, мс':>10}{'p99, мс':>10}{'Ошибок':>8}")
+        print("-" * 67)
+        try:
+            for title, path in SCENARIOS:
+                for mode, prefix in (("sync", "/api"), ("async", "/api/async")):
+                    result = asyncio.run(run_load(
+                        base_url, prefix + path, args.products, args.concurrency, args.seconds
+                    ))
+                    print(
+                        f"{title:<22}{mode:<7}"
+                        f"{result['rps']:>10.1f}"
+                        f"{result['p50_ms']:>10.1f}"
+                        f"{result['p99_ms']:>10.1f}"
+                        f"{result['errors']:>8}"
+                    )
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
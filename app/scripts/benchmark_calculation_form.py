@@ -0,0 +1,125 @@
+"""
+Задержка расчета сырья через HTML форму и API
+
+Сравниваются:
+- форма, кэш справочников сброшен перед каждым запросом (поведение до
+  общего расчета: справочники читались из БД на каждый POST)
+- форма с прогретым кэшем справочников (запросов к БД нет)
+- API POST /api/calculations/raw-material
+
+Запуск:
+    python -m app.scripts.benchmark_calculation_form
+    python -m app.scripts.benchmark_calculation_form --requests 2000
+"""
+import sys
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database.database import create_sqlite_engine
+from app.database.session import get_db
+from app.main import app
+from app.services.catalog_cache import catalog_cache
+from app.scripts.benchmark_sqlite_profiles import seed
+
+FORM = {
+    "product_type_id": 1,
+    "material_type_id": 1,
+    "product_quantity": 10,
+    "param1": 2.5,
+    "param2": 1.8,
+}
+
+
+def measure(client: TestClient, engine, send, requests_count: int, cold_cache: bool) -> dict:
+    """Задержки p50 / p99 в миллисекундах и запросов к БД на один вызов"""
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    latencies = []
+    try:
+        send(client)  # прогрев
+        queries = 0
+        for _ in range(requests_count):
+            if cold_cache:
+                catalog_cache.invalidate()
+            started = time.perf_counter()
+            response = send(client)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "queries": queries / requests_count,
+    }
+
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Задержка расчета сырья: форма и API")
+    parser.add_argument("--requests", type=int, default=500, help="запросов в каждом сценарии")
+    args = parser.parse_args()
+
+    scenarios = [
+        ("Форма, кэш сброшен", lambda c: c.post("/calculations", data=FORM), True),
+        ("Форма, кэш прогрет", lambda c: c.post("/calculations", data=FORM), False),
+        ("API", lambda c: c.post("/api/calculations/raw-material", json=FORM), False),
+    ]
+
+    print("=" * 70)
+    print("РАСЧЕТ СЫРЬЯ: ЗАДЕРЖКА ФОРМЫ И API")
+    print(f"Запросов в сценарии: {args.requests}")
+    print("=" * 70)
+    print(f"{'Сценарий':<24}{'p50, мс':>10}{'p99, мс':>10}{'Запросов к БД':>16}")
+    print("-" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_sqlite_engine(f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}")
+        # Логирование SQL исказило бы замеры
+        engine.echo = False
+        seed(engine, products_count=100)
+
+        def override_get_db():
+            db = Session(engine)
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            with TestClient(app) as client:
+                for title, send, cold_cache in scenarios:
+                    result = measure(client, engine, send, args.requests, cold_cache)
+                    print(
+                        f"{title:<24}"
+                        f"{result['p50_ms']:>10.2f}"
+                        f"{result['p99_ms']:>10.2f}"
+                        f"{result['queries']:>16.1f}"
+                    )
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Сравнение профилей движка SQLite (app.config.SQLITE_PROFILES)
+
+Для каждого профиля создается временная база с синтетическими данными,
+после чего параллельно работают читатели (список продукции) и писатель
+(обновление цен). Выводится пропускная способность и число ошибок
+"database is locked".
+
+Запуск:
+    python -m app.scripts.benchmark_sqlite_profiles
+    python -m app.scripts.benchmark_sqlite_profiles --products 20000 --seconds 5 --readers 8
+"""
+import sys
+import random
+import argparse
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.config import SQLITE_PROFILES
+from app.database.database import (
+    Base, MaterialType, ProductType, Workshop, Product,
+    product_workshop_table, create_sqlite_engine
+)
+from app.crud.products import product_crud
+from app.services.production_time import refresh_production_times
+
+
+def seed(engine, products_count: int, workshops_count: int = 10):
+    """Заполнить базу синтетическими данными"""
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add_all([
+            ProductType(name="Гостиные", coefficient=3.5),
+            MaterialType(name="Мебельный щит из массива дерева", loss_percentage=0.8),
+        ])
+        session.add_all([
+            Workshop(name=f"Цех {i}", workshop_type="Обработка", employee_count=5)
+            for i in range(workshops_count)
+        ])
+        session.flush()
+
+        session.execute(Product.__table__.insert(), [
+            {
+                "article": str(100000 + i),
+                "name": f"Продукт {i}",
+                "product_type_id": 1,
+                "material_id": 1,
+                "min_partner_price": 1000.0 + i,
+            }
+            for i in range(products_count)
+        ])
+        session.execute(product_workshop_table.insert(), [
+            {
+                "product_id": product_id,
+                "workshop_id": (product_id + shift) % workshops_count + 1,
+                "manufacturing_time_hours": 1.5,
+            }
+            for product_id in range(1, products_count + 1)
+            for shift in range(3)
+        ])
+        refresh_production_times(session)
+        session.commit()
+
+
+def run_readers_and_writer(engine, products_count: int, readers: int, seconds: float):
+    """
+    Параллельно: readers потоков читают страницы списка, один поток пишет
+
+    Returns:
+        (чтений, записей, ошибок блокировки)
+    """
+    stop_at = time.perf_counter() + seconds
+    counters = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            counters[name] += 1
+
+    def reader():
+        rnd = random.Random()
+        while time.perf_counter() < stop_at:
+            try:
+                with Session(engine) as session:
+                    after_id = rnd.randint(0, max(products_count - 50, 0))
+                    product_crud.get_all_with_details(session, limit=50, after_id=after_id)
+                count("reads")
+            except OperationalError:
+                count("locked")
+
+    def writer():
+        rnd = random.Random()
+        while time.perf_counter() < stop_at:
+            try:
+                with Session(engine) as session:
+                    session.execute(
+                        update(Product)
+                        .where(Product.id == rnd.randint(1, products_count))
+                        .values(min_partner_price=rnd.uniform(1000, 50000))
+                    )
+                    session.commit()
+                count("writes")
+            except OperationalError:
+                count("locked")
+
+    with ThreadPoolExecutor(max_workers=readers + 1) as pool:
+        futures = [pool.submit(reader) for _ in range(readers)]
+        futures.append(pool.submit(writer))
+        for future in futures:
+            future.result()
+
+    return counters["reads"], counters["writes"], counters["locked"]
+
+
+def benchmark_profile(profile_name: str, products_count: int, readers: int, seconds: float):
+    """Результаты одного профиля"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+        engine = create_sqlite_engine(url, profile_name)
+        # Логирование SQL исказило бы замеры
+        engine.echo = False
+
+        seed(engine, products_count)
+        reads, writes, locked = run_readers_and_writer(engine, products_count, readers, seconds)
+        engine.dispose()
+
+    return {
+        "profile": profile_name,
+        "reads_per_sec": reads / seconds,
+        "writes_per_sec": writes / seconds,
+        "locked_errors": locked,
+    }
+
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Сравнение профилей движка SQLite")
+    parser.add_argument("--products", type=int, default=5000, help="количество продуктов")
+    parser.add_argument("--readers", type=int, default=4, help="потоков-читателей")
+    parser.add_argument("--seconds", type=float, default=3.0, help="длительность замера")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("СРАВНЕНИЕ ПРОФИЛЕЙ SQLITE")
+    print(f"Продуктов: {args.products}, читателей: {args.readers}, "
+          f"писателей: 1, длительность: {args.seconds} с")
+    print("=" * 70)
+    print(f"{'Профиль':<15}{'Чтений/с':>12}{'Записей/с':>12}{'Блокировок':>12}")
+    print("-" * 51)
+
+    for profile_name in SQLITE_PROFILES:
+        result = benchmark_profile(profile_name, args.products, args.readers, args.seconds)
+        print(
+            f"{result['profile']:<15}"
+            f"{result['reads_per_sec']:>12.1f}"
+            f"{result['writes_per_sec']:>12.1f}"
+            f"{result['locked_errors']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 
 import sys
 import os
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Any, Optional, Union
+from typing import Any, Optional, Tuple, Union
 
 # Добавляем корневую директорию в путь Python
 current_dir = Path(__file__).parent
@@ -13,12 +19,18 @@ sys.path.insert(0, str(project_root))
 # Теперь можем импортировать модули проекта
 from app.database import (
     engine, get_session, create_all_tables,
-    MaterialType, ProductType, Workshop, Product, product_workshop_table
+    MaterialType, ProductType, Workshop, Product, product_workshop_table,
+    product_production_time_table, import_row_hashes_table
 )
-from app.config import EXCEL_FILES
+from app.config import EXCEL_FILES, IMPORT_BATCH_SIZE
+from app.services.production_time import refresh_production_times
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import select
+from pandas.api.types import infer_dtype, is_bool_dtype, is_numeric_dtype
+from openpyxl import load_workbook
+from sqlalchemy import select, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import logging
 
 # Настройка логирования
@@ -176,6 +188,254 @@ class DataTypeValidator:
         """Валидация положительных целых чисел"""
         result = DataTypeValidator.validate_integer(value, field_name, min_value=1)
         return result
+    
+    # ---- Векторная проверка столбцов ----
+    # Результат тот же, что у validate_* для каждой ячейки, но через маски
+    # pandas/NumPy вместо цикла. Возвращается таблица с индексом столбца:
+    # value - проверенное значение, error - текст ошибки (None, если ячейка
+    # корректна). Редкие ячейки, которые нельзя разобрать векторно (необычная
+    # запись числа, inf, значение у границы округления), проверяются
+    # построчно - сообщения совпадают с построчной проверкой.
+    
+    @staticmethod
+    def validate_string_column(column: pd.Series, field_name: str,
+                               max_length: Optional[int] = None) -> pd.DataFrame:
+        """Векторная валидация строковых значений"""
+        empty = column.isna().to_numpy()
+        if infer_dtype(column, skipna=True) == 'string':
+            # Только строки: очистка по уникальным значениям (названия
+            # справочников повторяются в каждой строке)
+            codes, uniques = pd.factorize(column)
+            text = pd.Series(uniques, dtype=object).str.strip().to_numpy()
+            lengths = np.array([len(value) for value in text], dtype=np.int64)
+            text, lengths = text.take(codes), lengths.take(codes)
+        else:
+            text = column.astype(str).str.strip()
+            lengths = text.str.len().to_numpy()
+            text = text.to_numpy(dtype=object)
+        errors = np.full(len(column), None, dtype=object)
+        
+        errors[empty] = f"Поле '{field_name}' не может быть пустым"
+        errors[~empty & (lengths == 0)] = f"Поле '{field_name}' не может быть пустой строкой"
+        if max_length:
+            too_long = ~empty & (lengths > max_length)
+            errors[too_long] = [
+                f"Поле '{field_name}' слишком длинное: {length} символов "
+                f"(максимум {max_length})"
+                for length in lengths[too_long]
+            ]
+        
+        return _column_result(column, text, errors)
+    
+    @staticmethod
+    def validate_integer_column(column: pd.Series, field_name: str,
+                                min_value: Optional[int] = None,
+                                max_value: Optional[int] = None) -> pd.DataFrame:
+        """Векторная валидация целых чисел"""
+        numbers, empty, _ = _parse_numbers(column, _clean_number_text)
+        # NaN, inf и значения вне int64 - построчно
+        parsed = ~empty & (np.abs(numbers) < 2 ** 63)
+        values = np.full(len(column), None, dtype=object)
+        errors = np.full(len(column), None, dtype=object)
+        
+        # int(float(value)): дробная часть отбрасывается
+        values[parsed] = np.trunc(numbers[parsed]).astype(np.int64).tolist()
+        errors[empty] = f"Поле '{field_name}' не может быть пустым"
+        
+        below = np.zeros(len(column), dtype=bool)
+        if min_value is not None:
+            below = parsed & (np.trunc(numbers) < min_value)
+            errors[below] = [
+                f"Поле '{field_name}': значение {result} меньше минимального {min_value}"
+                for result in values[below]
+            ]
+        if max_value is not None:
+            above = parsed & ~below & (np.trunc(numbers) > max_value)
+            errors[above] = [
+                f"Поле '{field_name}': значение {result} больше максимального {max_value}"
+                for result in values[above]
+            ]
+        
+        _validate_cells(
+            column, ~empty & ~parsed,
+            lambda value: DataTypeValidator.validate_integer(value, field_name, min_value, max_value),
+            values, errors
+        )
+        return _column_result(column, values, errors)
+    
+    @staticmethod
+    def validate_float_column(column: pd.Series, field_name: str,
+                              min_value: Optional[float] = None,
+                              max_value: Optional[float] = None,
+                              precision: int = 2) -> pd.DataFrame:
+        """Векторная валидация чисел с плавающей точкой"""
+        numbers, empty, _ = _parse_numbers(column, _clean_number_text)
+        parsed = ~empty & np.isfinite(numbers)
+        values = numbers
+        if precision:
+            values, exact = _round_half_up(numbers, precision)
+            parsed &= exact
+        errors = np.full(len(column), None, dtype=object)
+        
+        errors[empty] = f"Поле '{field_name}' не может быть пустым"
+        below = np.zeros(len(column), dtype=bool)
+        if min_value is not None:
+            below = parsed & (values < min_value)
+            errors[below] = [
+                f"Поле '{field_name}': значение {result:.{precision}f} "
+                f"меньше минимального {min_value}"
+                for result in values[below]
+            ]
+        if max_value is not None:
+            above = parsed & ~below & (values > max_value)
+            errors[above] = [
+                f"Поле '{field_name}': значение {result:.{precision}f} "
+                f"больше максимального {max_value}"
+                for result in values[above]
+            ]
+        
+        _validate_cells(
+            column, ~empty & ~parsed,
+            lambda value: DataTypeValidator.validate_float(
+                value, field_name, min_value, max_value, precision
+            ),
+            values, errors
+        )
+        return _column_result(column, values, errors)
+    
+    @staticmethod
+    def validate_percentage_column(column: pd.Series, field_name: str) -> pd.DataFrame:
+        """Векторная валидация процентных значений"""
+        numbers, empty, is_float = _parse_numbers(column, _clean_percentage_text)
+        # Доли от pandas (0.008) -> проценты (0.8), только для ячеек типа float
+        numbers = np.where(is_float & (numbers < 0.01), numbers * 100, numbers)
+        values, exact = _round_half_up(numbers, 4)
+        parsed = ~empty & np.isfinite(numbers) & exact
+        errors = np.full(len(column), None, dtype=object)
+        
+        errors[empty] = f"Поле '{field_name}' не может быть пустым"
+        negative = parsed & (numbers < 0)
+        errors[negative] = f"Поле '{field_name}': процент не может быть отрицательным"
+        errors[parsed & (numbers > 100)] = f"Поле '{field_name}': процент не может превышать 100%"
+        
+        _validate_cells(
+            column, ~empty & ~parsed,
+            lambda value: DataTypeValidator.validate_percentage(value, field_name),
+            values, errors
+        )
+        return _column_result(column, values, errors)
+    
+    @staticmethod
+    def validate_positive_float_column(column: pd.Series, field_name: str,
+                                       precision: int = 2) -> pd.DataFrame:
+        """Векторная валидация положительных чисел"""
+        result = DataTypeValidator.validate_float_column(column, field_name, precision=precision)
+        negative = result['error'].isna() & (result['value'] < 0)
+        result.loc[negative, 'error'] = f"Поле '{field_name}' не может быть отрицательным"
+        result.loc[negative, 'value'] = np.nan
+        return result
+    
+    @staticmethod
+    def validate_positive_integer_column(column: pd.Series, field_name: str) -> pd.DataFrame:
+        """Векторная валидация положительных целых чисел"""
+        return DataTypeValidator.validate_integer_column(column, field_name, min_value=1)
+
+# =========== ВЕКТОРНАЯ ПРОВЕРКА: ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ===========
+
+# Виды ячеек столбца с object dtype
+_TEXT, _FLOAT, _NUMBER, _OTHER = range(4)
+
+def _cell_kind(value) -> int:
+    if isinstance(value, str):
+        return _TEXT
+    if isinstance(value, float):
+        return _FLOAT
+    if isinstance(value, (int, np.integer, np.floating)):
+        return _NUMBER
+    return _OTHER
+
+def _clean_number_text(text: pd.Series) -> pd.Series:
+    """Как в validate_integer / validate_float: без пробелов и разделителей"""
+    return text.str.replace(' ', '').str.replace(',', '').str.strip()
+
+def _clean_percentage_text(text: pd.Series) -> pd.Series:
+    """Как в validate_percentage: без знака %, запятая - десятичный разделитель"""
+    return text.str.replace('%', '').str.strip().str.replace(',', '.')
+
+def _float_or_nan(value) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError, OverflowError):
+        return np.nan
+
+def _to_float(cells: pd.Series) -> np.ndarray:
+    """float() для каждой ячейки; NaN, если значение не число"""
+    try:
+        # astype(float) вызывает float() - тот же разбор, что и построчно
+        # (pd.to_numeric разбирает строки с расхождением в последнем бите)
+        return cells.astype(float).to_numpy()
+    except (ValueError, TypeError, OverflowError):
+        return cells.map(_float_or_nan).to_numpy(dtype=float)
+
+def _parse_numbers(column: pd.Series, clean_text):
+    """
+    Числа столбца так же, как float() в построчной проверке
+    
+    Returns:
+        numbers - значения (NaN, если ячейку нельзя разобрать векторно),
+        empty - маска пустых ячеек, is_float - маска ячеек типа float
+    """
+    empty = column.isna().to_numpy()
+    if is_numeric_dtype(column.dtype) and not is_bool_dtype(column.dtype):
+        numbers = column.to_numpy(dtype=float, na_value=np.nan)
+        is_float = np.full(len(column), column.dtype == np.float64)
+        return numbers, empty, is_float
+    
+    cells = column.to_numpy(dtype=object)
+    kinds = np.fromiter(map(_cell_kind, cells), dtype=np.int8, count=len(cells))
+    numbers = np.full(len(cells), np.nan)
+    
+    is_number = (kinds == _FLOAT) | (kinds == _NUMBER)
+    numbers[is_number] = _to_float(pd.Series(cells[is_number], dtype=object))
+    is_text = kinds == _TEXT
+    numbers[is_text] = _to_float(clean_text(pd.Series(cells[is_text], dtype=object)))
+    return numbers, empty, kinds == _FLOAT
+
+def _round_half_up(numbers: np.ndarray, precision: int):
+    """
+    Округление как Decimal(str(value)).quantize(..., ROUND_HALF_UP)
+    
+    Returns:
+        Округленные значения и маска точных: у середины (x.5) двоичное
+        значение может округлиться иначе, чем его десятичная запись, -
+        такие ячейки проверяются построчно
+    """
+    scale = 10.0 ** precision
+    with np.errstate(invalid='ignore', over='ignore'):
+        scaled = np.abs(numbers) * scale
+        whole = np.floor(scaled)
+        fraction = scaled - whole
+        exact = (scaled < 2 ** 52) & (np.abs(fraction - 0.5) > 1e-12 * np.maximum(scaled, 1.0))
+        rounded = np.copysign((whole + (fraction > 0.5)) / scale, numbers)
+    return rounded, exact
+
+def _validate_cells(column: pd.Series, mask: np.ndarray, validate, values, errors):
+    """Построчная проверка отдельных ячеек с записью результата в values / errors"""
+    cells = column.to_numpy(dtype=object)
+    for position in np.flatnonzero(mask):
+        try:
+            values[position] = validate(cells[position])
+        except ValueError as e:
+            errors[position] = str(e)
+        except Exception as e:
+            errors[position] = f"Неожиданная ошибка: {e}"
+
+def _column_result(column: pd.Series, values, errors) -> pd.DataFrame:
+    failed = pd.notna(errors)
+    return pd.DataFrame({
+        'value': pd.Series(values, index=column.index).mask(failed),
+        'error': errors,
+    }, index=column.index)
 
 def clean_number(value: Any) -> float:
     """Очистка числовых значений с валидацией"""
@@ -201,6 +461,124 @@ def clean_percentage(value: Any) -> float:
         logger.warning(f"Ошибка валидации процента: {e}")
         return 0.0
 
+# =========== РАЗБОР СТРОК ===========
+# Общие для обычного (pandas) и потокового (openpyxl) импорта:
+# row - любая строка с доступом по названию столбца (pd.Series или dict)
+
+# Правила проверки столбцов: (ключ, столбец, название поля, проверка, параметры).
+# Проверка - суффикс метода DataTypeValidator: validate_<проверка> для одной
+# ячейки (parse_*_row) и validate_<проверка>_column для столбца (validate_frame)
+MATERIAL_TYPE_RULES = [
+    ('name', 'Тип материала', 'Тип материала', 'string', {'max_length': 100}),
+    ('loss_percentage', 'Процент потерь сырья', 'Процент потерь сырья', 'percentage', {}),
+]
+
+PRODUCT_TYPE_RULES = [
+    ('name', 'Тип продукции', 'Тип продукции', 'string', {'max_length': 100}),
+    ('coefficient', 'Коэффициент типа продукции', 'Коэффициент типа продукции',
+     'positive_float', {'precision': 2}),
+]
+
+WORKSHOP_RULES = [
+    ('name', 'Название цеха', 'Название цеха', 'string', {'max_length': 100}),
+    ('workshop_type', 'Тип цеха', 'Тип цеха', 'string', {'max_length': 50}),
+    ('employee_count', 'Количество человек для производства',
+     'Количество человек для производства', 'positive_integer', {}),
+]
+
+# Справочники - по названиям
+PRODUCT_RULES = [
+    ('material_name', 'Основной материал', 'Основной материал', 'string', {'max_length': 100}),
+    ('product_type_name', 'Тип продукции', 'Тип продукции', 'string', {'max_length': 100}),
+    ('name', 'Наименование продукции', 'Наименование продукции', 'string', {'max_length': 200}),
+    # Артикул - целое число
+    ('article', 'Артикул', 'Артикул', 'integer', {'min_value': 1}),
+    ('min_partner_price', 'Минимальная стоимость для партнера',
+     'Минимальная стоимость для партнера', 'positive_float', {'precision': 2}),
+]
+
+PRODUCT_WORKSHOP_RULES = [
+    ('product_name', 'Наименование продукции', 'Наименование продукции', 'string',
+     {'max_length': 200}),
+    ('workshop_name', 'Название цеха', 'Название цеха', 'string', {'max_length': 100}),
+    ('manufacturing_time_hours', 'Время изготовления, ч', 'Время изготовления',
+     'positive_float', {'precision': 1}),
+]
+
+def parse_row(row, rules) -> dict:
+    """Проверить строку по правилам столбцов (первая ошибка - ValueError)"""
+    return {
+        key: getattr(DataTypeValidator, f'validate_{check}')(row[column], field_name, **options)
+        for key, column, field_name, check, options in rules
+    }
+
+def parse_material_type_row(row) -> dict:
+    """Проверить строку типа материала"""
+    return parse_row(row, MATERIAL_TYPE_RULES)
+
+def parse_product_type_row(row) -> dict:
+    """Проверить строку типа продукции"""
+    return parse_row(row, PRODUCT_TYPE_RULES)
+
+def parse_workshop_row(row) -> dict:
+    """Проверить строку цеха"""
+    return parse_row(row, WORKSHOP_RULES)
+
+def parse_product_row(row) -> dict:
+    """Проверить строку продукции (справочники - по названиям)"""
+    return parse_row(row, PRODUCT_RULES)
+
+def parse_product_workshop_row(row) -> dict:
+    """Проверить строку связи продукции и цеха"""
+    return parse_row(row, PRODUCT_WORKSHOP_RULES)
+
+def validate_frame(df: pd.DataFrame, rules) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Векторная проверка таблицы по правилам столбцов
+    
+    Результат тот же, что у parse_row для каждой строки df.
+    
+    Returns:
+        Проверенные строки без ошибок (столбцы - ключи правил, индекс - из df)
+        и таблица ошибок: row - номер строки Excel (индекс + 2), error - первая
+        ошибка строки в порядке правил
+    """
+    values = {}
+    errors = pd.Series(None, index=df.index, dtype=object)
+    
+    for key, column, field_name, check, options in rules:
+        if column in df.columns:
+            validate = getattr(DataTypeValidator, f'validate_{check}_column')
+            result = validate(df[column], field_name, **options)
+            values[key] = result['value']
+            column_errors = result['error']
+        else:
+            values[key] = pd.Series(None, index=df.index, dtype=object)
+            column_errors = pd.Series(
+                f"Отсутствует столбец: {KeyError(column)}", index=df.index, dtype=object
+            )
+        errors = errors.fillna(column_errors)
+    
+    failed = errors.notna().to_numpy()
+    error_frame = pd.DataFrame({
+        'row': df.index[failed] + 2,
+        'error': errors[failed].to_numpy(),
+    })
+    return pd.DataFrame(values, index=df.index)[~failed], error_frame
+
+def log_frame_errors(errors: pd.DataFrame) -> int:
+    """Записать ошибки validate_frame в журнал, вернуть их количество"""
+    for row, message in zip(errors['row'], errors['error']):
+        logger.error(f"Строка {row}: {message}")
+    return len(errors)
+
+def iter_valid_rows(records: pd.DataFrame):
+    """Пары (индекс строки, данные) проверенной таблицы"""
+    return zip(records.index, records.to_dict('records'))
+
+# =========== ИМПОРТ ИЗ EXCEL (pandas) ===========
+# Таблица проверяется целиком (validate_frame), в цикле - только запись
+
 def import_material_types(session):
     """Импорт типов материалов с валидацией"""
     logger.info("Импорт типов материалов...")
@@ -211,19 +589,14 @@ def import_material_types(session):
         return
     
     df = pd.read_excel(file_path)
+    records, errors = validate_frame(df, MATERIAL_TYPE_RULES)
     imported_count = 0
-    error_count = 0
+    error_count = log_frame_errors(errors)
     
-    for idx, row in df.iterrows():
+    for idx, data in iter_valid_rows(records):
         try:
-            # Валидация данных
-            material_name = DataTypeValidator.validate_string(
-                row['Тип материала'], 'Тип материала', max_length=100
-            )
-            
-            loss_percentage = DataTypeValidator.validate_percentage(
-                row['Процент потерь сырья'], 'Процент потерь сырья'
-            )
+            material_name = data['name']
+            loss_percentage = data['loss_percentage']
             
             # Проверка уникальности имени
             existing = session.query(MaterialType).filter_by(name=material_name).first()
@@ -240,9 +613,6 @@ def import_material_types(session):
             
             logger.debug(f"Добавлен материал: {material_name} ({loss_percentage:.4f})")
             
-        except ValueError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: {e}")
         except Exception as e:
             error_count += 1
             logger.error(f"Строка {idx + 2}: Неожиданная ошибка: {e}")
@@ -260,19 +630,14 @@ def import_product_types(session):
         return
     
     df = pd.read_excel(file_path)
+    records, errors = validate_frame(df, PRODUCT_TYPE_RULES)
     imported_count = 0
-    error_count = 0
+    error_count = log_frame_errors(errors)
     
-    for idx, row in df.iterrows():
+    for idx, data in iter_valid_rows(records):
         try:
-            # Валидация данных
-            type_name = DataTypeValidator.validate_string(
-                row['Тип продукции'], 'Тип продукции', max_length=100
-            )
-            
-            coefficient = DataTypeValidator.validate_positive_float(
-                row['Коэффициент типа продукции'], 'Коэффициент типа продукции', precision=2
-            )
+            type_name = data['name']
+            coefficient = data['coefficient']
             
             # Проверка уникальности имени
             existing = session.query(ProductType).filter_by(name=type_name).first()
@@ -289,9 +654,6 @@ def import_product_types(session):
             
             logger.debug(f"Добавлен тип продукции: {type_name} (коэфф: {coefficient})")
             
-        except ValueError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: {e}")
         except Exception as e:
             error_count += 1
             logger.error(f"Строка {idx + 2}: Неожиданная ошибка: {e}")
@@ -325,24 +687,15 @@ def import_workshops(session):
         if old_col in df.columns:
             df = df.rename(columns={old_col: new_col})
     
+    records, errors = validate_frame(df, WORKSHOP_RULES)
     imported_count = 0
-    error_count = 0
+    error_count = log_frame_errors(errors)
     
-    for idx, row in df.iterrows():
+    for idx, data in iter_valid_rows(records):
         try:
-            # Валидация данных
-            workshop_name = DataTypeValidator.validate_string(
-                row['Название цеха'], 'Название цеха', max_length=100
-            )
-            
-            workshop_type = DataTypeValidator.validate_string(
-                row['Тип цеха'], 'Тип цеха', max_length=50
-            )
-            
-            employee_count = DataTypeValidator.validate_positive_integer(
-                row['Количество человек для производства'], 
-                'Количество человек для производства'
-            )
+            workshop_name = data['name']
+            workshop_type = data['workshop_type']
+            employee_count = data['employee_count']
             
             # Проверка уникальности имени
             existing = session.query(Workshop).filter_by(name=workshop_name).first()
@@ -360,12 +713,6 @@ def import_workshops(session):
             
             logger.debug(f"Добавлен цех: {workshop_name} ({employee_count} чел.)")
             
-        except ValueError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: {e}")
-        except KeyError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: Отсутствует столбец: {e}")
         except Exception as e:
             error_count += 1
             logger.error(f"Строка {idx + 2}: Неожиданная ошибка: {e}")
@@ -389,35 +736,18 @@ def import_products(session):
     material_map = {m.name: m.id for m in session.query(MaterialType).all()}
     product_type_map = {pt.name: pt.id for pt in session.query(ProductType).all()}
     
+    records, errors = validate_frame(df, PRODUCT_RULES)
     imported_count = 0
-    error_count = 0
+    error_count = log_frame_errors(errors)
     skipped_count = 0
     
-    for idx, row in df.iterrows():
+    for idx, data in iter_valid_rows(records):
         try:
-            # Валидация данных
-            material_name = DataTypeValidator.validate_string(
-                row['Основной материал'], 'Основной материал', max_length=100
-            )
-            
-            product_type_name = DataTypeValidator.validate_string(
-                row['Тип продукции'], 'Тип продукции', max_length=100
-            )
-            
-            product_name = DataTypeValidator.validate_string(
-                row['Наименование продукции'], 'Наименование продукции', max_length=200
-            )
-            
-            # Артикул - целое число
-            article = DataTypeValidator.validate_integer(
-                row['Артикул'], 'Артикул', min_value=1
-            )
-            
-            min_price = DataTypeValidator.validate_positive_float(
-                row['Минимальная стоимость для партнера'],
-                'Минимальная стоимость для партнера',
-                precision=2
-            )
+            material_name = data['material_name']
+            product_type_name = data['product_type_name']
+            product_name = data['name']
+            article = data['article']
+            min_price = data['min_partner_price']
             
             # Проверяем существование справочников
             if material_name not in material_map:
@@ -452,12 +782,6 @@ def import_products(session):
             
             logger.debug(f"Добавлен продукт: {product_name} (арт: {article})")
             
-        except ValueError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: {e}")
-        except KeyError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: Отсутствует столбец: {e}")
         except Exception as e:
             error_count += 1
             logger.error(f"Строка {idx + 2}: Неожиданная ошибка: {e}")
@@ -484,26 +808,26 @@ def import_product_workshop_links(session):
     product_map = {p.name: p.id for p in session.query(Product).all()}
     workshop_map = {w.name: w.id for w in session.query(Workshop).all()}
     
+    # Уже существующие связи загружаем один раз - проверка дубликатов
+    # идет по множеству, без запроса на каждую строку
+    existing_links = set(
+        session.execute(
+            select(product_workshop_table.c.product_id, product_workshop_table.c.workshop_id)
+        ).tuples()
+    )
+    new_links = []
+    
+    records, errors = validate_frame(df, PRODUCT_WORKSHOP_RULES)
     imported_count = 0
-    error_count = 0
+    error_count = log_frame_errors(errors)
     skipped_count = 0
+    linked_product_ids = set()
     
-    for idx, row in df.iterrows():
+    for idx, data in iter_valid_rows(records):
         try:
-            # Валидация данных
-            product_name = DataTypeValidator.validate_string(
-                row['Наименование продукции'], 'Наименование продукции', max_length=200
-            )
-            
-            workshop_name = DataTypeValidator.validate_string(
-                row['Название цеха'], 'Название цеха', max_length=100
-            )
-            
-            manufacturing_time = DataTypeValidator.validate_positive_float(
-                row['Время изготовления, ч'],
-                'Время изготовления',
-                precision=1
-            )
+            product_name = data['product_name']
+            workshop_name = data['workshop_name']
+            manufacturing_time = data['manufacturing_time_hours']
             
             if product_name not in product_map:
                 skipped_count += 1
@@ -515,16 +839,10 @@ def import_product_workshop_links(session):
                 logger.warning(f"Строка {idx + 2}: Цех '{workshop_name}' не найден, пропускаем")
                 continue
             
-            # Проверяем, не существует ли уже такая связь
-            existing_link = session.execute(
-                select(product_workshop_table)
-                .where(
-                    (product_workshop_table.c.product_id == product_map[product_name]) &
-                    (product_workshop_table.c.workshop_id == workshop_map[workshop_name])
-                )
-            ).fetchone()
+            # Проверяем, не существует ли уже такая связь (в БД или выше в файле)
+            link = (product_map[product_name], workshop_map[workshop_name])
             
-            if existing_link:
+            if link in existing_links:
                 logger.warning(
                     f"Строка {idx + 2}: Связь продукта '{product_name}' с цехом "
                     f"'{workshop_name}' уже существует, пропускаем"
@@ -532,39 +850,823 @@ def import_product_workshop_links(session):
                 skipped_count += 1
                 continue
             
-            # Добавляем связь во вспомогательную таблицу
-            session.execute(
-                product_workshop_table.insert().values(
-                    product_id=product_map[product_name],
-                    workshop_id=workshop_map[workshop_name],
-                    manufacturing_time_hours=manufacturing_time
-                )
-            )
+            # Связь будет добавлена одной пакетной вставкой после цикла
+            new_links.append({
+                'product_id': link[0],
+                'workshop_id': link[1],
+                'manufacturing_time_hours': manufacturing_time
+            })
+            existing_links.add(link)
             imported_count += 1
+            linked_product_ids.add(product_map[product_name])
             
             logger.debug(
                 f"Добавлена связь: '{product_name}' - '{workshop_name}' "
                 f"({manufacturing_time} ч)"
             )
             
-        except ValueError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: {e}")
-        except KeyError as e:
-            error_count += 1
-            logger.error(f"Строка {idx + 2}: Отсутствует столбец: {e}")
         except Exception as e:
             error_count += 1
             logger.error(f"Строка {idx + 2}: Неожиданная ошибка: {e}")
     
+    # Добавляем связи во вспомогательную таблицу (executemany)
+    if new_links:
+        session.execute(product_workshop_table.insert(), new_links)
+    
+    # Пересчитываем сохраненное время изготовления для затронутых продуктов
+    refresh_production_times(session, linked_product_ids)
+    
     session.commit()
     logger.info(
         f"Импортировано {imported_count} связей, "
         f"пропущено: {skipped_count}, ошибок: {error_count}"
     )
 
-def main():
+# =========== ПОТОКОВЫЙ ИМПОРТ ===========
+# Строки читаются из Excel по одной (openpyxl read-only), проверяются
+# пачками и вставляются через executemany. Память ограничена размером
+# пачки, а не размером файла. Проверки дубликатов - по заранее
+# загруженным множествам, без запроса на каждую строку.
+
+def iter_excel_rows(file_path):
+    """
+    Построчно читать лист Excel
+    
+    Yields:
+        (номер строки в Excel, словарь {название столбца: значение})
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        
+        # Очищаем названия столбцов, как df.columns.str.strip()
+        columns = [str(name).strip() if name is not None else '' for name in header]
+        
+        for row_number, values in enumerate(rows, start=2):
+            # Полностью пустые строки pandas тоже не возвращает
+            if all(value is None for value in values):
+                continue
+            yield row_number, dict(zip(columns, values))
+    finally:
+        workbook.close()
+
+def chunked(iterable, size: int):
+    """Разбить поток на списки по size элементов"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def stream_rows_to_table(session, file_key: str, table, build_record, batch_size: int):
+    """
+    Потоково загрузить файл в таблицу
+    
+    build_record(row_number, row) возвращает словарь для вставки
+    или None, если строку нужно пропустить (причину логирует сам).
+    Фиксацию (commit) выполняет вызывающий код.
+    
+    Returns:
+        (импортировано, пропущено, ошибок) или None, если файла нет
+    """
+    file_path = EXCEL_FILES[file_key]
+    if not file_path.exists():
+        logger.error(f"Файл не найден: {file_path}")
+        return None
+    
+    return write_rows_to_table(session, iter_excel_rows(file_path), table, build_record, batch_size)
+
+def write_rows_to_table(session, rows, table, build_record, batch_size: int):
+    """
+    Вставить строки (номер строки, данные) пачками по batch_size
+    
+    Returns:
+        (импортировано, пропущено, ошибок)
+    """
+    imported_count = 0
+    skipped_count = 0
+    error_count = 0
+    
+    for chunk in chunked(rows, batch_size):
+        records = []
+        for row_number, row in chunk:
+            try:
+                record = build_record(row_number, row)
+            except ValueError as e:
+                error_count += 1
+                logger.error(f"Строка {row_number}: {e}")
+                continue
+            except KeyError as e:
+                error_count += 1
+                logger.error(f"Строка {row_number}: Отсутствует столбец: {e}")
+                continue
+            
+            if record is None:
+                skipped_count += 1
+                continue
+            records.append(record)
+        
+        if records:
+            # Одна команда executemany на пачку
+            session.execute(table.insert(), records)
+            imported_count += len(records)
+        
+        logger.debug(f"{table.name}: обработано строк до {chunk[-1][0]}")
+    
+    return imported_count, skipped_count, error_count
+
+def _log_stream_result(title: str, result):
+    if result is not None:
+        imported_count, skipped_count, error_count = result
+        logger.info(
+            f"Импортировано {imported_count} {title}, "
+            f"пропущено: {skipped_count}, ошибок: {error_count}"
+        )
+
+def _parsed(parse_row, build_record):
+    """build_record по исходной строке Excel: сначала разбор parse_row"""
+    return lambda row_number, row: build_record(row_number, parse_row(row))
+
+# Проверка разобранных строк перед вставкой. Фабрики загружают из БД
+# нужные множества и справочники и возвращают build_record(row_number, data)
+# для stream_rows_to_table / write_rows_to_table.
+
+def material_type_records(session):
+    """Типы материалов: пропуск уже существующих названий"""
+    existing_names = {name for (name,) in session.query(MaterialType.name)}
+    
+    def build_record(row_number, data):
+        if data['name'] in existing_names:
+            logger.warning(f"Материал '{data['name']}' уже существует, пропускаем")
+            return None
+        existing_names.add(data['name'])
+        return data
+    
+    return build_record
+
+def product_type_records(session):
+    """Типы продукции: пропуск уже существующих названий"""
+    existing_names = {name for (name,) in session.query(ProductType.name)}
+    
+    def build_record(row_number, data):
+        if data['name'] in existing_names:
+            logger.warning(f"Тип продукции '{data['name']}' уже существует, пропускаем")
+            return None
+        existing_names.add(data['name'])
+        return data
+    
+    return build_record
+
+def workshop_records(session):
+    """Цеха: пропуск уже существующих названий"""
+    existing_names = {name for (name,) in session.query(Workshop.name)}
+    
+    def build_record(row_number, data):
+        if data['name'] in existing_names:
+            logger.warning(f"Цех '{data['name']}' уже существует, пропускаем")
+            return None
+        existing_names.add(data['name'])
+        return data
+    
+    return build_record
+
+def product_records(session):
+    """Продукция: названия справочников -> ID, пропуск существующих артикулов"""
+    material_map = dict(session.query(MaterialType.name, MaterialType.id).all())
+    product_type_map = dict(session.query(ProductType.name, ProductType.id).all())
+    existing_articles = {article for (article,) in session.query(Product.article)}
+    
+    def build_record(row_number, data):
+        article = str(data['article'])
+        
+        if data['material_name'] not in material_map:
+            logger.warning(
+                f"Строка {row_number}: Материал '{data['material_name']}' не найден, пропускаем"
+            )
+            return None
+        
+        if data['product_type_name'] not in product_type_map:
+            logger.warning(
+                f"Строка {row_number}: Тип продукции '{data['product_type_name']}' "
+                f"не найден, пропускаем"
+            )
+            return None
+        
+        if article in existing_articles:
+            logger.warning(
+                f"Строка {row_number}: Продукт с артикулом '{article}' уже существует, пропускаем"
+            )
+            return None
+        existing_articles.add(article)
+        
+        return {
+            'article': article,  # Храним как строку для гибкости
+            'name': data['name'],
+            'product_type_id': product_type_map[data['product_type_name']],
+            'material_id': material_map[data['material_name']],
+            'min_partner_price': data['min_partner_price'],
+        }
+    
+    return build_record
+
+def product_workshop_records(session, linked_product_ids: set):
+    """
+    Связи продукции и цехов: названия -> ID, пропуск существующих связей
+    
+    ID продуктов с новыми связями добавляются в linked_product_ids
+    (для пересчета сохраненного времени изготовления)
+    """
+    product_map = dict(session.query(Product.name, Product.id).all())
+    workshop_map = dict(session.query(Workshop.name, Workshop.id).all())
+    existing_links = set(
+        session.execute(
+            select(product_workshop_table.c.product_id, product_workshop_table.c.workshop_id)
+        ).tuples()
+    )
+    
+    def build_record(row_number, data):
+        if data['product_name'] not in product_map:
+            logger.warning(
+                f"Строка {row_number}: Продукт '{data['product_name']}' не найден, пропускаем"
+            )
+            return None
+        
+        if data['workshop_name'] not in workshop_map:
+            logger.warning(
+                f"Строка {row_number}: Цех '{data['workshop_name']}' не найден, пропускаем"
+            )
+            return None
+        
+        link = (product_map[data['product_name']], workshop_map[data['workshop_name']])
+        if link in existing_links:
+            logger.warning(
+                f"Строка {row_number}: Связь продукта '{data['product_name']}' с цехом "
+                f"'{data['workshop_name']}' уже существует, пропускаем"
+            )
+            return None
+        existing_links.add(link)
+        linked_product_ids.add(link[0])
+        
+        return {
+            'product_id': link[0],
+            'workshop_id': link[1],
+            'manufacturing_time_hours': data['manufacturing_time_hours'],
+        }
+    
+    return build_record
+
+def stream_import_material_types(session, batch_size: int):
+    """Потоковый импорт типов материалов"""
+    logger.info("Импорт типов материалов (потоковый режим)...")
+    build_record = _parsed(parse_material_type_row, material_type_records(session))
+    
+    result = stream_rows_to_table(
+        session, 'material_types', MaterialType.__table__, build_record, batch_size
+    )
+    session.commit()
+    _log_stream_result("типов материалов", result)
+
+def stream_import_product_types(session, batch_size: int):
+    """Потоковый импорт типов продукции"""
+    logger.info("Импорт типов продукции (потоковый режим)...")
+    build_record = _parsed(parse_product_type_row, product_type_records(session))
+    
+    result = stream_rows_to_table(
+        session, 'product_types', ProductType.__table__, build_record, batch_size
+    )
+    session.commit()
+    _log_stream_result("типов продукции", result)
+
+def stream_import_workshops(session, batch_size: int):
+    """Потоковый импорт цехов"""
+    logger.info("Импорт цехов (потоковый режим)...")
+    build_record = _parsed(parse_workshop_row, workshop_records(session))
+    
+    result = stream_rows_to_table(
+        session, 'workshops', Workshop.__table__, build_record, batch_size
+    )
+    session.commit()
+    _log_stream_result("цехов", result)
+
+def stream_import_products(session, batch_size: int):
+    """Потоковый импорт продукции"""
+    logger.info("Импорт продукции (потоковый режим)...")
+    build_record = _parsed(parse_product_row, product_records(session))
+    
+    result = stream_rows_to_table(
+        session, 'products', Product.__table__, build_record, batch_size
+    )
+    session.commit()
+    _log_stream_result("продуктов", result)
+
+def stream_import_product_workshop_links(session, batch_size: int):
+    """Потоковый импорт связей продукции и цехов"""
+    logger.info("Импорт связей продукции и цехов (потоковый режим)...")
+    linked_product_ids = set()
+    build_record = _parsed(
+        parse_product_workshop_row, product_workshop_records(session, linked_product_ids)
+    )
+    
+    result = stream_rows_to_table(
+        session, 'product_workshop', product_workshop_table, build_record, batch_size
+    )
+    # Пересчитываем сохраненное время изготовления для затронутых продуктов
+    refresh_production_times(session, linked_product_ids)
+    session.commit()
+    _log_stream_result("связей", result)
+
+# =========== ПАРАЛЛЕЛЬНЫЙ ИМПОРТ ===========
+# Книги разбираются и проверяются в пуле процессов (разбор Excel занимает
+# основное время), записывает один писатель в главном процессе в порядке
+# зависимостей. Справочники и цеха друг от друга не зависят, продукции
+# и связям нужны ID из уже записанных таблиц - их разбор идет параллельно,
+# а сопоставление названий с ID выполняет писатель. Разобранные строки
+# книги передаются в главный процесс целиком: память пропорциональна
+# размеру файла (для очень больших файлов - потоковый режим).
+
+# (ключ файла, разбор строки, название для журнала) в порядке записи
+IMPORT_STAGES = [
+    ('material_types', parse_material_type_row, "типов материалов"),
+    ('product_types', parse_product_type_row, "типов продукции"),
+    ('workshops', parse_workshop_row, "цехов"),
+    ('products', parse_product_row, "продуктов"),
+    ('product_workshop', parse_product_workshop_row, "связей"),
+]
+
+def parse_workbook(file_key: str, file_path: str) -> dict:
+    """
+    Разобрать и проверить книгу (выполняется в процессе пула)
+    
+    Returns:
+        rows - [(номер строки, данные)], errors - [(номер строки, сообщение)],
+        seconds - время разбора
+    """
+    started = time.perf_counter()
+    parse_row = next(parse for key, parse, _ in IMPORT_STAGES if key == file_key)
+    rows = []
+    errors = []
+    
+    for row_number, row in iter_excel_rows(file_path):
+        try:
+            rows.append((row_number, parse_row(row)))
+        except ValueError as e:
+            errors.append((row_number, str(e)))
+        except KeyError as e:
+            errors.append((row_number, f"Отсутствует столбец: {e}"))
+    
+    return {"rows": rows, "errors": errors, "seconds": time.perf_counter() - started}
+
+def parallel_import(session, batch_size: int, workers: int) -> dict:
+    """
+    Разбор книг в workers процессах, запись одним писателем
+    
+    Returns:
+        Время этапов: {ключ файла: {"parse": разбор в процессе пула,
+        "wait": ожидание разбора писателем, "write": запись}} в секундах
+    """
+    tables = {
+        'material_types': MaterialType.__table__,
+        'product_types': ProductType.__table__,
+        'workshops': Workshop.__table__,
+        'products': Product.__table__,
+        'product_workshop': product_workshop_table,
+    }
+    linked_product_ids = set()
+    # Фабрики вызываются перед записью этапа: им нужны данные прошлых этапов
+    builders = {
+        'material_types': lambda: material_type_records(session),
+        'product_types': lambda: product_type_records(session),
+        'workshops': lambda: workshop_records(session),
+        'products': lambda: product_records(session),
+        'product_workshop': lambda: product_workshop_records(session, linked_product_ids),
+    }
+    timings = {}
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for file_key, _, _ in IMPORT_STAGES:
+            file_path = EXCEL_FILES[file_key]
+            if file_path.exists():
+                futures[file_key] = pool.submit(parse_workbook, file_key, str(file_path))
+            else:
+                logger.error(f"Файл не найден: {file_path}")
+        
+        for file_key, _, title in IMPORT_STAGES:
+            if file_key not in futures:
+                continue
+            
+            wait_started = time.perf_counter()
+            parsed = futures[file_key].result()
+            write_started = time.perf_counter()
+            
+            for row_number, message in parsed["errors"]:
+                logger.error(f"Строка {row_number}: {message}")
+            imported_count, skipped_count, error_count = write_rows_to_table(
+                session, parsed["rows"], tables[file_key], builders[file_key](), batch_size
+            )
+            if file_key == 'product_workshop':
+                refresh_production_times(session, linked_product_ids)
+            session.commit()
+            _log_stream_result(
+                title, (imported_count, skipped_count, error_count + len(parsed["errors"]))
+            )
+            
+            timings[file_key] = {
+                "parse": parsed["seconds"],
+                "wait": write_started - wait_started,
+                "write": time.perf_counter() - write_started,
+            }
+    
+    return timings
+
+def run_stages(stages) -> dict:
+    """
+    Выполнить этапы последовательно, замеряя время
+    
+    Returns:
+        {название этапа: {"write": секунды}}
+    """
+    timings = {}
+    for name, stage in stages:
+        started = time.perf_counter()
+        stage()
+        timings[name] = {"write": time.perf_counter() - started}
+    return timings
+
+def print_stage_timings(timings: dict, total_seconds: float):
+    """Время этапов импорта"""
+    print("\nВРЕМЯ ЭТАПОВ (с):")
+    print("-" * 60)
+    print(f"{'Этап':<20}{'Разбор':>10}{'Ожидание':>10}{'Запись':>10}{'Всего':>10}")
+    for name, stage in timings.items():
+        # Для последовательных режимов разбор входит в запись
+        parse = f"{stage['parse']:.2f}" if "parse" in stage else "-"
+        wait = stage.get("wait", 0.0)
+        print(
+            f"{name:<20}{parse:>10}{wait:>10.2f}{stage['write']:>10.2f}"
+            f"{wait + stage['write']:>10.2f}"
+        )
+    print(f"{'Итого':<20}{'':>30}{total_seconds:>10.2f}")
+
+# =========== ИНКРЕМЕНТАЛЬНЫЙ ИМПОРТ ===========
+# Для каждой строки файла считается хэш проверенных данных и сохраняется
+# в import_row_hashes по естественному ключу (название, артикул, пара
+# продукт-цех). При повторном импорте строки с прежним хэшем пропускаются,
+# измененные обновляются по ключу, новые вставляются - работа
+# пропорциональна изменениям. С --delete-missing удаляются записи,
+# которых больше нет в файле (справочники - только неиспользуемые).
+
+def row_hash(data: dict) -> str:
+    """Хэш проверенных данных строки"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+def _link_key(product_name: str, workshop_name: str) -> str:
+    return json.dumps([product_name, workshop_name], ensure_ascii=False)
+
+def _catalog_source(model):
+    """Справочник или цеха: ключ - название, запись - проверенные данные"""
+    def existing_ids(session):
+        return dict(session.query(model.name, model.id).all())
+    
+    def build_record(session):
+        return lambda row_number, data: data
+    
+    return existing_ids, lambda data: data['name'], build_record
+
+def _product_source():
+    """Продукция: ключ - артикул, справочники - по названиям"""
+    def existing_ids(session):
+        return dict(session.query(Product.article, Product.id).all())
+    
+    def build_record(session):
+        material_map = dict(session.query(MaterialType.name, MaterialType.id).all())
+        product_type_map = dict(session.query(ProductType.name, ProductType.id).all())
+        
+        def build(row_number, data):
+            if data['material_name'] not in material_map:
+                logger.warning(
+                    f"Строка {row_number}: Материал '{data['material_name']}' не найден, пропускаем"
+                )
+                return None
+            if data['product_type_name'] not in product_type_map:
+                logger.warning(
+                    f"Строка {row_number}: Тип продукции '{data['product_type_name']}' "
+                    f"не найден, пропускаем"
+                )
+                return None
+            return {
+                'article': str(data['article']),
+                'name': data['name'],
+                'product_type_id': product_type_map[data['product_type_name']],
+                'material_id': material_map[data['material_name']],
+                'min_partner_price': data['min_partner_price'],
+            }
+        
+        return build
+    
+    return existing_ids, lambda data: str(data['article']), build_record
+
+def _product_workshop_source():
+    """Связи: ключ - (наименование продукции, название цеха)"""
+    def existing_ids(session):
+        rows = session.execute(
+            select(product_workshop_table.c.id, Product.name, Workshop.name)
+            .join(Product, Product.id == product_workshop_table.c.product_id)
+            .join(Workshop, Workshop.id == product_workshop_table.c.workshop_id)
+        ).all()
+        return {_link_key(product_name, workshop_name): link_id
+                for link_id, product_name, workshop_name in rows}
+    
+    def build_record(session):
+        product_map = dict(session.query(Product.name, Product.id).all())
+        workshop_map = dict(session.query(Workshop.name, Workshop.id).all())
+        
+        def build(row_number, data):
+            if data['product_name'] not in product_map:
+                logger.warning(
+                    f"Строка {row_number}: Продукт '{data['product_name']}' не найден, пропускаем"
+                )
+                return None
+            if data['workshop_name'] not in workshop_map:
+                logger.warning(
+                    f"Строка {row_number}: Цех '{data['workshop_name']}' не найден, пропускаем"
+                )
+                return None
+            return {
+                'product_id': product_map[data['product_name']],
+                'workshop_id': workshop_map[data['workshop_name']],
+                'manufacturing_time_hours': data['manufacturing_time_hours'],
+            }
+        
+        return build
+    
+    return (
+        existing_ids,
+        lambda data: _link_key(data['product_name'], data['workshop_name']),
+        build_record
+    )
+
+# ключ файла -> (таблица, разбор строки, (ID по ключу, ключ строки, фабрика записей))
+INCREMENTAL_SOURCES = {
+    'material_types': (MaterialType.__table__, parse_material_type_row, _catalog_source(MaterialType)),
+    'product_types': (ProductType.__table__, parse_product_type_row, _catalog_source(ProductType)),
+    'workshops': (Workshop.__table__, parse_workshop_row, _catalog_source(Workshop)),
+    'products': (Product.__table__, parse_product_row, _product_source()),
+    'product_workshop': (
+        product_workshop_table, parse_product_workshop_row, _product_workshop_source()
+    ),
+}
+
+def incremental_import_source(session, file_key: str, batch_size: int) -> Optional[dict]:
+    """
+    Инкрементально загрузить один файл
+    
+    Returns:
+        Счетчики (inserted, updated, unchanged, skipped, errors), ключи строк
+        файла (seen) и ID продуктов с измененными связями; None, если файла нет
+    """
+    file_path = EXCEL_FILES[file_key]
+    if not file_path.exists():
+        logger.error(f"Файл не найден: {file_path}")
+        return None
+    
+    table, parse_row, (load_existing_ids, natural_key, record_builder) = INCREMENTAL_SOURCES[file_key]
+    hashes = import_row_hashes_table
+    stored_hashes = dict(session.execute(
+        select(hashes.c.natural_key, hashes.c.row_hash).where(hashes.c.source == file_key)
+    ).all())
+    existing_ids = load_existing_ids(session)
+    build_record = record_builder(session)
+    
+    columns = [column.name for column in table.columns if column.name != 'id']
+    update_stmt = table.update()\
+        .where(table.c.id == bindparam('b_id'))\
+        .values({name: bindparam(f'b_{name}') for name in columns})
+    hash_stmt = sqlite_insert(hashes)
+    hash_stmt = hash_stmt.on_conflict_do_update(
+        index_elements=[hashes.c.source, hashes.c.natural_key],
+        set_={'row_hash': hash_stmt.excluded.row_hash}
+    )
+    
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'errors': 0}
+    seen = set()
+    touched_product_ids = set()
+    
+    for chunk in chunked(iter_excel_rows(file_path), batch_size):
+        inserts, updates, new_hashes = [], [], []
+        for row_number, row in chunk:
+            try:
+                data = parse_row(row)
+            except ValueError as e:
+                counts['errors'] += 1
+                logger.error(f"Строка {row_number}: {e}")
+                continue
+            except KeyError as e:
+                counts['errors'] += 1
+                logger.error(f"Строка {row_number}: Отсутствует столбец: {e}")
+                continue
+            
+            key = natural_key(data)
+            if key in seen:
+                counts['skipped'] += 1
+                logger.warning(f"Строка {row_number}: Ключ {key} повторяется в файле, пропускаем")
+                continue
+            seen.add(key)
+            
+            digest = row_hash(data)
+            if key in existing_ids and stored_hashes.get(key) == digest:
+                counts['unchanged'] += 1
+                continue
+            
+            record = build_record(row_number, data)
+            if record is None:
+                counts['skipped'] += 1
+                continue
+            
+            if key in existing_ids:
+                updates.append({'b_id': existing_ids[key],
+                                **{f'b_{name}': record[name] for name in columns}})
+            else:
+                inserts.append(record)
+            if 'product_id' in record:
+                touched_product_ids.add(record['product_id'])
+            new_hashes.append({'source': file_key, 'natural_key': key, 'row_hash': digest})
+        
+        # executemany на пачку: вставка, обновление по ID, хэши
+        if inserts:
+            session.execute(table.insert(), inserts)
+        if updates:
+            session.execute(update_stmt, updates)
+        if new_hashes:
+            session.execute(hash_stmt, new_hashes)
+        counts['inserted'] += len(inserts)
+        counts['updated'] += len(updates)
+    
+    return {'counts': counts, 'seen': seen, 'touched_product_ids': touched_product_ids}
+
+def delete_missing_rows(session, results: dict) -> dict:
+    """
+    Удалить записи, которых нет в файлах (в обратном порядке зависимостей)
+    
+    Файл пропускается, если его нет или в нем были ошибочные строки:
+    ключ ошибочной строки неизвестен, и запись ошибочно удалилась бы.
+    
+    Returns:
+        {ключ файла: удалено записей}, ID продуктов с удаленными связями
+    """
+    hashes = import_row_hashes_table
+    deleted = {}
+    touched_product_ids = set()
+    
+    for file_key in reversed(list(INCREMENTAL_SOURCES)):
+        result = results.get(file_key)
+        if result is None:
+            continue
+        if result['counts']['errors']:
+            logger.warning(f"{file_key}: в файле есть ошибочные строки, удаление пропущено")
+            continue
+        
+        table, _, (load_existing_ids, _, _) = INCREMENTAL_SOURCES[file_key]
+        missing = {key: row_id for key, row_id in load_existing_ids(session).items()
+                   if key not in result['seen']}
+        deleted[file_key] = 0
+        
+        for chunk in chunked(sorted(missing.values()), 500):
+            if file_key == 'product_workshop':
+                touched_product_ids.update(session.scalars(
+                    select(table.c.product_id).where(table.c.id.in_(chunk))
+                ))
+            elif file_key == 'products':
+                # Хэши связей удаляются вместе со связями, иначе остаются
+                # строки import_row_hashes без записей
+                link_keys = [
+                    _link_key(product_name, workshop_name)
+                    for product_name, workshop_name in session.execute(
+                        select(Product.name, Workshop.name)
+                        .join(product_workshop_table, product_workshop_table.c.product_id == Product.id)
+                        .join(Workshop, Workshop.id == product_workshop_table.c.workshop_id)
+                        .where(Product.id.in_(chunk))
+                    )
+                ]
+                for keys in chunked(link_keys, 500):
+                    session.execute(hashes.delete().where(
+                        (hashes.c.source == 'product_workshop') & hashes.c.natural_key.in_(keys)
+                    ))
+                session.execute(product_workshop_table.delete()
+                                .where(product_workshop_table.c.product_id.in_(chunk)))
+                session.execute(product_production_time_table.delete()
+                                .where(product_production_time_table.c.product_id.in_(chunk)))
+            
+            stmt = table.delete().where(table.c.id.in_(chunk))
+            if file_key in ('material_types', 'product_types'):
+                # Используемые справочники не удаляются
+                column = Product.material_id if file_key == 'material_types' else Product.product_type_id
+                stmt = stmt.where(~table.c.id.in_(select(column)))
+            elif file_key == 'workshops':
+                stmt = stmt.where(~table.c.id.in_(select(product_workshop_table.c.workshop_id)))
+            deleted[file_key] += session.execute(stmt).rowcount
+        
+        kept = len(missing) - deleted[file_key]
+        if kept:
+            logger.warning(f"{file_key}: {kept} записей нет в файле, но они используются - оставлены")
+        
+        for chunk in chunked(sorted(missing), 500):
+            session.execute(hashes.delete().where(
+                (hashes.c.source == file_key) & hashes.c.natural_key.in_(chunk)
+            ))
+    
+    return {'deleted': deleted, 'touched_product_ids': touched_product_ids}
+
+def incremental_import(session, batch_size: int, delete_missing: bool = False) -> dict:
+    """
+    Инкрементальный импорт всех файлов одной транзакцией на файл
+    
+    Returns:
+        Время этапов (как run_stages) и счетчики по файлам
+    """
+    titles = {key: title for key, _, title in IMPORT_STAGES}
+    results = {}
+    timings = {}
+    touched_product_ids = set()
+    
+    for file_key in INCREMENTAL_SOURCES:
+        started = time.perf_counter()
+        result = incremental_import_source(session, file_key, batch_size)
+        if result is not None:
+            results[file_key] = result
+            touched_product_ids |= result['touched_product_ids']
+            counts = result['counts']
+            if file_key != 'product_workshop':
+                session.commit()
+            logger.info(
+                f"Импорт {titles[file_key]}: новых {counts['inserted']}, "
+                f"изменено {counts['updated']}, без изменений {counts['unchanged']}, "
+                f"пропущено {counts['skipped']}, ошибок {counts['errors']}"
+            )
+        if file_key == 'product_workshop':
+            refresh_production_times(session, touched_product_ids)
+            session.commit()
+        timings[file_key] = {"write": time.perf_counter() - started}
+    
+    deleted = {}
+    if delete_missing:
+        started = time.perf_counter()
+        removal = delete_missing_rows(session, results)
+        deleted = removal['deleted']
+        refresh_production_times(session, removal['touched_product_ids'])
+        session.commit()
+        logger.info(f"Удалено отсутствующих в файлах записей: {deleted}")
+        timings['delete_missing'] = {"write": time.perf_counter() - started}
+    
+    return {
+        'timings': timings,
+        'counts': {key: {**result['counts'], 'deleted': deleted.get(key, 0)}
+                   for key, result in results.items()},
+    }
+
+def parse_args(argv=None):
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Импорт данных из Excel в базу данных")
+    # Режимы импорта взаимоисключающие
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--stream", action="store_true",
+        help="потоковый режим: построчное чтение и пакетная вставка (для больших файлов)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+        help=f"размер пачки строк в потоковом режиме (по умолчанию {IMPORT_BATCH_SIZE})"
+    )
+    mode.add_argument(
+        "--incremental", action="store_true",
+        help="инкрементальный режим: пропуск неизмененных строк, обновление по естественному ключу"
+    )
+    parser.add_argument(
+        "--delete-missing", action="store_true",
+        help="с --incremental: удалить записи, которых нет в файлах"
+    )
+    mode.add_argument(
+        "--parallel", action="store_true",
+        help="параллельный режим: разбор книг в пуле процессов, запись одним писателем"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=min(len(IMPORT_STAGES), os.cpu_count() or 1),
+        help="процессов разбора в параллельном режиме (по умолчанию - по числу ядер, до 5)"
+    )
+    args = parser.parse_args(argv)
+    if args.delete_missing and not args.incremental:
+        parser.error("--delete-missing используется только с --incremental")
+    return args
+
+def main(argv=None):
     """Основная функция импорта"""
+    args = parse_args(argv)
+    
     print("=" * 70)
     print("ИМПОРТ ДАННЫХ В БАЗУ ДАННЫХ С ПРОВЕРКОЙ ТИПОВ")
     print("=" * 70)
@@ -576,16 +1678,42 @@ def main():
     with get_session() as session:
         try:
             # Порядок импорта ВАЖЕН!
-            import_material_types(session)
-            import_product_types(session)
-            import_workshops(session)
-            import_products(session)
-            import_product_workshop_links(session)
+            started = time.perf_counter()
+            if args.incremental:
+                print(f"Инкрементальный режим, размер пачки: {args.batch_size}")
+                timings = incremental_import(
+                    session, args.batch_size, args.delete_missing
+                )['timings']
+            elif args.parallel:
+                print(f"Параллельный режим, процессов: {args.workers}, "
+                      f"размер пачки: {args.batch_size}")
+                timings = parallel_import(session, args.batch_size, args.workers)
+            elif args.stream:
+                print(f"Потоковый режим, размер пачки: {args.batch_size}")
+                timings = run_stages([
+                    ('material_types', lambda: stream_import_material_types(session, args.batch_size)),
+                    ('product_types', lambda: stream_import_product_types(session, args.batch_size)),
+                    ('workshops', lambda: stream_import_workshops(session, args.batch_size)),
+                    ('products', lambda: stream_import_products(session, args.batch_size)),
+                    ('product_workshop',
+                     lambda: stream_import_product_workshop_links(session, args.batch_size)),
+                ])
+            else:
+                timings = run_stages([
+                    ('material_types', lambda: import_material_types(session)),
+                    ('product_types', lambda: import_product_types(session)),
+                    ('workshops', lambda: import_workshops(session)),
+                    ('products', lambda: import_products(session)),
+                    ('product_workshop', lambda: import_product_workshop_links(session)),
+                ])
+            total_seconds = time.perf_counter() - started
             
             print("\n" + "=" * 70)
             print("ИМПОРТ УСПЕШНО ЗАВЕРШЕН!")
             print("=" * 70)
             
+            print_stage_timings(timings, total_seconds)
+            
             # Выводим статистику
             print_statistics(session)
             
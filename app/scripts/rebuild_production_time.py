@@ -0,0 +1,74 @@
+"""
+Проверка и пересчет сохраненного времени изготовления продукции
+
+Запуск:
+    python -m app.scripts.rebuild_production_time            # только проверка
+    python -m app.scripts.rebuild_production_time --rebuild  # пересчет
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database import get_session, create_all_tables
+from app.services.production_time import (
+    refresh_production_times,
+    find_inconsistent_production_times
+)
+
+# Сколько расхождений выводить в консоль
+MAX_PRINTED_MISMATCHES = 20
+
+def check(session) -> int:
+    """Проверить согласованность и вывести расхождения"""
+    mismatches = find_inconsistent_production_times(session)
+    
+    if not mismatches:
+        print("✅ Сохраненное время изготовления совпадает со связями продукт-цех")
+        return 0
+    
+    print(f"❌ Найдено расхождений: {len(mismatches)}")
+    for product_id, stored, actual in mismatches[:MAX_PRINTED_MISMATCHES]:
+        stored_str = "нет записи" if stored is None else f"{stored:.2f} ч"
+        print(f"   Продукт {product_id}: сохранено {stored_str}, по цехам {actual:.2f} ч")
+    if len(mismatches) > MAX_PRINTED_MISMATCHES:
+        print(f"   ... и еще {len(mismatches) - MAX_PRINTED_MISMATCHES}")
+    
+    return len(mismatches)
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Проверка времени изготовления продукции")
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="пересчитать время для всех продуктов"
+    )
+    args = parser.parse_args()
+    
+    print("=" * 70)
+    print("ПРОВЕРКА ВРЕМЕНИ ИЗГОТОВЛЕНИЯ ПРОДУКЦИИ")
+    print("=" * 70)
+    
+    # Таблица итогов могла еще не существовать в старой базе
+    create_all_tables()
+    
+    with get_session() as session:
+        mismatches = check(session)
+        
+        if args.rebuild:
+            print("\nПересчет времени изготовления...")
+            refresh_production_times(session)
+            session.commit()
+            mismatches = check(session)
+        elif mismatches:
+            print("\nДля исправления запустите:")
+            print("python -m app.scripts.rebuild_production_time --rebuild")
+    
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
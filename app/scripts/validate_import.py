@@ -55,15 +55,19 @@ class ImportValidator:
                 f"Типы материалов: совпадение количества (Excel: {excel_count}, БД: {db_count})"
             )
             
-            # 2. Проверяем каждую запись
-            for _, row in df.iterrows():
-                material_name = str(row['Тип материала']).strip()
-                
-                # ИСПРАВЛЕНИЕ: Теперь используем ту же логику что и в импорте
-                # Excel: "0,80%" → pandas: 0.008 (доли) → импорт преобразует в 0.8 (проценты)
-                loss_percentage = self._convert_percentage_like_import(row['Процент потерь сырья'])
-                
-                material = self.session.query(MaterialType).filter_by(name=material_name).first()
+            # 2. Проверяем каждую запись (столбцы - целиком, материалы БД - одним запросом)
+            material_names = df['Тип материала'].astype(str).str.strip()
+            
+            # ИСПРАВЛЕНИЕ: Теперь используем ту же логику что и в импорте
+            # Excel: "0,80%" → pandas: 0.008 (доли) → импорт преобразует в 0.8 (проценты)
+            loss_percentages = self._convert_percentages_like_import(df['Процент потерь сырья'])
+            
+            materials = {
+                material.name: material for material in self.session.query(MaterialType).all()
+            }
+            
+            for material_name, loss_percentage in zip(material_names, loss_percentages):
+                material = materials.get(material_name)
                 
                 if material:
                     # Допустимая погрешность 0.001 (0.1%)
@@ -85,6 +89,27 @@ class ImportValidator:
         except Exception as e:
             self._add_result(False, f"Ошибка проверки типов материалов: {e}")
 
+    def _convert_percentages_like_import(self, column: pd.Series) -> pd.Series:
+        """
+        Векторная версия _convert_percentage_like_import для столбца
+        
+        Числа и строки разбираются масками pandas, построчно - только ячейки,
+        которые не удалось разобрать (с тем же сообщением об ошибке)
+        """
+        is_text = column.map(lambda value: isinstance(value, str)).astype(bool)
+        numbers = pd.to_numeric(column.where(~is_text), errors='coerce').astype(float)
+        if is_text.any():
+            cleaned = column[is_text].str.replace('%', '').str.strip().str.replace(',', '.')
+            numbers[is_text] = pd.to_numeric(cleaned, errors='coerce')
+        
+        # Как в импорте: доли (меньше 1%) → проценты
+        numbers = numbers.where(~(numbers < 0.01), numbers * 100)
+        
+        failed = numbers.isna() & column.notna()
+        if failed.any():
+            numbers[failed] = [self._convert_percentage_like_import(value) for value in column[failed]]
+        return numbers.fillna(0.0)
+    
     def _convert_percentage_like_import(self, value):
         """
         Конвертирует процентные значения как в функции импорта
@@ -134,11 +159,15 @@ class ImportValidator:
                 f"Типы продукции: совпадение количества (Excel: {excel_count}, БД: {db_count})"
             )
             
-            for _, row in df.iterrows():
-                type_name = str(row['Тип продукции']).strip()
-                coefficient = float(row['Коэффициент типа продукции'])
-                
-                product_type = self.session.query(ProductType).filter_by(name=type_name).first()
+            type_names = df['Тип продукции'].astype(str).str.strip()
+            coefficients = df['Коэффициент типа продукции'].astype(float)
+            product_types = {
+                product_type.name: product_type
+                for product_type in self.session.query(ProductType).all()
+            }
+            
+            for type_name, coefficient in zip(type_names, coefficients):
+                product_type = product_types.get(type_name)
                 
                 if product_type:
                     # Допустимая погрешность 0.01
@@ -217,16 +246,10 @@ class ImportValidator:
             
             # ИСПРАВЛЕНИЕ: В Excel могут быть не все продукты из-за пропусков
             # Считаем только валидные строки (без пропущенных)
+            required_columns = ['Наименование продукции', 'Артикул', 'Тип продукции', 'Основной материал']
             valid_excel_count = 0
-            for _, row in df.iterrows():
-                try:
-                    if (pd.notna(row['Наименование продукции']) and 
-                        pd.notna(row['Артикул']) and
-                        pd.notna(row['Тип продукции']) and
-                        pd.notna(row['Основной материал'])):
-                        valid_excel_count += 1
-                except:
-                    continue
+            if set(required_columns) <= set(df.columns):
+                valid_excel_count = int(df[required_columns].notna().all(axis=1).sum())
             
             self._add_result(
                 valid_excel_count == db_count,
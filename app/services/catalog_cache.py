@@ -0,0 +1,187 @@
+"""
+Кэш справочников: типы продукции и типы материалов
+
+Таблицы маленькие и меняются редко, поэтому целиком держатся в памяти.
+Снимок справочника помечен версией таблицы (app.database.table_versions):
+после commit, изменившего таблицу, версия растет и при следующем
+обращении снимок перечитывается из БД.
+
+Изменения из других процессов версию не меняют, поэтому снимок
+дополнительно устаревает через CACHE_TTL_SECONDS.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, literal, union_all
+from sqlalchemy.orm import Session
+
+from app.database.database import ProductType, MaterialType
+from app.database import table_versions
+
+# Максимальный возраст снимка (на случай изменений из другого процесса)
+CACHE_TTL_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class CachedProductType:
+    """Тип продукции из кэша"""
+    id: int
+    name: str
+    coefficient: float
+
+
+@dataclass(frozen=True)
+class CachedMaterialType:
+    """Тип материала из кэша"""
+    id: int
+    name: str
+    loss_percentage: float
+
+
+class _Snapshot:
+    """Содержимое одной таблицы справочника с индексами по id и имени"""
+
+    def __init__(self, token, items):
+        self.token = token
+        self.loaded_at = time.monotonic()
+        self.items = items
+        self.by_id = {item.id: item for item in items}
+        self.by_name = {item.name: item for item in items}
+
+
+class CatalogCache:
+    """Версионируемый кэш справочников в памяти процесса"""
+
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._lock = threading.Lock()
+
+    # ----- Типы продукции -----
+
+    def product_types(self, db: Session) -> List[CachedProductType]:
+        """Все типы продукции (по возрастанию id)"""
+        return self._snapshot(db, ProductType).items
+
+    def get_product_type(self, db: Session, type_id: int) -> Optional[CachedProductType]:
+        """Тип продукции по ID или None"""
+        return self._snapshot(db, ProductType).by_id.get(type_id)
+
+    def get_product_type_by_name(self, db: Session, name: str) -> Optional[CachedProductType]:
+        """Тип продукции по названию или None"""
+        return self._snapshot(db, ProductType).by_name.get(name)
+
+    # ----- Типы материалов -----
+
+    def material_types(self, db: Session) -> List[CachedMaterialType]:
+        """Все типы материалов (по возрастанию id)"""
+        return self._snapshot(db, MaterialType).items
+
+    def get_material_type(self, db: Session, material_id: int) -> Optional[CachedMaterialType]:
+        """Тип материала по ID или None"""
+        return self._snapshot(db, MaterialType).by_id.get(material_id)
+
+    def get_material_type_by_name(self, db: Session, name: str) -> Optional[CachedMaterialType]:
+        """Тип материала по названию или None"""
+        return self._snapshot(db, MaterialType).by_name.get(name)
+
+    # ----- Управление -----
+    
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Актуализировать оба справочника
+        
+        Если хотя бы один снимок устарел, обе таблицы читаются одним
+        запросом (UNION ALL) - страница расчета и расчет сырья стоят
+        не больше одного обращения к БД
+        """
+        tokens = {model: self._token(db, model) for model in (ProductType, MaterialType)}
+        if all(self._is_fresh(model.__tablename__, token) for model, token in tokens.items()):
+            return
+        
+        rows = db.execute(union_all(
+            select(literal(ProductType.__tablename__).label("table_name"),
+                   ProductType.id, ProductType.name, ProductType.coefficient.label("value")),
+            select(literal(MaterialType.__tablename__),
+                   MaterialType.id, MaterialType.name, MaterialType.loss_percentage),
+        )).all()
+        
+        with self._lock:
+            self.misses += 1
+            for model, item_class in (
+                (ProductType, CachedProductType),
+                (MaterialType, CachedMaterialType),
+            ):
+                items = sorted(
+                    (item_class(row.id, row.name, row.value)
+                     for row in rows if row.table_name == model.__tablename__),
+                    key=lambda item: item.id
+                )
+                self._snapshots[model.__tablename__] = _Snapshot(tokens[model], items)
+
+    def invalidate(self) -> None:
+        """Сбросить все снимки"""
+        with self._lock:
+            self._snapshots.clear()
+
+    def stats(self) -> dict:
+        """Счетчики попаданий и промахов"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+            "versions": {
+                ProductType.__tablename__: table_versions.get_version(ProductType.__tablename__),
+                MaterialType.__tablename__: table_versions.get_version(MaterialType.__tablename__),
+            }
+        }
+
+    def _snapshot(self, db: Session, model) -> _Snapshot:
+        table_name = model.__tablename__
+        token = self._token(db, model)
+
+        snapshot = self._snapshots.get(table_name)
+        if snapshot is not None and snapshot.token == token and not self._expired(snapshot):
+            with self._lock:
+                self.hits += 1
+            return snapshot
+
+        with self._lock:
+            self.misses += 1
+            snapshot = _Snapshot(token, self._load(db, model))
+            self._snapshots[table_name] = snapshot
+            return snapshot
+
+    @staticmethod
+    def _token(db: Session, model):
+        # Разные базы (например, в тестах) не должны делить снимки
+        return (str(db.get_bind().url), table_versions.get_version(model.__tablename__))
+    
+    def _is_fresh(self, table_name: str, token) -> bool:
+        snapshot = self._snapshots.get(table_name)
+        return snapshot is not None and snapshot.token == token and not self._expired(snapshot)
+    
+    def _expired(self, snapshot: _Snapshot) -> bool:
+        return time.monotonic() - snapshot.loaded_at > self.ttl_seconds
+
+    @staticmethod
+    def _load(db: Session, model):
+        if model is ProductType:
+            rows = db.query(ProductType.id, ProductType.name, ProductType.coefficient)\
+                .order_by(ProductType.id).all()
+            return [CachedProductType(*row) for row in rows]
+
+        rows = db.query(MaterialType.id, MaterialType.name, MaterialType.loss_percentage)\
+            .order_by(MaterialType.id).all()
+        return [CachedMaterialType(*row) for row in rows]
+
+
+# Общий экземпляр для приложения
+catalog_cache = CatalogCache()
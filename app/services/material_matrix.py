@@ -0,0 +1,97 @@
+"""
+Матрица потребности в сырье: тип продукции × тип материала
+
+Для сценариев "что если" количество сырья нужно сразу для всех пар
+тип продукции / материал. Коэффициенты типов и множители потерь
+хранятся массивами NumPy и пересобираются только после обновления
+кэша справочников (app.services.catalog_cache), а расчет для заданных
+количества и параметров выполняется одним векторным проходом.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.catalog_cache import catalog_cache, CachedProductType, CachedMaterialType
+
+# Граница результата: 2**63 точно представимо в float64, меньшие значения - в int64
+INT64_LIMIT = float(2 ** 63)
+
+
+@dataclass(frozen=True)
+class MaterialMatrix:
+    """Снимок справочников в виде массивов"""
+    product_types: Sequence[CachedProductType]
+    material_types: Sequence[CachedMaterialType]
+    coefficients: np.ndarray    # (типы,)
+    loss_factors: np.ndarray    # (материалы,)
+    multipliers: np.ndarray     # (типы, материалы): коэффициент × множитель потерь
+
+    def requirements(self, product_quantity: int, param1: float, param2: float) -> np.ndarray:
+        """
+        Количество сырья для всех пар [тип продукции, материал]
+
+        Порядок операций как в compute_raw_material, поэтому результаты
+        совпадают с расчетом одной пары (готовый multipliers дал бы
+        другое округление на границах целых чисел)
+
+        Raises:
+            ValueError: количество сырья не помещается в int64
+        """
+        try:
+            quantity = float(product_quantity)
+        except OverflowError:
+            raise ValueError("Количество продукции слишком велико")
+
+        params_product = param1 * param2
+        with np.errstate(over="ignore", invalid="ignore"):
+            total_without_loss = (params_product * self.coefficients) * quantity
+            total_with_loss = total_without_loss[:, np.newaxis] * self.loss_factors[np.newaxis, :]
+        # Без проверки astype превращает inf и слишком большие значения в INT64_MIN
+        if not (np.isfinite(total_with_loss).all() and (total_with_loss < INT64_LIMIT).all()):
+            raise ValueError("Количество сырья слишком велико для расчета")
+        return np.ceil(total_with_loss).astype(np.int64)
+
+
+class MaterialMatrixService:
+    """Матрица, пересобираемая при изменении справочников"""
+
+    def __init__(self):
+        self._matrix: Optional[MaterialMatrix] = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def get(self, db: Session) -> MaterialMatrix:
+        """Актуальная матрица (не больше одного запроса к БД)"""
+        catalog_cache.ensure_loaded(db)
+        product_types = catalog_cache.product_types(db)
+        material_types = catalog_cache.material_types(db)
+
+        matrix = self._matrix
+        # Кэш справочников создает новые списки при каждом обновлении
+        if (matrix is not None
+                and matrix.product_types is product_types
+                and matrix.material_types is material_types):
+            return matrix
+
+        with self._lock:
+            coefficients = np.array([pt.coefficient for pt in product_types], dtype=np.float64)
+            loss_factors = 1 + np.array(
+                [mt.loss_percentage for mt in material_types], dtype=np.float64
+            ) / 100
+            matrix = MaterialMatrix(
+                product_types=product_types,
+                material_types=material_types,
+                coefficients=coefficients,
+                loss_factors=loss_factors,
+                multipliers=np.outer(coefficients, loss_factors),
+            )
+            self._matrix = matrix
+            self.rebuilds += 1
+            return matrix
+
+
+# Общий экземпляр для приложения
+material_matrix = MaterialMatrixService()
@@ -0,0 +1,278 @@
+"""
+Метрики стоимости запросов: число SQL запросов, время в БД, строки и время ответа
+
+- MetricsMiddleware (ASGI) создает счетчики текущего HTTP запроса
+  (contextvar) и по завершении ответа добавляет их к итогам маршрута
+- события Engine before_cursor_execute / after_cursor_execute (для всех
+  движков, включая aiosqlite) считают запросы, время и полученные строки
+- render_prometheus() - итоги в текстовом формате Prometheus
+  (GET /api/metrics), вместе со статистикой кэшей
+
+Маршрут в метках - шаблон пути ("/api/products/{product_id}"), поэтому
+число рядов не растет с числом разных ID. Заголовок X-Debug-Metrics с
+затратами конкретного запроса включается переменной METRICS_DEBUG_HEADER.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Mount
+
+from app.services.catalog_cache import catalog_cache
+from app.services.page_cache import page_cache
+from app.services.response_cache import response_cache
+
+# Метка маршрута для запросов, не попавших ни в один маршрут (404)
+UNMATCHED_ROUTE = "unmatched"
+
+DEBUG_HEADER = "X-Debug-Metrics"
+
+# Атрибут контекста выполнения SQL запроса со временем его начала.
+# Контекст живет один запрос: при ошибке время не остается на соединении
+_STARTED_ATTR = "_metrics_query_started"
+
+
+@dataclass
+class RequestMetrics:
+    """Затраты одного HTTP запроса на работу с БД"""
+    queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+
+
+@dataclass
+class RouteTotals:
+    """Накопленные итоги маршрута"""
+    requests: int = 0
+    seconds: float = 0.0
+    queries: int = 0
+    max_queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+class _RowCountingCursor:
+    """Обертка курсора DBAPI: считает строки, выбранные fetch*"""
+
+    def __init__(self, cursor, metrics: RequestMetrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._metrics.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._metrics.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._metrics.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        setattr(context, _STARTED_ATTR, time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = getattr(context, _STARTED_ATTR, None)
+    if metrics is None or started is None:
+        return
+
+    metrics.queries += 1
+    metrics.db_seconds += time.perf_counter() - started
+    # Результат строится по context.cursor уже после этого события
+    if context is not None and cursor.description is not None:
+        context.cursor = _RowCountingCursor(cursor, metrics)
+
+
+class MetricsRegistry:
+    """Итоги по маршрутам (в памяти процесса)"""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteTotals] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status_code: int,
+                metrics: RequestMetrics, seconds: float) -> None:
+        """Добавить завершенный запрос к итогам маршрута"""
+        with self._lock:
+            totals = self._routes.setdefault((method, route), RouteTotals())
+            totals.requests += 1
+            totals.seconds += seconds
+            totals.queries += metrics.queries
+            totals.max_queries = max(totals.max_queries, metrics.queries)
+            totals.db_seconds += metrics.db_seconds
+            totals.rows += metrics.rows
+
+            status_key = (method, route, status_code)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], RouteTotals]:
+        """Копия итогов: {(метод, маршрут): RouteTotals}"""
+        with self._lock:
+            return {key: RouteTotals(**vars(totals)) for key, totals in self._routes.items()}
+
+    def reset(self) -> None:
+        """Сбросить все итоги"""
+        with self._lock:
+            self._routes.clear()
+            self._statuses.clear()
+
+    def render_prometheus(self) -> str:
+        """Итоги маршрутов и статистика кэшей в текстовом формате Prometheus"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            statuses = sorted(self._statuses.items())
+
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{{{_labels(labels)}}} {_number(value)}")
+
+        def by_route(attribute):
+            return [
+                ({"method": method, "route": route}, getattr(totals, attribute))
+                for (method, route), totals in routes
+            ]
+
+        family("http_requests_total", "counter", "HTTP запросы по маршруту и коду ответа", [
+            ({"method": method, "route": route, "status": str(status)}, count)
+            for (method, route, status), count in statuses
+        ])
+        # summary без квантилей: _sum и _count
+        lines.append("# HELP http_request_duration_seconds Время ответа (до отправки тела целиком)")
+        lines.append("# TYPE http_request_duration_seconds summary")
+        for labels, value in by_route("seconds"):
+            lines.append(f"http_request_duration_seconds_sum{{{_labels(labels)}}} {_number(value)}")
+        for labels, value in by_route("requests"):
+            lines.append(f"http_request_duration_seconds_count{{{_labels(labels)}}} {_number(value)}")
+        family("db_queries_total", "counter", "SQL запросы, выполненные при обработке",
+               by_route("queries"))
+        family("db_queries_per_request_max", "gauge",
+               "Наибольшее число SQL запросов в одном HTTP запросе", by_route("max_queries"))
+        family("db_query_duration_seconds_total", "counter",
+               "Суммарное время выполнения SQL запросов", by_route("db_seconds"))
+        family("db_rows_fetched_total", "counter", "Строки, полученные из БД", by_route("rows"))
+
+        caches = {
+            "catalog": catalog_cache.stats(),
+            "responses": response_cache.stats(),
+            "pages": page_cache.stats(),
+        }
+        family("cache_hits_total", "counter", "Попадания в кэш", [
+            ({"cache": name}, stats["hits"]) for name, stats in caches.items()
+        ])
+        family("cache_misses_total", "counter", "Промахи кэша", [
+            ({"cache": name}, stats["misses"]) for name, stats in caches.items()
+        ])
+        family("cache_entries", "gauge", "Записей в кэше", [
+            ({"cache": name}, stats["entries"])
+            for name, stats in caches.items() if "entries" in stats
+        ])
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware: счетчики запроса, итоги маршрута и отладочный заголовок"""
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None, debug_header: bool = False):
+        self.app = app
+        self.registry = registry or metrics_registry
+        self.debug_header = debug_header
+        self._route_paths: Optional[Dict[object, str]] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_metrics(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.debug_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((DEBUG_HEADER.lower().encode(), _debug_value(
+                        metrics, time.perf_counter() - started
+                    ).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            self.registry.observe(
+                scope["method"], self._route(scope), status_code,
+                metrics, time.perf_counter() - started
+            )
+
+    def _route(self, scope) -> str:
+        """Шаблон пути маршрута, обработавшего запрос"""
+        if self._route_paths is None:
+            self._route_paths = {}
+            for route in getattr(scope.get("app"), "routes", []):
+                if isinstance(route, Mount):
+                    self._route_paths[route.app] = route.path + "/{path}"
+                elif hasattr(route, "endpoint"):
+                    self._route_paths[route.endpoint] = route.path
+        return self._route_paths.get(scope.get("endpoint"), UNMATCHED_ROUTE)
+
+
+def _debug_value(metrics: RequestMetrics, seconds: float) -> str:
+    return (
+        f"queries={metrics.queries}; db_ms={metrics.db_seconds * 1000:.2f}; "
+        f"rows={metrics.rows}; total_ms={seconds * 1000:.2f}"
+    )
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    """Экранирование значения метки по формату Prometheus"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+# Общий экземпляр для приложения
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,126 @@
+"""
+Кэш отрисованных HTML страниц фронтенда
+
+Страница хранится целиком (bytes) по ключу: маршрут, параметры запроса,
+адрес сервера и версии таблиц, из которых она строится
+(app.database.table_versions). Запись через CRUD классы завершается
+commit, версия таблицы растет - и страница при следующем запросе
+строится заново вместе со всеми запросами к БД.
+
+Размер кэша ограничен (PAGE_CACHE_SIZE), вытесняются давно не
+использованные страницы. Изменения из других процессов версию
+не меняют, поэтому запись дополнительно устаревает через CACHE_TTL_SECONDS.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy.orm import Session
+
+from app.config import PAGE_CACHE_SIZE
+from app.database import table_versions
+from app.services.catalog_cache import CACHE_TTL_SECONDS
+
+
+class PageCache:
+    """LRU кэш HTML страниц с учетом версий таблиц"""
+
+    def __init__(self, max_entries: int = PAGE_CACHE_SIZE,
+                 ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.render_count = 0
+        self.render_seconds_total = 0.0
+        self.last_render_seconds = 0.0
+        # ключ -> (время создания, HTML)
+        self._entries: "OrderedDict[tuple, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(
+        self,
+        request: Request,
+        db: Session,
+        tables: Iterable[str],
+        build: Callable[[], HTMLResponse]
+    ) -> HTMLResponse:
+        """
+        Страница из кэша или построенная функцией build
+
+        Args:
+            tables: таблицы, данные которых попадают на страницу
+            build: строит страницу (запросы к БД и шаблон)
+        """
+        tables = tuple(tables)
+        key = (
+            request.url.path,
+            tuple(sorted(request.query_params.multi_items())),
+            # Адрес сервера попадает в ссылки на статику
+            str(request.base_url),
+            str(db.get_bind().url),
+            tables,
+            table_versions.get_versions(tables),
+        )
+
+        body = self._get(key)
+        if body is None:
+            started = time.perf_counter()
+            response = build()
+            self._record_render(time.perf_counter() - started)
+            body = response.body
+            self._put(key, body)
+
+        return HTMLResponse(content=body)
+
+    def invalidate(self) -> None:
+        """Сбросить все страницы"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Попадания, промахи и время построения страниц"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "renders": self.render_count,
+            "average_render_ms": round(
+                self.render_seconds_total / self.render_count * 1000 if self.render_count else 0.0,
+                3
+            ),
+            "last_render_ms": round(self.last_render_seconds * 1000, 3),
+        }
+
+    def _get(self, key) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, key, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _record_render(self, seconds: float) -> None:
+        with self._lock:
+            self.render_count += 1
+            self.render_seconds_total += seconds
+            self.last_render_seconds = seconds
+
+
+# Общий экземпляр для приложения
+page_cache = PageCache()
@@ -0,0 +1,89 @@
+"""
+Потоковая выгрузка каталога продукции (CSV и NDJSON)
+
+Строки читаются одним запросом ProductCRUD.details_statement() (тип,
+материал и сохраненное время изготовления уже в выборке) с yield_per:
+в памяти одновременно находится только текущая пачка строк, поэтому
+расход памяти не зависит от размера каталога.
+
+Генераторы открывают собственную сессию на переданном движке: ответ
+отдается клиенту уже после выхода из обработчика запроса.
+"""
+import csv
+import io
+import json
+from typing import Iterator
+
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session
+
+from app.crud.products import product_crud
+from app.database.database import Product
+from app.services.production_time import round_production_time
+
+# Строк в одной пачке (yield_per) и в одном фрагменте ответа
+EXPORT_BATCH_SIZE = 1000
+
+# Поля выгрузки - те же, что в ProductResponse
+EXPORT_COLUMNS = [
+    "id",
+    "article",
+    "product_name",
+    "product_type",
+    "main_material",
+    "min_partner_price",
+    "production_time",
+]
+
+
+def export_record(row: Row) -> dict:
+    """Строка выборки -> запись выгрузки"""
+    return {
+        "id": row.id,
+        "article": row.article,
+        "product_name": row.name,
+        "product_type": row.product_type_name,
+        "main_material": row.material_name,
+        "min_partner_price": row.min_partner_price,
+        "production_time": round_production_time(row.total_hours),
+    }
+
+
+def iter_record_batches(bind: Engine, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+    """Записи выгрузки пачками по batch_size (по возрастанию id)"""
+    stmt = product_crud.details_statement()\
+        .order_by(Product.id)\
+        .execution_options(yield_per=batch_size)
+
+    with Session(bind=bind) as db:
+        for partition in db.execute(stmt).partitions():
+            yield [export_record(row) for row in partition]
+
+
+def iter_csv(bind: Engine, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """CSV: заголовок, затем по фрагменту на пачку строк"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+
+    writer.writeheader()
+    yield _take(buffer)
+
+    for records in iter_record_batches(bind, batch_size):
+        writer.writerows(records)
+        yield _take(buffer)
+
+
+def iter_ndjson(bind: Engine, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """NDJSON: одна запись JSON на строку"""
+    for records in iter_record_batches(bind, batch_size):
+        yield "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("utf-8")
+
+
+def _take(buffer: io.StringIO) -> bytes:
+    """Содержимое буфера в UTF-8 с очисткой буфера"""
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
@@ -1,27 +1,145 @@
 """
 Расчет времени изготовления продукции
 Суммируем время по всем цехам и округляем до целого
+
+Сумма хранится в таблице product_production_time и пересчитывается
+при каждом изменении связей продукт-цех (refresh_production_times).
 """
 
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, select
-from app.database.database import product_workshop_table
+from app.database.database import Product, product_workshop_table, product_production_time_table
+
+# Ограничение на количество параметров в одном IN (...) для SQLite
+ID_CHUNK_SIZE = 500
 
 def calculate_total_production_time(db: Session, product_id: int) -> int:
     """
     Рассчитать общее время изготовления продукта
     Возвращает целое неотрицательное число (часы)
     """
-    # Суммируем время по всем цехам
+    # Сохраненная сумма - одно чтение по первичному ключу
+    stored = db.execute(
+        select(product_production_time_table.c.total_hours)
+        .where(product_production_time_table.c.product_id == product_id)
+    ).scalar()
+
+    if stored is not None:
+        return round_production_time(stored)
+
+    # Суммы еще нет (например, база до пересчета) - суммируем время по всем цехам
     stmt = select(func.sum(product_workshop_table.c.manufacturing_time_hours))\
         .where(product_workshop_table.c.product_id == product_id)
-    
+
     result = db.execute(stmt).scalar()
+
+    return round_production_time(result)
+
+def calculate_total_production_times(db: Session, product_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Рассчитать время изготовления сразу для списка продуктов
     
+    Суммы считаются одним сгруппированным запросом по product_workshop
+    (на каждые ID_CHUNK_SIZE идентификаторов), округление - как в
+    calculate_total_production_time.
+    
+    Returns:
+        Словарь {product_id: часы}; несуществующие продукты в него не попадают
+    """
+    totals = {}
+    
+    for chunk in _chunks(sorted(set(product_ids))):
+        rows = db.execute(_actual_totals_query().where(Product.id.in_(chunk))).fetchall()
+        for product_id, total_hours in rows:
+            totals[product_id] = round_production_time(total_hours)
+    
+    return totals
+
+def round_production_time(total_hours) -> int:
+    """
+    Округлить суммарное время изготовления до целого числа часов
+    Используется везде, где время считается сразу для списка продуктов
+    """
     # Если нет результата или None -> 0
-    if result is None:
+    if total_hours is None:
         return 0
-    
+
     # Округляем до ближайшего целого
     # 3.5 -> 4, 3.4 -> 3, 5.0 -> 5
-    return int(round(float(result)))
\ No newline at end of file
+    return int(round(float(total_hours)))
+
+def production_time_column():
+    """
+    Выражение суммарного времени продукта для запросов с join
+    на product_production_time (с запасным подсчетом по цехам)
+    """
+    fallback = select(func.sum(product_workshop_table.c.manufacturing_time_hours))\
+        .where(product_workshop_table.c.product_id == Product.id)\
+        .scalar_subquery()
+
+    return func.coalesce(product_production_time_table.c.total_hours, fallback)
+
+def _chunks(ids: List[int]):
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+def _actual_totals_query():
+    """Фактические суммы времени по связям: (product_id, total_hours)"""
+    return select(
+        Product.id,
+        func.coalesce(
+            func.sum(product_workshop_table.c.manufacturing_time_hours), 0.0
+        ).label("total_hours")
+    )\
+        .select_from(Product)\
+        .outerjoin(product_workshop_table, product_workshop_table.c.product_id == Product.id)\
+        .group_by(Product.id)
+
+def refresh_production_times(db: Session, product_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Пересчитать сохраненное время для продуктов
+
+    Вызывается в той же транзакции, что и изменение связей,
+    фиксацию (commit) выполняет вызывающий код.
+    Если product_ids не передан - пересчитываются все продукты.
+    """
+    table = product_production_time_table
+
+    if product_ids is None:
+        db.execute(table.delete())
+        db.execute(
+            table.insert().from_select(["product_id", "total_hours"], _actual_totals_query())
+        )
+        return
+
+    for chunk in _chunks(sorted(set(product_ids))):
+        db.execute(table.delete().where(table.c.product_id.in_(chunk)))
+        db.execute(
+            table.insert().from_select(
+                ["product_id", "total_hours"],
+                _actual_totals_query().where(Product.id.in_(chunk))
+            )
+        )
+
+def find_inconsistent_production_times(db: Session) -> List[Tuple[int, Optional[float], float]]:
+    """
+    Найти продукты, у которых сохраненное время расходится со связями
+
+    Returns:
+        Список (product_id, сохраненное время или None, фактическое время)
+    """
+    actual = _actual_totals_query().subquery()
+    stored = product_production_time_table
+
+    rows = db.execute(
+        select(actual.c.id, stored.c.total_hours, actual.c.total_hours)
+        .select_from(actual)
+        .outerjoin(stored, stored.c.product_id == actual.c.id)
+    ).fetchall()
+
+    return [
+        (product_id, stored_hours, actual_hours)
+        for product_id, stored_hours, actual_hours in rows
+        if stored_hours is None or abs(stored_hours - actual_hours) > 1e-9
+    ]
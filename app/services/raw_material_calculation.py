@@ -1,10 +1,16 @@
 """
 Расчет необходимого сырья для производства продукции
 """
+import logging
 from math import ceil
-from typing import Tuple, Optional
+from typing import List, Sequence, Tuple, Optional
+import numpy as np
 from sqlalchemy.orm import Session
 
+from app.services.catalog_cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
 def calculate_raw_material(
     db: Session,
     product_type_id: int,
@@ -27,49 +33,10 @@ def calculate_raw_material(
     Returns:
         int: Количество сырья (целое число) или -1 при ошибке
     """
-    from app.database.database import ProductType, MaterialType
-    
-    # 1. Проверяем существование типа продукции
-    product_type = db.query(ProductType).filter(ProductType.id == product_type_id).first()
-    if not product_type:
-        return -1
-    
-    # 2. Проверяем существование типа материала
-    material_type = db.query(MaterialType).filter(MaterialType.id == material_type_id).first()
-    if not material_type:
-        return -1
-    
-    # 3. Проверяем корректность входных данных
-    if product_quantity <= 0 or param1 <= 0 or param2 <= 0:
-        return -1
-    
-    try:
-        # 4. Расчет по формуле из ТЗ
-        # Произведение параметров продукции
-        params_product = param1 * param2
-        
-        # Умножаем на коэффициент типа продукции
-        material_per_unit = params_product * product_type.coefficient
-        
-        # Общее количество без учета потерь
-        total_without_loss = material_per_unit * product_quantity
-        
-        # Учет потерь сырья (процент хранится как 0.8 для 0.8%)
-        # Преобразуем процент в коэффициент: 0.8% -> 0.008
-        loss_factor = 1 + (material_type.loss_percentage / 100)
-        
-        # Количество с учетом потерь
-        total_with_loss = total_without_loss * loss_factor
-        
-        # Округляем ВВЕРХ до целого числа (ceil)
-        total_rounded = ceil(total_with_loss)
-        
-        return total_rounded
-        
-    except (ValueError, TypeError, ZeroDivisionError) as e:
-        # Логирование ошибки при необходимости
-        print(f"Ошибка расчета сырья: {e}")
-        return -1
+    result, _ = calculate_raw_material_with_details(
+        db, product_type_id, material_type_id, product_quantity, param1, param2
+    )
+    return result
 
 def calculate_raw_material_with_details(
     db: Session,
@@ -82,50 +49,204 @@ def calculate_raw_material_with_details(
     """
     Рассчитать сырье с возвратом деталей расчета
     
+    Общая точка расчета для API и HTML формы. Справочники берутся из кэша:
+    не больше одного запроса к БД (при устаревшем кэше), обычно ни одного.
+    
     Returns:
         Tuple[result, details] где result - количество сырья или -1,
         details - словарь с деталями расчета или None
     """
-    from app.database.database import ProductType, MaterialType
-    
-    # Получаем данные
-    product_type = db.query(ProductType).filter(ProductType.id == product_type_id).first()
-    material_type = db.query(MaterialType).filter(MaterialType.id == material_type_id).first()
+    # 1. Справочники из кэша (оба обновляются одним запросом)
+    catalog_cache.ensure_loaded(db)
+    product_type = catalog_cache.get_product_type(db, product_type_id)
+    material_type = catalog_cache.get_material_type(db, material_type_id)
     
     if not product_type or not material_type:
         return -1, None
     
+    # 2. Проверяем корректность входных данных
     if product_quantity <= 0 or param1 <= 0 or param2 <= 0:
         return -1, None
     
     try:
-        # Расчет
-        params_product = param1 * param2
-        material_per_unit = params_product * product_type.coefficient
-        total_without_loss = material_per_unit * product_quantity
-        loss_factor = 1 + (material_type.loss_percentage / 100) 
+        steps = compute_raw_material(
+            product_type.coefficient, material_type.loss_percentage,
+            product_quantity, param1, param2
+        )
+    except (ValueError, TypeError, OverflowError) as e:
+        logger.warning(f"Ошибка расчета сырья: {e}")
+        return -1, None
+    
+    # 3. Формируем детали
+    details = {
+        "product_type_name": product_type.name,
+        "material_name": material_type.name,
+        "coefficient": product_type.coefficient,
+        "loss_percentage": material_type.loss_percentage,
+        "product_quantity": product_quantity,
+        "param1": param1,
+        "param2": param2,
+        "params_product": steps["params_product"],
+        "material_per_unit": round(steps["material_per_unit"], 4),
+        "total_without_loss": round(steps["total_without_loss"], 4),
+        "loss_factor": round(steps["loss_factor"], 6),
+        "total_with_loss": round(steps["total_with_loss"], 4),
+        "total_rounded": steps["total_rounded"]
+    }
+    
+    return steps["total_rounded"], details
+
+def compute_raw_material(
+    coefficient: float,
+    loss_percentage: float,
+    product_quantity: int,
+    param1: float,
+    param2: float
+) -> dict:
+    """
+    Формула из ТЗ с промежуточными значениями (без обращения к БД)
+    
+    Порядок операций совпадает с пакетным расчетом calculate_raw_material_batch
+    """
+    # Произведение параметров продукции
+    params_product = param1 * param2
+    
+    # Умножаем на коэффициент типа продукции
+    material_per_unit = params_product * coefficient
+    
+    # Общее количество без учета потерь
+    total_without_loss = material_per_unit * product_quantity
+    
+    # Учет потерь сырья (процент хранится как 0.8 для 0.8%)
+    # Преобразуем процент в коэффициент: 0.8% -> 0.008
+    loss_factor = 1 + (loss_percentage / 100)
+    
+    # Количество с учетом потерь
+    total_with_loss = total_without_loss * loss_factor
+    
+    return {
+        "params_product": params_product,
+        "material_per_unit": material_per_unit,
+        "total_without_loss": total_without_loss,
+        "loss_factor": loss_factor,
+        "total_with_loss": total_with_loss,
+        # Округляем ВВЕРХ до целого числа (ceil)
+        "total_rounded": ceil(total_with_loss)
+    }
+
+# Коды ошибок пакетного расчета (вместо -1 для каждой строки)
+ERROR_PRODUCT_TYPE_NOT_FOUND = "PRODUCT_TYPE_NOT_FOUND"
+ERROR_MATERIAL_TYPE_NOT_FOUND = "MATERIAL_TYPE_NOT_FOUND"
+ERROR_INVALID_QUANTITY = "INVALID_QUANTITY"
+ERROR_INVALID_PARAMS = "INVALID_PARAMS"
+ERROR_CALCULATION = "CALCULATION_ERROR"
+ERROR_INVALID_ROW = "INVALID_ROW"
+
+def calculate_raw_material_batch(
+    db: Session,
+    product_type_ids: Sequence[int],
+    material_type_ids: Sequence[int],
+    product_quantities: Sequence[int],
+    params1: Sequence[float],
+    params2: Sequence[float]
+) -> Tuple[List[Optional[int]], List[Optional[str]]]:
+    """
+    Рассчитать количество сырья сразу для многих строк
+    
+    Коэффициенты типов продукции и проценты потерь загружаются один раз,
+    формула считается векторно (NumPy) в том же порядке операций,
+    что и calculate_raw_material, поэтому результаты совпадают.
+    Параметры округляются до 4 знаков, как в RawMaterialRequest.
+    
+    Returns:
+        Tuple[results, errors] в порядке входных строк:
+        results - количество сырья или None, errors - код ошибки или None
+    """
+    type_ids = _id_array(product_type_ids)
+    material_ids = _id_array(material_type_ids)
+    quantities = _number_array(product_quantities)
+    p1 = np.asarray(params1, dtype=np.float64)
+    p2 = np.asarray(params2, dtype=np.float64)
+    # Проверка знака - по исходным значениям, расчет - по округленным
+    # (одиночный запрос сначала проверяет параметр, затем округляет)
+    valid_params = (p1 > 0) & (p2 > 0)
+    p1 = _round_params(p1)
+    p2 = _round_params(p2)
+    
+    # 1. Справочники - из кэша, без запросов на каждую строку
+    catalog_cache.ensure_loaded(db)
+    coefficients = {pt.id: pt.coefficient for pt in catalog_cache.product_types(db)}
+    losses = {mt.id: mt.loss_percentage for mt in catalog_cache.material_types(db)}
+    
+    coefficient = _lookup(type_ids, coefficients)
+    loss_percentage = _lookup(material_ids, losses)
+    
+    # 2. Расчет по формуле из ТЗ
+    with np.errstate(invalid="ignore", over="ignore"):
+        params_product = p1 * p2
+        material_per_unit = params_product * coefficient
+        total_without_loss = material_per_unit * quantities
+        loss_factor = 1 + (loss_percentage / 100)
         total_with_loss = total_without_loss * loss_factor
-        total_rounded = ceil(total_with_loss)
-        
-        # Формируем детали
-        details = {
-            "product_type_name": product_type.name,
-            "material_name": material_type.name,
-            "coefficient": product_type.coefficient,
-            "loss_percentage": material_type.loss_percentage,
-            "product_quantity": product_quantity,
-            "param1": param1,
-            "param2": param2,
-            "params_product": params_product,
-            "material_per_unit": round(material_per_unit, 4),
-            "total_without_loss": round(total_without_loss, 4),
-            "loss_factor": round(loss_factor, 6),
-            "total_with_loss": round(total_with_loss, 4),
-            "total_rounded": total_rounded
-        }
-        
-        return total_rounded, details
-        
-    except Exception as e:
-        print(f"Ошибка расчета: {e}")
-        return -1, None
\ No newline at end of file
+        total_rounded = np.ceil(total_with_loss)
+    
+    # 3. Коды ошибок - в том же порядке проверок, что и в расчете одной строки
+    errors = np.full(len(type_ids), None, dtype=object)
+    errors[~np.isfinite(total_rounded)] = ERROR_CALCULATION
+    errors[~valid_params] = ERROR_INVALID_PARAMS
+    errors[~(quantities > 0)] = ERROR_INVALID_QUANTITY
+    errors[np.isnan(loss_percentage)] = ERROR_MATERIAL_TYPE_NOT_FOUND
+    errors[np.isnan(coefficient)] = ERROR_PRODUCT_TYPE_NOT_FOUND
+    
+    results = [
+        None if error is not None else int(value)
+        for value, error in zip(total_rounded, errors)
+    ]
+    return results, errors.tolist()
+
+def _id_array(ids: Sequence[int]) -> "np.ndarray":
+    """ID как int64; ID вне диапазона int64 в БД не бывает - заменяются 0 (не найден)"""
+    try:
+        return np.asarray(ids, dtype=np.int64)
+    except OverflowError:
+        limit = np.iinfo(np.int64).max
+        return np.array([i if -limit <= i <= limit else 0 for i in ids], dtype=np.int64)
+
+def _number_array(values: Sequence[float]) -> "np.ndarray":
+    """Числа как float64; не представимые в float (10**400) - NaN (ошибка строки)"""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except OverflowError:
+        return np.array([_float_or_nan(value) for value in values], dtype=np.float64)
+
+def _float_or_nan(value) -> float:
+    try:
+        return float(value)
+    except OverflowError:
+        return np.nan
+
+def _round_params(values: "np.ndarray") -> "np.ndarray":
+    """
+    round(value, 4) для массива
+    
+    np.round считает через value * 10**4 и расходится с round() только там,
+    где это произведение оказалось у половины единицы (ошибка умножения
+    меняет сторону округления); такие значения и очень большие, где
+    произведение теряет дробную часть, округляются через round()
+    """
+    scaled = values * 1e4
+    rounded = np.round(scaled) / 1e4
+    with np.errstate(invalid="ignore"):
+        ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) <= 2 * np.spacing(np.abs(scaled))
+        ambiguous |= np.abs(values) >= 1e11
+    for index in np.flatnonzero(ambiguous):
+        rounded[index] = round(float(values[index]), 4)
+    return rounded
+
+def _lookup(ids: "np.ndarray", values: dict) -> "np.ndarray":
+    """Значения справочника для массива ID (NaN для отсутствующих)"""
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    unique_values = np.array(
+        [values.get(int(i), np.nan) for i in unique_ids], dtype=np.float64
+    )
+    return unique_values[inverse]
@@ -0,0 +1,153 @@
+"""
+Кэш готовых HTTP ответов для редко меняющихся списков (справочники)
+
+Ответ хранится уже сериализованным в JSON (bytes) вместе с ETag и
+Last-Modified. Ключ содержит версию таблицы (app.database.table_versions),
+поэтому после commit, изменившего таблицу, ответ строится заново.
+
+- ETag - строгий, хэш тела ответа: не зависит от перезапуска процесса
+- If-None-Match / If-Modified-Since - ответ 304 без тела
+- Повторные запросы отдаются из кэша без обращения к БД, валидации
+  и кодирования JSON
+
+Изменения из других процессов версию не меняют, поэтому запись
+дополнительно устаревает через CACHE_TTL_SECONDS.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from app.database import table_versions
+from app.services.catalog_cache import CACHE_TTL_SECONDS
+
+# Максимум ответов в кэше (вытесняются давно не использованные)
+MAX_CACHED_RESPONSES = 256
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Сериализованный ответ"""
+    body: bytes
+    etag: str
+    last_modified: float
+    headers: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class ResponseCache:
+    """LRU кэш сериализованных ответов с проверкой версии таблицы"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES,
+                 ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def respond(
+        self,
+        request: Request,
+        db: Session,
+        table_name: str,
+        key: Hashable,
+        build: Callable[[], Tuple[bytes, Dict[str, str]]]
+    ) -> Response:
+        """
+        Ответ из кэша или построенный функцией build
+
+        Args:
+            table_name: таблица, от версии которой зависит ответ
+            key: параметры запроса (маршрут, пагинация)
+            build: возвращает (тело JSON, дополнительные заголовки)
+        """
+        # Разные базы (например, в тестах) не должны делить ответы
+        cache_key = (key, str(db.get_bind().url), table_versions.get_version(table_name))
+        entry = self._get(cache_key)
+
+        if entry is None:
+            body, headers = build()
+            entry = CachedResponse(
+                body=body,
+                etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+                last_modified=time.time(),
+                headers=headers
+            )
+            self._put(cache_key, entry)
+
+        headers = {
+            **entry.headers,
+            "ETag": entry.etag,
+            "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        if _not_modified(request, entry):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self) -> None:
+        """Сбросить все ответы"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Счетчики попаданий, промахов и ответов 304"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _get(self, cache_key) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None or time.monotonic() - entry.created_at > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry
+
+    def _put(self, cache_key, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _not_modified(request: Request, entry: CachedResponse) -> bool:
+    """Условный запрос: клиент уже имеет актуальную версию"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match важнее If-Modified-Since; для GET сравнение слабое
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(entry.last_modified) <= since
+
+    return False
+
+
+# Общий экземпляр для приложения
+response_cache = ResponseCache()
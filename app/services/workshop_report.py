@@ -0,0 +1,142 @@
+"""
+Отчет о производстве в цехах
+
+Итоги, средние значения и разбивки по типам продукции и материалам
+считаются в SQL (GROUP BY) одним запросом UNION ALL - для одного цеха
+или сразу для всех цехов.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func, literal, union_all, null
+from sqlalchemy.orm import Session
+
+from app.database.database import (
+    Workshop, Product, ProductType, MaterialType, product_workshop_table
+)
+
+# Уровни строк агрегирующего запроса
+LEVEL_TOTAL = "total"
+LEVEL_PRODUCT_TYPE = "product_type"
+LEVEL_MATERIAL = "material"
+
+
+def _aggregates_query(workshop_id: Optional[int] = None):
+    """
+    Агрегаты по цехам: итог, разбивка по типу продукции и по материалу
+
+    Колонки: level, workshop_id, group_name, products, total_hours, average_hours
+    """
+    links = product_workshop_table
+
+    def grouped(level: str, group_column=None):
+        columns = [
+            literal(level).label("level"),
+            links.c.workshop_id,
+            (group_column if group_column is not None else null()).label("group_name"),
+            func.count(links.c.product_id).label("products"),
+            func.sum(links.c.manufacturing_time_hours).label("total_hours"),
+            func.avg(links.c.manufacturing_time_hours).label("average_hours"),
+        ]
+        query = select(*columns).select_from(links)
+        group_by = [links.c.workshop_id]
+
+        if level != LEVEL_TOTAL:
+            query = query.join(Product, Product.id == links.c.product_id)
+            if level == LEVEL_PRODUCT_TYPE:
+                query = query.join(ProductType, ProductType.id == Product.product_type_id)
+            else:
+                query = query.join(MaterialType, MaterialType.id == Product.material_id)
+            group_by.append(group_column)
+
+        if workshop_id is not None:
+            query = query.where(links.c.workshop_id == workshop_id)
+        return query.group_by(*group_by)
+
+    return union_all(
+        grouped(LEVEL_TOTAL),
+        grouped(LEVEL_PRODUCT_TYPE, ProductType.name),
+        grouped(LEVEL_MATERIAL, MaterialType.name),
+    )
+
+
+def _empty_production_data() -> dict:
+    return {
+        "total_products": 0,
+        "total_manufacturing_hours": 0.0,
+        "average_hours_per_product": 0.0,
+        "employee_productivity": 0.0,
+        "by_product_type": [],
+        "by_material": [],
+    }
+
+
+def _group_entry(row) -> dict:
+    return {
+        "name": row.group_name,
+        "products": row.products,
+        "total_hours": round(float(row.total_hours or 0), 2),
+        "average_hours": round(float(row.average_hours or 0), 2),
+    }
+
+
+def build_production_reports(db: Session, workshops: List[Workshop]) -> Dict[int, dict]:
+    """
+    Отчеты о производстве для переданных цехов
+
+    Для одного цеха агрегаты фильтруются по его ID, для нескольких
+    считаются по всем связям сразу.
+
+    Returns:
+        {workshop_id: {"workshop": {...}, "production_data": {...}}}
+    """
+    if not workshops:
+        return {}
+
+    reports = {
+        workshop.id: {
+            "workshop": {
+                "id": workshop.id,
+                "name": workshop.name,
+                "type": workshop.workshop_type,
+                "employee_count": workshop.employee_count,
+            },
+            "production_data": _empty_production_data(),
+        }
+        for workshop in workshops
+    }
+
+    only_workshop_id = workshops[0].id if len(workshops) == 1 else None
+    rows = db.execute(_aggregates_query(only_workshop_id)).all()
+
+    for row in rows:
+        report = reports.get(row.workshop_id)
+        if report is None:
+            continue
+        data = report["production_data"]
+
+        if row.level == LEVEL_TOTAL:
+            total_hours = float(row.total_hours or 0)
+            employee_count = report["workshop"]["employee_count"]
+            data["total_products"] = row.products
+            data["total_manufacturing_hours"] = round(total_hours, 2)
+            data["average_hours_per_product"] = round(float(row.average_hours or 0), 2)
+            data["employee_productivity"] = round(
+                total_hours / employee_count if employee_count > 0 else 0,
+                2
+            )
+        elif row.level == LEVEL_PRODUCT_TYPE:
+            data["by_product_type"].append(_group_entry(row))
+        else:
+            data["by_material"].append(_group_entry(row))
+
+    for report in reports.values():
+        data = report["production_data"]
+        data["by_product_type"].sort(key=lambda entry: entry["name"])
+        data["by_material"].sort(key=lambda entry: entry["name"])
+
+    return reports
+
+
+def build_production_report(db: Session, workshop: Workshop) -> dict:
+    """Отчет о производстве для одного цеха"""
+    return build_production_reports(db, [workshop])[workshop.id]
@@ -0,0 +1,8 @@
+"""
+Воспроизводимые замеры производительности
+
+- catalog   - генератор синтетического каталога (1k / 100k / 1m продуктов)
+- scenarios - сценарии: список и карточка продукции, отчет цеха,
+              расчет сырья, импорт из Excel
+- run       - запуск и сохранение результатов в JSON (python -m benchmarks.run)
+"""
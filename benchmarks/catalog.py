@@ -0,0 +1,146 @@
+"""
+Генератор синтетического каталога прямо в файл SQLite
+
+Справочники повторяют исходные данные (6 типов продукции, 6 материалов),
+цеха и продукция создаются в заданном количестве, у каждого продукта
+links_per_product связей с разными цехами. Значения детерминированы
+(random.Random(seed)): один и тот же размер дает одну и ту же базу, что
+позволяет сравнивать замеры разных коммитов.
+
+Строки вставляются пачками через executemany - память не зависит от
+размера каталога (1 млн продуктов и 3 млн связей).
+"""
+import random
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database.database import (
+    Base, MaterialType, ProductType, Workshop, Product,
+    product_workshop_table, create_sqlite_engine
+)
+from app.services.production_time import refresh_production_times
+
+# Размеры каталога по названию (параметр --sizes)
+SIZES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+PRODUCT_TYPES = [
+    ("Гостиные", 3.5),
+    ("Прихожие", 5.6),
+    ("Мягкая мебель", 3.0),
+    ("Кровати", 4.7),
+    ("Шкафы", 1.5),
+    ("Комоды", 2.3),
+]
+
+MATERIAL_TYPES = [
+    ("Мебельный щит из массива дерева", 0.008),
+    ("Ламинированное ДСП", 0.007),
+    ("Фанера", 0.0055),
+    ("МДФ", 0.003),
+    ("Массив дерева", 0.012),
+    ("Искусственный камень", 0.0015),
+]
+
+WORKSHOP_TYPES = ["Проектирование", "Обработка", "Сушка", "Сборка", "Контроль"]
+
+# Строк в одной команде executemany
+INSERT_BATCH_SIZE = 50_000
+
+
+def generate_catalog(database_path: Path, products_count: int, workshops_count: int = 12,
+                     links_per_product: int = 3, seed: int = 42) -> dict:
+    """
+    Создать базу database_path и заполнить синтетическим каталогом
+
+    Returns:
+        Количество записей по таблицам и время генерации (секунды)
+    """
+    database_path = Path(database_path)
+    if database_path.exists():
+        database_path.unlink()
+
+    started = time.perf_counter()
+    engine = create_sqlite_engine(f"sqlite:///{database_path}", "production")
+    engine.echo = False
+    rnd = random.Random(seed)
+    links_per_product = min(links_per_product, workshops_count)
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            # Черновая база: надежность записи не нужна
+            session.execute(text("PRAGMA synchronous = OFF"))
+
+            session.execute(ProductType.__table__.insert(), [
+                {"name": name, "coefficient": coefficient} for name, coefficient in PRODUCT_TYPES
+            ])
+            session.execute(MaterialType.__table__.insert(), [
+                {"name": name, "loss_percentage": loss} for name, loss in MATERIAL_TYPES
+            ])
+            session.execute(Workshop.__table__.insert(), [
+                {
+                    "name": f"Цех {number}",
+                    "workshop_type": WORKSHOP_TYPES[number % len(WORKSHOP_TYPES)],
+                    "employee_count": rnd.randint(2, 20),
+                }
+                for number in range(1, workshops_count + 1)
+            ])
+
+            for batch in _batches(_product_rows(rnd, products_count)):
+                session.execute(Product.__table__.insert(), batch)
+
+            links = _link_rows(rnd, products_count, workshops_count, links_per_product)
+            for batch in _batches(links):
+                session.execute(product_workshop_table.insert(), batch)
+
+            refresh_production_times(session)
+            session.commit()
+    finally:
+        engine.dispose()
+
+    return {
+        "products": products_count,
+        "workshops": workshops_count,
+        "links": products_count * links_per_product,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _product_rows(rnd: random.Random, products_count: int) -> Iterator[dict]:
+    for number in range(1, products_count + 1):
+        yield {
+            "article": str(1_000_000 + number),
+            "name": f"Продукт {number}",
+            "product_type_id": rnd.randint(1, len(PRODUCT_TYPES)),
+            "material_id": rnd.randint(1, len(MATERIAL_TYPES)),
+            "min_partner_price": round(rnd.uniform(1_000, 300_000), 2),
+        }
+
+
+def _link_rows(rnd: random.Random, products_count: int, workshops_count: int,
+               links_per_product: int) -> Iterator[dict]:
+    workshop_ids = range(1, workshops_count + 1)
+    for product_id in range(1, products_count + 1):
+        for workshop_id in rnd.sample(workshop_ids, links_per_product):
+            yield {
+                "product_id": product_id,
+                "workshop_id": workshop_id,
+                "manufacturing_time_hours": round(rnd.uniform(0.5, 5.0), 1),
+            }
+
+
+def _batches(rows: Iterator[dict]) -> Iterator[list]:
+    while True:
+        batch = list(islice(rows, INSERT_BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
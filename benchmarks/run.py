@@ -0,0 +1,186 @@
+"""
+Запуск набора замеров и сохранение результатов в JSON
+
+Для каждого размера каталога генерируется черновая база, приложение
+подключается к ней через dependency_overrides и прогоняются сценарии
+benchmarks.scenarios. Результат (с коммитом, на котором выполнялся
+замер) пишется в benchmarks/results/, что позволяет сравнивать коммиты.
+
+Запуск:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1k,100k --requests 500
+    python -m benchmarks.run --sizes 1m --requests 200 --import-products 20000
+"""
+import sys
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+
+# Замеры идут на черновых базах - схема furniture.db при старте не обновляется
+os.environ.setdefault("MIGRATE_ON_STARTUP", "0")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import create_sqlite_engine, create_async_sqlite_engine
+from app.database.session import get_db, get_async_db
+from app.main import app
+from benchmarks.catalog import SIZES, generate_catalog
+from benchmarks.scenarios import SCENARIOS, measure, run_import
+
+RESULTS_DIR = current_dir / "results"
+
+
+def run_size(size_name: str, work_dir: Path, requests_count: int,
+             import_products: int, seed: int) -> dict:
+    """Все сценарии на каталоге размера size_name"""
+    database_path = work_dir / f"catalog_{size_name}.db"
+    catalog = generate_catalog(database_path, SIZES[size_name], seed=seed)
+    print(f"\n[{size_name}] каталог: {catalog['products']} продуктов, "
+          f"{catalog['links']} связей, {catalog['seconds']:.1f} с")
+
+    engine = create_sqlite_engine(f"sqlite:///{database_path}", "production")
+    async_engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{database_path}", "production")
+    # Логирование SQL исказило бы замеры
+    engine.echo = False
+    async_engine.echo = False
+
+    def override_get_db():
+        db = Session(engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession(async_engine) as db:
+            yield db
+
+    results = {}
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        with TestClient(app) as client:
+            for scenario in SCENARIOS:
+                result = measure(client, engine, scenario, catalog, requests_count, seed)
+                results[scenario.name] = result
+                print(
+                    f"  {scenario.name:<18}"
+                    f"{result['p50_ms']:>10.2f}"
+                    f"{result['p99_ms']:>10.2f}"
+                    f"{result['queries_per_request']:>10.1f}"
+                    f"{result['errors']:>8}"
+                )
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        async_engine.sync_engine.dispose()
+
+    import_count = min(import_products, SIZES[size_name])
+    import_result = run_import(work_dir / f"import_{size_name}", import_count, seed=seed)
+    print(f"  {'import':<18}{import_result['import_seconds']:>10.2f} с, "
+          f"{import_result['rows_per_second']:.0f} строк/с, "
+          f"SQL запросов: {import_result['queries']}")
+
+    return {
+        "size": size_name,
+        "catalog": catalog,
+        "database_mb": round(database_path.stat().st_size / 1024 / 1024, 1),
+        "scenarios": results,
+        "import": import_result,
+    }
+
+
+def git_revision() -> dict:
+    """Коммит и наличие незафиксированных изменений"""
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def parse_args(argv=None):
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Замеры производительности на синтетическом каталоге")
+    parser.add_argument(
+        "--sizes", default="1k",
+        help=f"размеры каталога через запятую: {', '.join(SIZES)} (по умолчанию 1k)"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="запросов в каждом сценарии")
+    parser.add_argument(
+        "--import-products", type=int, default=5000,
+        help="продуктов в книгах Excel для замера импорта (не больше размера каталога)"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="зерно генератора данных")
+    parser.add_argument("--output", type=Path, help="файл результатов (по умолчанию benchmarks/results/)")
+    parser.add_argument("--work-dir", type=Path, help="каталог черновых баз (по умолчанию временный)")
+    args = parser.parse_args(argv)
+
+    args.sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in args.sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"неизвестные размеры: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    """Точка входа"""
+    args = parse_args(argv)
+    revision = git_revision()
+    started_at = datetime.now(timezone.utc)
+
+    print("=" * 70)
+    print("ЗАМЕРЫ ПРОИЗВОДИТЕЛЬНОСТИ")
+    print(f"Размеры: {', '.join(args.sizes)}, запросов в сценарии: {args.requests}, "
+          f"коммит: {(revision['commit'] or '-')[:10]}")
+    print("=" * 70)
+    print(f"  {'Сценарий':<18}{'p50, мс':>10}{'p99, мс':>10}{'SQL/запр':>10}{'Ошибок':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or Path(tmp_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        sizes = [
+            run_size(size, work_dir, args.requests, args.import_products, args.seed)
+            for size in args.sizes
+        ]
+
+    report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        **revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requests_per_scenario": args.requests,
+        "seed": args.seed,
+        "sizes": sizes,
+    }
+
+    output = args.output
+    if output is None:
+        short_commit = (revision["commit"] or "nocommit")[:10]
+        output = RESULTS_DIR / f"{started_at:%Y%m%d-%H%M%S}-{short_commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print("\n" + "=" * 70)
+    print(f"Результаты: {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Сценарии замеров: HTTP запросы через TestClient и импорт из Excel
+
+Для HTTP сценариев считаются задержки (p50 / p99) и число SQL запросов
+на один вызов (событие before_cursor_execute движка). Импорт выполняется
+потоковыми функциями app.scripts.import_data в отдельную черновую базу
+из сгенерированных книг Excel.
+"""
+import logging
+import math
+import os
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import EXCEL_FILES
+from app.crud.pagination import encode_cursor
+from app.database.database import Base, create_sqlite_engine
+from benchmarks.catalog import MATERIAL_TYPES, PRODUCT_TYPES, WORKSHOP_TYPES
+
+# Запросов без замера перед каждым сценарием
+WARMUP_REQUESTS = 5
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """HTTP сценарий: send(client, rnd, catalog) выполняет один запрос"""
+    name: str
+    send: Callable
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("product_list", lambda client, rnd, catalog: client.get(
+        "/api/products/",
+        params={"limit": 50, "after": encode_cursor(rnd.randint(0, max(catalog["products"] - 50, 0)))}
+    )),
+    Scenario("product_detail", lambda client, rnd, catalog: client.get(
+        f"/api/products/{rnd.randint(1, catalog['products'])}"
+    )),
+    Scenario("workshop_report", lambda client, rnd, catalog: client.get(
+        f"/api/workshops/{rnd.randint(1, catalog['workshops'])}/production-report"
+    )),
+    Scenario("raw_material", lambda client, rnd, catalog: client.post(
+        "/api/calculations/raw-material",
+        json={
+            "product_type_id": rnd.randint(1, len(PRODUCT_TYPES)),
+            "material_type_id": rnd.randint(1, len(MATERIAL_TYPES)),
+            "product_quantity": rnd.randint(1, 500),
+            "param1": round(rnd.uniform(0.5, 3.0), 2),
+            "param2": round(rnd.uniform(0.5, 3.0), 2),
+        }
+    )),
+]
+
+
+def measure(client: TestClient, engine, scenario: Scenario, catalog: dict,
+            requests_count: int, seed: int) -> dict:
+    """
+    requests_count вызовов сценария
+
+    Returns:
+        Задержки в миллисекундах, SQL запросов на вызов, ошибки, RSS процесса
+    """
+    rnd = random.Random(seed)
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    for _ in range(WARMUP_REQUESTS):
+        scenario.send(client, rnd, catalog)
+
+    latencies = []
+    query_counts = []
+    errors = 0
+    event.listen(engine, "before_cursor_execute", count_query)
+    try:
+        for _ in range(requests_count):
+            queries = 0
+            started = time.perf_counter()
+            response = scenario.send(client, rnd, catalog)
+            latencies.append(time.perf_counter() - started)
+            query_counts.append(queries)
+            if response.status_code >= 400:
+                errors += 1
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+
+    latencies.sort()
+    return {
+        "requests": requests_count,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "queries_per_request": round(statistics.fmean(query_counts), 2),
+        "max_queries_per_request": max(query_counts),
+        "errors": errors,
+        **memory_usage(),
+    }
+
+
+def run_import(work_dir: Path, products_count: int, workshops_count: int = 12,
+               batch_size: int = 5000, seed: int = 42) -> dict:
+    """
+    Потоковый импорт сгенерированных книг Excel в новую черновую базу
+
+    Returns:
+        Время генерации книг и импорта (всего и по этапам), SQL запросов, RSS
+    """
+    work_dir = Path(work_dir)
+    excel_dir = work_dir / "excel"
+    excel_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    files = write_import_workbooks(excel_dir, products_count, workshops_count, seed)
+    workbooks_seconds = time.perf_counter() - started
+
+    # Модуль импорта при загрузке открывает import.log в текущем каталоге
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        from app.scripts import import_data
+    finally:
+        os.chdir(previous_dir)
+
+    database_path = work_dir / "import.db"
+    if database_path.exists():
+        database_path.unlink()
+    engine = create_sqlite_engine(f"sqlite:///{database_path}", "production")
+    engine.echo = False
+    Base.metadata.create_all(bind=engine)
+
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    stages = [
+        ("material_types", import_data.stream_import_material_types),
+        ("product_types", import_data.stream_import_product_types),
+        ("workshops", import_data.stream_import_workshops),
+        ("products", import_data.stream_import_products),
+        ("product_workshop", import_data.stream_import_product_workshop_links),
+    ]
+    stage_seconds = {}
+
+    original_files = dict(EXCEL_FILES)
+    import_logger = logging.getLogger(import_data.__name__)
+    original_level = import_logger.level
+    EXCEL_FILES.update(files)
+    import_logger.setLevel(logging.WARNING)
+    event.listen(engine, "before_cursor_execute", count_query)
+    try:
+        with Session(engine) as session:
+            for name, stage in stages:
+                stage_started = time.perf_counter()
+                stage(session, batch_size)
+                stage_seconds[name] = round(time.perf_counter() - stage_started, 3)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+        import_logger.setLevel(original_level)
+        EXCEL_FILES.clear()
+        EXCEL_FILES.update(original_files)
+        engine.dispose()
+
+    total_seconds = sum(stage_seconds.values())
+    return {
+        "products": products_count,
+        "links": products_count * min(3, workshops_count),
+        "workbooks_seconds": round(workbooks_seconds, 3),
+        "import_seconds": round(total_seconds, 3),
+        "rows_per_second": round(products_count * (1 + min(3, workshops_count)) / total_seconds, 1)
+        if total_seconds else 0.0,
+        "stage_seconds": stage_seconds,
+        "queries": queries,
+        **memory_usage(),
+    }
+
+
+def write_import_workbooks(excel_dir: Path, products_count: int, workshops_count: int,
+                           seed: int) -> Dict[str, Path]:
+    """Книги Excel в формате исходных файлов (столбцы как в data/isxod)"""
+    rnd = random.Random(seed)
+    sheets = {
+        "material_types": (
+            ["Тип материала", "Процент потерь сырья"], MATERIAL_TYPES
+        ),
+        "product_types": (
+            ["Тип продукции", "Коэффициент типа продукции"], PRODUCT_TYPES
+        ),
+        "workshops": (
+            ["Название цеха", "Тип цеха", "Количество человек для производства"],
+            [
+                (f"Цех {number}", WORKSHOP_TYPES[number % len(WORKSHOP_TYPES)], rnd.randint(2, 20))
+                for number in range(1, workshops_count + 1)
+            ]
+        ),
+        "products": (
+            ["Тип продукции", "Наименование продукции", "Артикул",
+             "Минимальная стоимость для партнера", "Основной материал"],
+            (
+                (rnd.choice(PRODUCT_TYPES)[0], f"Продукт {number}", 1_000_000 + number,
+                 round(rnd.uniform(1_000, 300_000), 2), rnd.choice(MATERIAL_TYPES)[0])
+                for number in range(1, products_count + 1)
+            )
+        ),
+        "product_workshop": (
+            ["Наименование продукции", "Название цеха", "Время изготовления, ч"],
+            (
+                (f"Продукт {number}", f"Цех {workshop}", round(rnd.uniform(0.5, 5.0), 1))
+                for number in range(1, products_count + 1)
+                for workshop in rnd.sample(range(1, workshops_count + 1), min(3, workshops_count))
+            )
+        ),
+    }
+
+    files = {}
+    for key, (header, rows) in sheets.items():
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(header)
+        for row in rows:
+            sheet.append(list(row))
+        files[key] = excel_dir / EXCEL_FILES[key].name
+        workbook.save(files[key])
+    return files
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Перцентиль по ближайшему рангу (значения отсортированы)"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(sorted_values)) - 1
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+def memory_usage() -> dict:
+    """Текущий и пиковый RSS процесса в МБ (текущий - только Linux)"""
+    return {
+        "rss_mb": _current_rss_mb(),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:     # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux - КиБ, macOS - байты
+    divisor = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    return round(peak / divisor, 1)
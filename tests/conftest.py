@@ -0,0 +1,164 @@
+"""
+Общие фикстуры для тестов: временная БД SQLite и клиент приложения
+"""
+import os
+
+# Тесты работают со своими временными базами: обновление схемы furniture.db
+# при старте приложения не нужно (проверяется отдельно в test_indexes.py)
+os.environ.setdefault("MIGRATE_ON_STARTUP", "0")
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.testclient import TestClient
+
+from app.config import EXCEL_FILES
+from app.database.database import (
+    Base, MaterialType, ProductType, Workshop, Product, product_workshop_table,
+    create_async_sqlite_engine
+)
+from app.database.session import get_db, get_async_db
+from app.main import app
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Движок на временном файле БД с включенными внешними ключами"""
+    test_engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    
+    @event.listens_for(test_engine, "connect")
+    def setup_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
+    
+    Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Сессия для подготовки данных в тестах"""
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(engine):
+    """Клиент приложения, работающий с временной БД (синхронно и через aiosqlite)"""
+    async_engine = create_async_sqlite_engine(
+        str(engine.url).replace("sqlite://", "sqlite+aiosqlite://", 1)
+    )
+    async_engine.echo = False
+    
+    def override_get_db():
+        session = Session(engine)
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    async def override_get_async_db():
+        async with AsyncSession(async_engine) as session:
+            yield session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+    async_engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def import_data(tmp_path, monkeypatch):
+    """Модуль импорта (при первой загрузке создает import.log в текущем каталоге)"""
+    monkeypatch.chdir(tmp_path)
+    from app.scripts import import_data
+    return import_data
+
+
+@pytest.fixture
+def query_counter(engine):
+    """Счетчик SQL запросов, выполненных через движок"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_catalog(db: Session, products_count: int = 10, workshops_count: int = 3):
+    """
+    Заполнить БД небольшим каталогом:
+    2 типа продукции, 2 материала, цеха и продукты, связанные со всеми цехами
+    """
+    product_types = [
+        ProductType(name="Гостиные", coefficient=3.5),
+        ProductType(name="Прихожие", coefficient=5.6),
+    ]
+    materials = [
+        MaterialType(name="Мебельный щит из массива дерева", loss_percentage=0.8),
+        MaterialType(name="Ламинированное ДСП", loss_percentage=0.7),
+    ]
+    workshops = [
+        Workshop(name=f"Цех {i}", workshop_type="Обработка", employee_count=i + 2)
+        for i in range(workshops_count)
+    ]
+    db.add_all(product_types + materials + workshops)
+    db.flush()
+    
+    products = [
+        Product(
+            article=str(1000 + i),
+            name=f"Продукт {i}",
+            product_type_id=product_types[i % 2].id,
+            material_id=materials[i % 2].id,
+            min_partner_price=1000.0 + i
+        )
+        for i in range(products_count)
+    ]
+    db.add_all(products)
+    db.flush()
+    
+    links = [
+        {
+            "product_id": product.id,
+            "workshop_id": workshop.id,
+            "manufacturing_time_hours": 1.2 + index
+        }
+        for product in products
+        for index, workshop in enumerate(workshops)
+    ]
+    if links:
+        db.execute(product_workshop_table.insert(), links)
+    db.commit()
+    return products, workshops
+
+
+def use_workbooks(monkeypatch, files):
+    """Подменить пути исходных книг Excel (EXCEL_FILES) на тестовые"""
+    for key, path in files.items():
+        monkeypatch.setitem(EXCEL_FILES, key, path)
+
+
+def catalog_dump(db: Session):
+    """Продукты и связи продукт-цех в сравнимом виде (без суррогатных ID строк)"""
+    products = db.execute(
+        select(Product.article, Product.name, Product.product_type_id, Product.material_id,
+               Product.min_partner_price).order_by(Product.article)
+    ).all()
+    links = db.execute(
+        select(product_workshop_table.c.product_id, product_workshop_table.c.workshop_id,
+               product_workshop_table.c.manufacturing_time_hours)
+        .order_by(product_workshop_table.c.product_id, product_workshop_table.c.workshop_id)
+    ).all()
+    return products, links
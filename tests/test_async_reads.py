@@ -0,0 +1,51 @@
+"""
+Асинхронные эндпоинты чтения возвращают то же, что и синхронные
+"""
+import pytest
+
+from tests.conftest import seed_catalog
+
+
+@pytest.mark.parametrize("path", [
+    "/products/?limit=3",
+    "/products/2",
+    "/catalog/product-types",
+    "/catalog/material-types/2",
+    "/calculations/production-details/1",
+])
+def test_async_get_matches_sync(client, db, path):
+    seed_catalog(db, products_count=5, workshops_count=3)
+    
+    sync_response = client.get(f"/api{path}")
+    async_response = client.get(f"/api/async{path}")
+    
+    assert async_response.status_code == sync_response.status_code == 200
+    assert async_response.json() == sync_response.json()
+    assert async_response.headers.get("X-Next-Cursor") == sync_response.headers.get("X-Next-Cursor")
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/calculations/production-time/batch", {"product_ids": [1, 2, 999]}),
+    ("/calculations/raw-material", {
+        "product_type_id": 1, "material_type_id": 1,
+        "product_quantity": 10, "param1": 2.5, "param2": 1.8
+    }),
+])
+def test_async_post_matches_sync(client, db, path, body):
+    seed_catalog(db, products_count=3, workshops_count=2)
+    
+    sync_response = client.post(f"/api{path}", json=body)
+    async_response = client.post(f"/api/async{path}", json=body)
+    
+    assert async_response.status_code == sync_response.status_code == 200
+    assert async_response.json() == sync_response.json()
+
+
+def test_async_product_not_found(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    sync_response = client.get("/api/calculations/production-details/999")
+    async_response = client.get("/api/async/calculations/production-details/999")
+    
+    assert async_response.status_code == sync_response.status_code
+    assert async_response.text == sync_response.text
@@ -0,0 +1,81 @@
+"""
+Набор замеров: генератор каталога, сценарии и импорт на маленьком каталоге
+"""
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.database.database import Product, product_workshop_table
+from app.database.session import get_db
+from app.main import app
+from app.services.production_time import find_inconsistent_production_times
+from benchmarks.catalog import generate_catalog
+from benchmarks.scenarios import SCENARIOS, measure, percentile, run_import
+
+
+def test_generate_catalog_is_deterministic(tmp_path):
+    first = generate_catalog(tmp_path / "a.db", 300, workshops_count=5, seed=7)
+    generate_catalog(tmp_path / "b.db", 300, workshops_count=5, seed=7)
+
+    assert (first["products"], first["links"]) == (300, 900)
+    dumps = []
+    for name in ("a.db", "b.db"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        with Session(engine) as db:
+            assert db.scalar(select(func.count()).select_from(product_workshop_table)) == 900
+            assert find_inconsistent_production_times(db) == []
+            dumps.append(db.execute(
+                select(Product.product_type_id, Product.material_id, Product.min_partner_price)
+                .order_by(Product.id)
+            ).all())
+        engine.dispose()
+    assert dumps[0] == dumps[1]
+
+
+def test_scenarios_run_without_errors(tmp_path):
+    catalog = generate_catalog(tmp_path / "catalog.db", 200, workshops_count=4)
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}",
+                           connect_args={"check_same_thread": False})
+
+    def override_get_db():
+        with Session(engine) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            results = {
+                scenario.name: measure(client, engine, scenario, catalog, 10, seed=1)
+                for scenario in SCENARIOS
+            }
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    assert set(results) == {"product_list", "product_detail", "workshop_report", "raw_material"}
+    for result in results.values():
+        assert result["errors"] == 0
+        assert result["p50_ms"] <= result["p99_ms"]
+    assert results["product_list"]["queries_per_request"] == 1
+
+
+def test_run_import(tmp_path):
+    result = run_import(tmp_path, products_count=50, workshops_count=4)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(Product)) == 50
+        assert db.scalar(select(func.count()).select_from(product_workshop_table)) == 150
+    engine.dispose()
+    assert set(result["stage_seconds"]) == {
+        "material_types", "product_types", "workshops", "products", "product_workshop"
+    }
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,49 @@
+"""
+HTML форма расчета сырья использует общий расчет и кэш справочников
+"""
+from app.services.catalog_cache import catalog_cache
+from tests.conftest import seed_catalog
+
+FORM = {
+    "product_type_id": 1,
+    "material_type_id": 1,
+    "product_quantity": 10,
+    "param1": 2.5,
+    "param2": 1.8,
+}
+
+
+def test_form_matches_api(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    api = client.post("/api/calculations/raw-material", json=FORM).json()
+    page = client.post("/calculations", data=FORM)
+    
+    assert page.status_code == 200
+    # 10 * 2.5 * 1.8 * 3.5 * 1.008 = 158.76 -> 159
+    assert api["raw_material_quantity"] == 159
+    assert "159 ед." in page.text
+
+
+def test_form_costs_at_most_one_query(client, db, query_counter):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    catalog_cache.invalidate()
+    
+    query_counter.clear()
+    client.post("/calculations", data=FORM)
+    assert len(query_counter) == 1
+    
+    query_counter.clear()
+    client.post("/calculations", data=FORM)
+    client.get("/calculations")
+    assert query_counter == []
+
+
+def test_form_shows_error_for_unknown_type(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    page = client.post("/calculations", data={**FORM, "product_type_id": 999})
+    
+    assert page.status_code == 200
+    assert "Ошибка расчета!" in page.text
+    assert "Гостиные" in page.text
@@ -0,0 +1,96 @@
+"""
+Кэш справочников и его инвалидация при записи
+"""
+from app.database.database import ProductType, MaterialType
+from app.services.catalog_cache import CatalogCache
+from tests.conftest import seed_catalog
+
+
+def test_cache_serves_repeated_lookups_without_queries(db, query_counter):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    cache = CatalogCache()
+    
+    first = cache.get_product_type(db, 1)
+    query_counter.clear()
+    for _ in range(10):
+        assert cache.get_product_type(db, 1) == first
+        assert cache.get_product_type_by_name(db, "Гостиные") == first
+    
+    assert query_counter == []
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 20
+
+
+def test_cache_is_invalidated_on_commit(db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    cache = CatalogCache()
+    assert cache.get_material_type_by_name(db, "Фанера") is None
+    
+    db.add(MaterialType(name="Фанера", loss_percentage=0.55))
+    db.commit()
+    assert cache.get_material_type_by_name(db, "Фанера").loss_percentage == 0.55
+    
+    product_type = db.get(ProductType, 1)
+    product_type.coefficient = 4.0
+    db.commit()
+    assert cache.get_product_type(db, 1).coefficient == 4.0
+    
+    db.query(ProductType).filter(ProductType.id == 2).delete()
+    db.commit()
+    assert cache.get_product_type(db, 2) is None
+
+
+def test_cache_ignores_rolled_back_changes(db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    cache = CatalogCache()
+    cache.product_types(db)
+    
+    db.add(ProductType(name="Кухни", coefficient=2.0))
+    db.flush()
+    db.rollback()
+    
+    cache.product_types(db)
+    assert cache.stats()["misses"] == 1
+
+
+def test_product_crud_rechecks_cache_miss_in_database(db):
+    from app.crud.products import product_crud
+    from app.schemas.product import ProductCreate, ProductUpdate
+    from app.services.catalog_cache import catalog_cache
+    
+    seed_catalog(db, products_count=1, workshops_count=1)
+    catalog_cache.material_types(db)
+    # Запись из другого процесса: версия таблицы в этом процессе не меняется
+    db.connection().exec_driver_sql(
+        "INSERT INTO material_types (id, name, loss_percentage) VALUES (50, 'Фанера', 0.55)"
+    )
+    db.commit()
+    assert catalog_cache.get_material_type(db, 50) is None
+    
+    product = product_crud.create(db, ProductCreate(
+        product_type_id=1, material_id=50, name="Шкаф", article="990001", min_partner_price=100.0
+    ))
+    
+    assert product.material_id == 50
+    assert catalog_cache.get_material_type(db, 50).name == "Фанера"
+    updated = product_crud.update(db, product.id, ProductUpdate(material_id=1))
+    assert updated.material_id == 1
+
+
+def test_stats_count_every_lookup_under_concurrency(db):
+    from concurrent.futures import ThreadPoolExecutor
+    
+    seed_catalog(db, products_count=1, workshops_count=1)
+    cache = CatalogCache()
+    cache.product_types(db)
+    
+    def lookups(_):
+        for _ in range(500):
+            cache.get_product_type(db, 1)
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lookups, range(8)))
+    
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 500 + 1
+    assert stats["hit_ratio"] == round(stats["hits"] / (8 * 500 + 1), 4)
@@ -0,0 +1,74 @@
+"""
+Кэширование ответов справочников: ETag, 304 и инвалидация при записи
+"""
+import pytest
+
+from app.database.database import ProductType
+from app.services.response_cache import response_cache
+from tests.conftest import seed_catalog
+
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    response_cache.invalidate()
+    yield
+    response_cache.invalidate()
+
+
+def test_repeated_request_is_served_from_cache(client, db, query_counter):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    first = client.get("/api/catalog/product-types")
+    query_counter.clear()
+    second = client.get("/api/catalog/product-types")
+    
+    assert query_counter == []
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert [item["name"] for item in second.json()] == ["Гостиные", "Прихожие"]
+
+
+def test_if_none_match_returns_304(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    etag = client.get("/api/catalog/material-types").headers["ETag"]
+    
+    response = client.get("/api/catalog/material-types", headers={"If-None-Match": etag})
+    
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_if_modified_since_returns_304(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    last_modified = client.get("/api/catalog/product-types").headers["Last-Modified"]
+    
+    response = client.get("/api/catalog/product-types", headers={"If-Modified-Since": last_modified})
+    
+    assert response.status_code == 304
+
+
+def test_write_changes_etag(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    etag = client.get("/api/catalog/product-types").headers["ETag"]
+    
+    db.get(ProductType, 1).coefficient = 4.0
+    db.commit()
+    response = client.get("/api/catalog/product-types", headers={"If-None-Match": etag})
+    
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["coefficient"] == 4.0
+
+
+def test_pagination_is_part_of_cache_key(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    first_page = client.get("/api/catalog/product-types?limit=1")
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/api/catalog/product-types?limit=1&after={cursor}")
+    
+    assert [item["id"] for item in first_page.json()] == [1]
+    assert [item["id"] for item in second_page.json()] == [2]
+    assert client.get("/api/catalog/product-types?limit=1").headers["X-Next-Cursor"] == cursor
+    assert client.get("/api/catalog/product-types?after=bad").status_code == 400
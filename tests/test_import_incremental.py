@@ -0,0 +1,149 @@
+"""
+Инкрементальный импорт: хэши строк по естественным ключам
+"""
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.config import EXCEL_FILES
+from app.database.database import Product, Workshop, product_workshop_table
+from app.services.production_time import find_inconsistent_production_times
+from benchmarks.scenarios import write_import_workbooks
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    files = write_import_workbooks(tmp_path, 60, 4, seed=5)
+    for key, path in files.items():
+        monkeypatch.setitem(EXCEL_FILES, key, path)
+    return files
+
+
+def edit_workbook(path, edit):
+    """edit(rows) получает строки без заголовка и меняет их на месте"""
+    workbook = load_workbook(path)
+    sheet = workbook.active
+    header, *rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+    edit(rows)
+    sheet.delete_rows(1, sheet.max_row)
+    for row in [header, *rows]:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def count_statements(engine, action):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements
+
+
+def test_rerun_skips_unchanged_rows(import_data, files, engine):
+    with Session(engine) as db:
+        first = import_data.incremental_import(db, batch_size=25)
+        assert first['counts']['products']['inserted'] == 60
+        assert first['counts']['product_workshop']['inserted'] == 180
+
+        second, statements = count_statements(
+            engine, lambda: import_data.incremental_import(db, batch_size=25)
+        )
+        assert db.scalar(select(func.count()).select_from(Product)) == 60
+
+    for counts in second['counts'].values():
+        assert counts['inserted'] == counts['updated'] == counts['deleted'] == 0
+    assert second['counts']['products']['unchanged'] == 60
+    assert second['counts']['product_workshop']['unchanged'] == 180
+    assert not [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE"))]
+
+
+def test_changed_and_new_rows(import_data, files, engine):
+    with Session(engine) as db:
+        import_data.incremental_import(db, batch_size=25)
+
+    def change_products(rows):
+        rows[0][3] = 12345.67
+        rows.append([rows[1][0], "Новый продукт", 5_000_000, 999.5, rows[1][4]])
+
+    def change_links(rows):
+        rows[0][2] = 9.5
+        rows.append(["Новый продукт", "Цех 1", 2.0])
+
+    edit_workbook(files['products'], change_products)
+    edit_workbook(files['product_workshop'], change_links)
+
+    with Session(engine) as db:
+        result = import_data.incremental_import(db, batch_size=25)
+        price = db.scalar(select(Product.min_partner_price).where(Product.name == "Продукт 1"))
+        new_product = db.scalar(select(Product).where(Product.article == "5000000"))
+        assert find_inconsistent_production_times(db) == []
+
+    assert result['counts']['products'] == {
+        'inserted': 1, 'updated': 1, 'unchanged': 59, 'skipped': 0, 'errors': 0, 'deleted': 0
+    }
+    assert result['counts']['product_workshop']['inserted'] == 1
+    assert result['counts']['product_workshop']['updated'] == 1
+    assert price == 12345.67
+    assert new_product.name == "Новый продукт"
+
+
+def test_missing_rows_deleted_only_on_request(import_data, files, engine):
+    with Session(engine) as db:
+        import_data.incremental_import(db, batch_size=25)
+
+    edit_workbook(files['products'], lambda rows: rows.pop(0))
+    edit_workbook(files['product_workshop'], lambda rows: rows.pop(0))
+    # Цех 4 остается в базе, но больше не упоминается в файле цехов
+    edit_workbook(files['workshops'], lambda rows: rows.pop())
+
+    with Session(engine) as db:
+        kept = import_data.incremental_import(db, batch_size=25)
+        assert db.scalar(select(func.count()).select_from(Product)) == 60
+
+        removed = import_data.incremental_import(db, batch_size=25, delete_missing=True)
+        assert db.scalar(select(func.count()).select_from(Product)) == 59
+        assert db.scalar(select(Product).where(Product.name == "Продукт 1")) is None
+        links = db.scalar(select(func.count()).select_from(product_workshop_table))
+        assert find_inconsistent_production_times(db) == []
+        # Цех используется в связях - не удаляется
+        assert db.scalar(select(Workshop).where(Workshop.name == "Цех 4")) is not None
+
+    assert kept['counts']['products']['deleted'] == 0
+    assert removed['counts']['products']['deleted'] == 1
+    assert removed['counts']['product_workshop']['deleted'] == 1
+    assert removed['counts']['workshops']['deleted'] == 0
+    # Из 180 связей: одна убрана из файла, остальные связи Продукта 1 удалены вместе с ним
+    assert links == 177
+
+
+def test_deleted_product_takes_link_hashes_with_it(import_data, files, engine):
+    hashes = import_data.import_row_hashes_table
+    link_hashes = select(func.count()).select_from(hashes).where(hashes.c.source == 'product_workshop')
+    products = load_workbook(files['products']).active
+    original = [list(row) for row in products.iter_rows(min_row=2, values_only=True)]
+    with Session(engine) as db:
+        import_data.incremental_import(db, batch_size=25)
+        assert db.scalar(link_hashes) == 180
+
+    # Продукт убран только из файла продукции: его связи в файле остаются
+    edit_workbook(files['products'], lambda rows: rows.pop(0))
+    with Session(engine) as db:
+        import_data.incremental_import(db, batch_size=25, delete_missing=True)
+        assert db.scalar(select(func.count()).select_from(product_workshop_table)) == 177
+        assert db.scalar(link_hashes) == 177
+
+    edit_workbook(files['products'], lambda rows: rows.insert(0, original[0]))
+    with Session(engine) as db:
+        restored = import_data.incremental_import(db, batch_size=25)
+        assert db.scalar(link_hashes) == 180
+        assert find_inconsistent_production_times(db) == []
+
+    assert restored['counts']['products']['inserted'] == 1
+    assert restored['counts']['product_workshop']['inserted'] == 3
@@ -0,0 +1,82 @@
+"""
+Параллельный импорт: разбор книг в пуле процессов, запись одним писателем
+"""
+import logging
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.config import EXCEL_FILES
+from app.database.database import Base, MaterialType
+from app.services.production_time import find_inconsistent_production_times
+from benchmarks.scenarios import write_import_workbooks
+from tests.conftest import catalog_dump, use_workbooks
+
+
+def test_parallel_import_matches_stream_import(import_data, tmp_path, monkeypatch, engine):
+    use_workbooks(monkeypatch, write_import_workbooks(tmp_path, 120, 5, seed=3))
+
+    with Session(engine) as db:
+        timings = import_data.parallel_import(db, batch_size=50, workers=2)
+        parallel = catalog_dump(db)
+        assert find_inconsistent_production_times(db) == []
+
+    stream_engine = create_engine(f"sqlite:///{tmp_path / 'stream.db'}")
+    Base.metadata.create_all(stream_engine)
+    with Session(stream_engine) as db:
+        for file_key, _, _ in import_data.IMPORT_STAGES:
+            stage = {
+                'material_types': import_data.stream_import_material_types,
+                'product_types': import_data.stream_import_product_types,
+                'workshops': import_data.stream_import_workshops,
+                'products': import_data.stream_import_products,
+                'product_workshop': import_data.stream_import_product_workshop_links,
+            }[file_key]
+            stage(db, 50)
+        stream = catalog_dump(db)
+    stream_engine.dispose()
+
+    assert len(parallel[0]) == 120 and len(parallel[1]) == 360
+    assert parallel == stream
+    assert list(timings) == [key for key, _, _ in import_data.IMPORT_STAGES]
+    assert all(set(stage) == {"parse", "wait", "write"} for stage in timings.values())
+
+
+def test_parallel_import_reports_row_errors(import_data, tmp_path, monkeypatch, engine, caplog):
+    path = tmp_path / "materials.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Тип материала", "Процент потерь сырья"])
+    sheet.append(["Фанера", 0.0055])
+    sheet.append(["МДФ", "много"])
+    sheet.append(["Фанера", 0.001])
+    workbook.save(path)
+    monkeypatch.setitem(EXCEL_FILES, 'material_types', path)
+    for key in ('product_types', 'workshops', 'products', 'product_workshop'):
+        monkeypatch.setitem(EXCEL_FILES, key, tmp_path / f"missing_{key}.xlsx")
+
+    with caplog.at_level(logging.INFO, logger=import_data.logger.name), Session(engine) as db:
+        timings = import_data.parallel_import(db, batch_size=10, workers=2)
+        names = db.scalars(select(MaterialType.name)).all()
+
+    assert names == ["Фанера"]
+    assert list(timings) == ['material_types']
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith("Строка 3: ") for message in messages)
+    assert "Материал 'Фанера' уже существует, пропускаем" in messages
+    assert "Импортировано 1 типов материалов, пропущено: 1, ошибок: 1" in messages
+
+
+@pytest.mark.parametrize("argv", [
+    ["--stream", "--parallel"],
+    ["--incremental", "--parallel"],
+    ["--stream", "--incremental"],
+    ["--delete-missing"],
+])
+def test_import_modes_are_mutually_exclusive(import_data, argv):
+    with pytest.raises(SystemExit):
+        import_data.parse_args(argv)
+    
+    assert import_data.parse_args(["--incremental", "--delete-missing"]).delete_missing
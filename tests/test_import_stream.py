@@ -0,0 +1,65 @@
+"""
+Потоковый импорт: тот же результат, что у импорта через pandas
+"""
+from openpyxl import load_workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database.database import Base
+from app.services.production_time import find_inconsistent_production_times
+from benchmarks.scenarios import write_import_workbooks
+from tests.conftest import catalog_dump, use_workbooks
+
+
+def append_rows(path, rows):
+    workbook = load_workbook(path)
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+
+
+def import_into(path, stages):
+    """Выполнить этапы импорта в новой базе и вернуть ее содержимое"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for stage in stages:
+            stage(db)
+        dump = catalog_dump(db)
+        assert find_inconsistent_production_times(db) == []
+    engine.dispose()
+    return dump
+
+
+def test_stream_import_matches_pandas_import(import_data, tmp_path, monkeypatch):
+    files = write_import_workbooks(tmp_path, 40, 4, seed=11)
+    first_link = next(load_workbook(files["product_workshop"]).active.iter_rows(min_row=2, values_only=True))
+    append_rows(files["products"], [
+        ["Неизвестный тип", "Продукт с ошибкой", 2_000_001, 1500.0, "Фанера"],
+        ["Гостиные", "Продукт без материала", 2_000_002, 1500.0, "Неизвестный материал"],
+        ["Гостиные", "Продукт 1", 1_000_001, 1500.0, "Фанера"],
+    ])
+    append_rows(files["product_workshop"], [
+        [first_link[0], first_link[1], first_link[2] + 1],
+        ["Нет такого продукта", "Цех 1", 1.0],
+        ["Продукт 2", "Цех 999", 1.0],
+    ])
+    use_workbooks(monkeypatch, files)
+
+    pandas_dump = import_into(tmp_path / "pandas.db", [
+        import_data.import_material_types,
+        import_data.import_product_types,
+        import_data.import_workshops,
+        import_data.import_products,
+        import_data.import_product_workshop_links,
+    ])
+    stream_dump = import_into(tmp_path / "stream.db", [
+        lambda db: import_data.stream_import_material_types(db, 7),
+        lambda db: import_data.stream_import_product_types(db, 7),
+        lambda db: import_data.stream_import_workshops(db, 7),
+        lambda db: import_data.stream_import_products(db, 7),
+        lambda db: import_data.stream_import_product_workshop_links(db, 7),
+    ])
+
+    assert len(pandas_dump[0]) == 40 and len(pandas_dump[1]) == 120
+    assert stream_dump == pandas_dump
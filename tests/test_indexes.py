@@ -0,0 +1,138 @@
+"""
+Индексы горячих запросов и миграция существующей базы
+"""
+import logging
+import sqlite3
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, func, text
+from sqlalchemy.orm import Session
+
+from app import main
+from app.database.database import Product, product_workshop_table
+from app.database.migrations import migrate
+from app.database.session import get_db
+from app.main import app
+from app.services.production_time import _actual_totals_query
+from tests.conftest import seed_catalog
+
+
+def query_plan(db, statement) -> str:
+    """Текст EXPLAIN QUERY PLAN для запроса SQLAlchemy"""
+    compiled = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_production_time_sum_uses_link_index(db):
+    seed_catalog(db, products_count=3, workshops_count=2)
+    
+    plan = query_plan(db, select(func.sum(product_workshop_table.c.manufacturing_time_hours))
+                      .where(product_workshop_table.c.product_id == 1))
+    
+    assert "USING INDEX ux_product_workshop_product_workshop" in plan
+    
+    plan = query_plan(db, _actual_totals_query().where(Product.id.in_([1, 2])))
+    assert "ux_product_workshop_product_workshop" in plan
+
+
+def test_workshop_report_uses_covering_index(db):
+    seed_catalog(db, products_count=3, workshops_count=2)
+    
+    plan = query_plan(db, select(
+        product_workshop_table.c.product_id,
+        product_workshop_table.c.manufacturing_time_hours
+    ).where(product_workshop_table.c.workshop_id == 1))
+    
+    assert "USING COVERING INDEX ix_product_workshop_workshop_product_time" in plan
+
+
+def test_products_by_type_and_material_use_indexes(db):
+    seed_catalog(db, products_count=3, workshops_count=1)
+    
+    plan = query_plan(db, select(Product.id).where(Product.product_type_id == 1))
+    assert "ix_products_product_type_id" in plan
+    
+    plan = query_plan(db, select(Product.id).where(Product.material_id == 1))
+    assert "ix_products_material_id" in plan
+
+
+def create_old_database(path):
+    """База предыдущей версии: без индексов и без таблицы итогов, связь 1-1 продублирована"""
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE product_types (id INTEGER PRIMARY KEY, name VARCHAR(100) UNIQUE NOT NULL,
+                                    coefficient FLOAT NOT NULL);
+        CREATE TABLE material_types (id INTEGER PRIMARY KEY, name VARCHAR(100) UNIQUE NOT NULL,
+                                     loss_percentage FLOAT NOT NULL);
+        CREATE TABLE workshops (id INTEGER PRIMARY KEY, name VARCHAR(100) UNIQUE NOT NULL,
+                                workshop_type VARCHAR(50) NOT NULL, employee_count INTEGER NOT NULL);
+        CREATE TABLE products (id INTEGER PRIMARY KEY, article VARCHAR(50) NOT NULL,
+                               name VARCHAR(200) NOT NULL, product_type_id INTEGER NOT NULL,
+                               material_id INTEGER NOT NULL, min_partner_price FLOAT NOT NULL);
+        CREATE TABLE product_workshop (id INTEGER PRIMARY KEY, product_id INTEGER NOT NULL,
+                                       workshop_id INTEGER NOT NULL,
+                                       manufacturing_time_hours FLOAT NOT NULL);
+        INSERT INTO product_types VALUES (1, 'Гостиные', 3.5);
+        INSERT INTO material_types VALUES (1, 'Фанера', 0.55);
+        INSERT INTO workshops VALUES (1, 'Цех', 'Обработка', 3);
+        INSERT INTO products VALUES (1, '100', 'Стол', 1, 1, 10.0), (2, '200', 'Шкаф', 1, 1, 20.0);
+        INSERT INTO product_workshop VALUES (1, 1, 1, 2.0), (2, 1, 1, 5.0), (3, 2, 1, 4.0);
+    """)
+    connection.commit()
+    connection.close()
+
+
+def test_migrate_existing_database(tmp_path, caplog):
+    path = tmp_path / "old.db"
+    create_old_database(path)
+    
+    engine = create_engine(f"sqlite:///{path}")
+    with caplog.at_level(logging.WARNING, logger="app.database.migrations"):
+        report = migrate(engine)
+    
+    assert report["removed_duplicate_links"] == 1
+    # Удаленная строка записана в журнал
+    assert "Удаляется дубликат связи id=2: продукт 1, цех 1, время 5.0 ч" in caplog.messages
+    assert "ux_product_workshop_product_workshop" in report["created_indexes"]
+    assert "ix_products_product_type_id" in report["created_indexes"]
+    with Session(engine) as session:
+        hours = session.execute(text("SELECT total_hours FROM product_production_time")).scalars().all()
+        assert hours == [2.0, 4.0]
+    assert report["backfilled_production_times"] == 2
+    
+    # Повторный запуск ничего не меняет
+    assert migrate(engine) == {
+        "created_indexes": [], "removed_duplicate_links": 0, "backfilled_production_times": 0
+    }
+    engine.dispose()
+
+
+def test_startup_migrates_old_database(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    create_old_database(path)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(main, "MIGRATE_ON_STARTUP", True)
+    monkeypatch.setattr(main, "migrate", lambda: migrate(engine))
+    
+    def override_get_db():
+        with Session(engine) as session:
+            yield session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            # Таблица итогов создана и заполнена при старте
+            product = client.get("/api/products/2")
+            listing = client.get("/api/products/")
+            # ON CONFLICT по паре продукт-цех требует уникального индекса
+            response = client.post("/api/production/links/bulk", json={
+                "upsert": [{"product_id": 1, "workshop_id": 1, "manufacturing_time_hours": 3.0}]
+            })
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+    
+    assert response.status_code == 200
+    assert product.status_code == 200 and product.json()["production_time"] == 4
+    assert listing.status_code == 200
@@ -0,0 +1,75 @@
+"""
+Матрица потребности в сырье: совпадение с расчетом одной пары и обновление
+"""
+import pytest
+
+from app.database.database import MaterialType
+from app.services.material_matrix import MaterialMatrixService
+from app.services.raw_material_calculation import calculate_raw_material
+from tests.conftest import seed_catalog
+
+
+def test_matrix_matches_single_calculation(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    footprint = {"product_quantity": 7, "param1": 1.35, "param2": 0.6}
+    
+    data = client.post("/api/calculations/raw-material/matrix", json=footprint).json()
+    
+    assert [pt["name"] for pt in data["product_types"]] == ["Гостиные", "Прихожие"]
+    assert len(data["material_types"]) == 2
+    for row, pt in enumerate(data["product_types"]):
+        for column, mt in enumerate(data["material_types"]):
+            expected = calculate_raw_material(db, pt["id"], mt["id"], **footprint)
+            assert data["raw_material_quantity"][row][column] == expected
+            assert data["multipliers"][row][column] == pt["coefficient"] * (1 + mt["loss_percentage"] / 100)
+
+
+def test_matrix_is_rebuilt_after_catalog_change(db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    service = MaterialMatrixService()
+    
+    first = service.get(db)
+    assert service.get(db) is first
+    
+    db.add(MaterialType(name="Фанера", loss_percentage=0.55))
+    db.commit()
+    second = service.get(db)
+    
+    assert service.rebuilds == 2
+    assert second.multipliers.shape == (2, 3)
+
+
+def test_matrix_rejects_invalid_footprint(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    response = client.post(
+        "/api/calculations/raw-material/matrix",
+        json={"product_quantity": 0, "param1": 1.0, "param2": 1.0}
+    )
+    
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("footprint", [
+    {"product_quantity": 1, "param1": 1e300, "param2": 1e300},
+    {"product_quantity": 10 ** 9, "param1": 1e10, "param2": 1e10},
+    {"product_quantity": 10 ** 400, "param1": 1.0, "param2": 1.0},
+])
+def test_matrix_rejects_quantities_beyond_int64(client, db, footprint):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    response = client.post("/api/calculations/raw-material/matrix", json=footprint)
+    
+    assert response.status_code == 400
+
+
+def test_matrix_rejects_infinite_params(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    response = client.post(
+        "/api/calculations/raw-material/matrix",
+        content='{"product_quantity": 1, "param1": Infinity, "param2": 1.0}',
+        headers={"Content-Type": "application/json"}
+    )
+    
+    assert response.status_code == 400
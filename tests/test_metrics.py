@@ -0,0 +1,109 @@
+"""
+Метрики запросов: число SQL запросов, строки, формат Prometheus, отладочный заголовок
+"""
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.services.metrics import MetricsMiddleware, MetricsRegistry, metrics_registry
+from tests.conftest import seed_catalog
+
+
+def sample(body: str, name: str, **labels) -> float:
+    """Значение ряда с указанными метками из текста Prometheus"""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{name}\{{{re.escape(label_text)}\}} (\S+)$", body, re.MULTILINE)
+    assert match, f"{name}{{{label_text}}} нет в ответе"
+    return float(match.group(1))
+
+
+def test_metrics_per_route_template(client, db, query_counter):
+    products, _ = seed_catalog(db, products_count=5, workshops_count=2)
+    metrics_registry.reset()
+
+    query_counter.clear()
+    client.get("/api/products/")
+    list_queries = len(query_counter)
+    client.get(f"/api/products/{products[0].id}")
+    client.get(f"/api/products/{products[1].id}")
+
+    body = client.get("/api/metrics").text
+    route = {"method": "GET", "route": "/api/products/"}
+    detail = {"method": "GET", "route": "/api/products/{product_id}"}
+
+    assert sample(body, "http_requests_total", **route, status="200") == 1
+    assert sample(body, "db_queries_total", **route) == list_queries
+    assert sample(body, "db_rows_fetched_total", **route) >= 5
+    assert sample(body, "http_request_duration_seconds_count", **detail) == 2
+    assert sample(body, "db_queries_per_request_max", **detail) >= 1
+    assert "# TYPE http_request_duration_seconds summary" in body
+
+
+def test_metrics_count_async_queries_and_caches(client, db):
+    seed_catalog(db, products_count=3)
+    metrics_registry.reset()
+
+    client.get("/api/async/products/")
+    client.get("/api/catalog/product-types")
+    response = client.get("/api/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert sample(body, "db_queries_total", method="GET", route="/api/async/products/") >= 1
+    assert sample(body, "db_rows_fetched_total", method="GET", route="/api/async/products/") == 3
+    for cache in ("catalog", "responses", "pages"):
+        assert sample(body, "cache_hits_total", cache=cache) >= 0
+
+
+def test_unmatched_routes_share_one_label():
+    registry = MetricsRegistry()
+    app = FastAPI()
+    test_client = TestClient(MetricsMiddleware(app, registry=registry))
+
+    test_client.get("/missing/1")
+    test_client.get("/missing/2")
+
+    assert registry.snapshot()[("GET", "unmatched")].requests == 2
+
+
+def test_debug_header(engine):
+    registry = MetricsRegistry()
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1 UNION ALL SELECT 2")).fetchall()
+            connection.execute(text("SELECT 3")).fetchall()
+        return []
+
+    with TestClient(MetricsMiddleware(app, registry=registry, debug_header=True)) as test_client:
+        header = test_client.get("/items").headers["x-debug-metrics"]
+
+    assert header.startswith("queries=2; ")
+    assert "rows=3; " in header
+    assert re.search(r"db_ms=\d+\.\d{2}; .*total_ms=\d+\.\d{2}$", header)
+    assert registry.snapshot()[("GET", "/items")].queries == 2
+
+
+def test_failed_query_leaves_no_state_on_connection(engine):
+    registry = MetricsRegistry()
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        with engine.connect() as connection:
+            try:
+                connection.execute(text("SELECT * FROM missing_table"))
+            except Exception:
+                connection.rollback()
+            connection.execute(text("SELECT 1")).fetchall()
+            return sorted(connection.info)
+
+    with TestClient(MetricsMiddleware(app, registry=registry, debug_header=True)) as test_client:
+        response = test_client.get("/items")
+
+    assert response.json() == []
+    assert response.headers["x-debug-metrics"].startswith("queries=1; ")
@@ -0,0 +1,75 @@
+"""
+Кэш HTML страниц: повторный показ без запросов, сброс после записи, LRU
+"""
+from app.database.database import Product
+from app.services.page_cache import PageCache, page_cache
+from tests.conftest import seed_catalog
+
+
+def test_repeated_page_is_served_without_queries(client, db, query_counter):
+    _, workshops = seed_catalog(db, products_count=3, workshops_count=2)
+    paths = ["/products", "/workshops", f"/workshops/{workshops[0].id}"]
+    
+    first = [client.get(path).text for path in paths]
+    query_counter.clear()
+    second = [client.get(path).text for path in paths]
+    
+    assert query_counter == []
+    assert second == first
+
+
+def test_query_parameters_are_part_of_key(client, db):
+    seed_catalog(db, products_count=3, workshops_count=1)
+    
+    assert client.get("/products?limit=1").text.count("/products/edit/") == 1
+    assert client.get("/products?limit=2").text.count("/products/edit/") == 2
+
+
+def test_crud_write_invalidates_page(client, db):
+    seed_catalog(db, products_count=2, workshops_count=1)
+    assert "Новое имя" not in client.get("/products").text
+    
+    response = client.put("/api/products/1", json={"name": "Новое имя"})
+    assert response.status_code == 200
+    
+    assert "Новое имя" in client.get("/products").text
+
+
+def test_link_change_invalidates_workshop_page(client, db):
+    _, workshops = seed_catalog(db, products_count=2, workshops_count=1)
+    db.add(Product(article="9999", name="Без цеха", product_type_id=1,
+                   material_id=1, min_partner_price=10.0))
+    db.commit()
+    workshop_id = workshops[0].id
+    assert "Без цеха" not in client.get(f"/workshops/{workshop_id}").text
+    
+    client.post(f"/api/production/product/3/workshop/{workshop_id}?manufacturing_time_hours=1.5")
+    
+    assert "Без цеха" in client.get(f"/workshops/{workshop_id}").text
+
+
+def test_lru_eviction_and_stats(client, db):
+    seed_catalog(db, products_count=3, workshops_count=1)
+    original_size = page_cache.max_entries
+    page_cache.invalidate()
+    page_cache.max_entries = 2
+    try:
+        client.get("/products?limit=1")
+        client.get("/products?limit=2")
+        client.get("/products?limit=1")
+        client.get("/products?limit=3")
+        
+        assert page_cache.stats()["entries"] == 2
+        client.get("/products?limit=1")
+        client.get("/products?limit=2")
+    finally:
+        page_cache.max_entries = original_size
+    
+    stats = client.get("/api/catalog/cache-stats").json()["pages"]
+    assert stats["hits"] >= 2
+    assert stats["renders"] >= 4
+    assert stats["average_render_ms"] > 0
+
+
+def test_page_cache_stats_start_empty():
+    assert PageCache().stats()["hit_ratio"] == 0.0
@@ -0,0 +1,69 @@
+"""
+Курсорная пагинация списков
+"""
+import pytest
+
+from app.crud.pagination import MAX_PAGE_LIMIT, encode_cursor, decode_cursor
+from tests.conftest import seed_catalog
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("path", ["/api/products/", "/api/workshops/"])
+def test_cursor_pages_match_offset_pages(client, db, path):
+    seed_catalog(db, products_count=25, workshops_count=7)
+    
+    offset_ids = [item["id"] for item in client.get(f"{path}?limit=1000").json()]
+    
+    cursor_ids = []
+    cursor = None
+    while True:
+        url = f"{path}?limit=3" + (f"&after={cursor}" if cursor else "")
+        response = client.get(url)
+        cursor_ids.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    assert cursor_ids == offset_ids
+
+
+def test_invalid_cursor(client):
+    response = client.get("/api/catalog/product-types?after=not-a-cursor")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/api/products/", "/api/workshops/", "/api/async/products/"])
+@pytest.mark.parametrize("last_id", [10 ** 24, 2 ** 63, -1])
+def test_cursor_id_out_of_range_is_rejected(client, db, path, last_id):
+    seed_catalog(db, products_count=2, workshops_count=1)
+    
+    response = client.get(f"{path}?after={encode_cursor(last_id)}")
+    
+    assert response.status_code == 400
+    assert decode_cursor(encode_cursor(2 ** 63 - 1)) == 2 ** 63 - 1
+
+
+def test_products_page_next_link_uses_cursor(client, db):
+    products, _ = seed_catalog(db, products_count=4, workshops_count=1)
+    
+    page = client.get("/products?limit=2").text
+    assert f"after={encode_cursor(products[1].id)}" in page
+    
+    next_page = client.get(f"/products?page=2&limit=2&after={encode_cursor(products[1].id)}").text
+    assert products[2].name in next_page
+    assert products[1].name not in next_page
+
+
+@pytest.mark.parametrize("path", [
+    "/products", "/api/products/", "/api/workshops/", "/api/catalog/product-types",
+    "/api/async/products/",
+])
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_LIMIT + 1])
+def test_limit_out_of_range_is_rejected(client, db, path, limit):
+    seed_catalog(db, products_count=2, workshops_count=1)
+    
+    assert client.get(f"{path}?limit={limit}").status_code == 422
@@ -0,0 +1,66 @@
+"""
+Потоковая выгрузка каталога в CSV и NDJSON
+"""
+import csv
+import io
+import json
+
+from app.services.product_export import iter_record_batches
+from app.services.production_time import refresh_production_times
+from tests.conftest import seed_catalog
+
+
+def test_export_csv_matches_product_list(client, db):
+    seed_catalog(db, products_count=5, workshops_count=2)
+    listing = client.get("/api/products/").json()
+
+    response = client.get("/api/export/products.csv")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "products.csv" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert rows[0] == {
+        "id": str(listing[0]["id"]),
+        "article": "1000",
+        "product_name": "Продукт 0",
+        "product_type": "Гостиные",
+        "main_material": "Мебельный щит из массива дерева",
+        "min_partner_price": "1000.0",
+        "production_time": str(listing[0]["production_time"]),
+    }
+
+
+def test_export_ndjson_matches_product_list(client, db):
+    seed_catalog(db, products_count=3, workshops_count=3)
+    listing = client.get("/api/products/").json()
+
+    response = client.get("/api/export/products.ndjson")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["production_time"] for record in records] == \
+        [item["production_time"] for item in listing]
+    assert [record["product_name"] for record in records] == \
+        [item["product_name"] for item in listing]
+
+
+def test_export_is_one_query_in_batches(engine, db, query_counter):
+    seed_catalog(db, products_count=250, workshops_count=1)
+    refresh_production_times(db)
+    db.commit()
+
+    query_counter.clear()
+    batches = list(iter_record_batches(engine, batch_size=100))
+
+    assert [len(batch) for batch in batches] == [100, 100, 50]
+    assert [batch[0]["id"] for batch in batches] == [1, 101, 201]
+    assert len(query_counter) == 1
+
+
+def test_export_empty_catalog(client):
+    assert client.get("/api/export/products.csv").text.splitlines() == [
+        "id,article,product_name,product_type,main_material,min_partner_price,production_time"
+    ]
+    assert client.get("/api/export/products.ndjson").text == ""
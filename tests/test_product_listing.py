@@ -0,0 +1,42 @@
+"""
+Список продукции: один запрос на страницу независимо от limit
+"""
+import pytest
+
+from tests.conftest import seed_catalog
+
+
+def test_products_list_matches_detail(client, db):
+    seed_catalog(db, products_count=5, workshops_count=3)
+    
+    listing = client.get("/api/products/").json()
+    
+    assert len(listing) == 5
+    for item in listing:
+        detail = client.get(f"/api/products/{item['id']}").json()
+        assert item == detail
+    # 1.2 + 2.2 + 3.2 = 6.6 -> 7
+    assert listing[0]["production_time"] == 7
+
+
+def test_products_list_without_workshops(client, db):
+    products, _ = seed_catalog(db, products_count=2, workshops_count=0)
+    
+    listing = client.get("/api/products/").json()
+    
+    assert [item["production_time"] for item in listing] == [0, 0]
+
+
+@pytest.mark.parametrize("path", ["/api/products/?limit={limit}", "/products?limit={limit}"])
+def test_products_list_query_count_is_constant(client, db, query_counter, path):
+    seed_catalog(db, products_count=120, workshops_count=3)
+    
+    counts = []
+    for limit in (10, 50, 100):
+        query_counter.clear()
+        response = client.get(path.format(limit=limit))
+        assert response.status_code == 200
+        counts.append(len(query_counter))
+    
+    assert counts[0] == counts[1] == counts[2]
+    assert counts[0] <= 2
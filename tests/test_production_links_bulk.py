@@ -0,0 +1,121 @@
+"""
+Пакетное изменение связей продукт-цех
+"""
+from sqlalchemy import select
+
+from app.database.database import product_workshop_table, product_production_time_table
+from app.services.production_time import find_inconsistent_production_times, refresh_production_times
+from tests.conftest import seed_catalog
+
+
+def links(db):
+    table = product_workshop_table
+    return {
+        (row.product_id, row.workshop_id): row.manufacturing_time_hours
+        for row in db.execute(select(table.c.product_id, table.c.workshop_id,
+                                     table.c.manufacturing_time_hours))
+    }
+
+
+def stored_total(db, product_id):
+    table = product_production_time_table
+    return db.scalar(select(table.c.total_hours).where(table.c.product_id == product_id))
+
+
+def seed(db, **kwargs):
+    products, workshops = seed_catalog(db, **kwargs)
+    refresh_production_times(db)
+    db.commit()
+    return [p.id for p in products], [w.id for w in workshops]
+
+
+def test_bulk_links_upsert_and_delete(client, db):
+    product_ids, workshop_ids = seed(db, products_count=2, workshops_count=3)
+    p1, p2 = product_ids
+    w1, w2, w3 = workshop_ids
+    # Убираем связь, чтобы затем создать ее пакетом
+    client.delete(f"/api/production/product/{p2}/workshop/{w3}")
+
+    data = client.post("/api/production/links/bulk", json={
+        "delete": [{"product_id": p1, "workshop_id": w1}],
+        "upsert": [
+            {"product_id": p1, "workshop_id": w2, "manufacturing_time_hours": 10},
+            {"product_id": p2, "workshop_id": w3, "manufacturing_time_hours": 0.5},
+        ],
+    }).json()
+
+    assert data["applied"] is True
+    assert (data["deleted"], data["updated"], data["created"], data["errors"]) == (1, 1, 1, 0)
+    assert data["refreshed_products"] == 2
+    assert [r["status"] for r in data["results"]] == ["deleted", "updated", "created"]
+
+    db.expire_all()
+    current = links(db)
+    assert (p1, w1) not in current
+    assert current[(p1, w2)] == 10
+    assert current[(p2, w3)] == 0.5
+    # Сохраненные суммы совпадают со связями
+    assert stored_total(db, p1) == 10 + 3.2
+    assert stored_total(db, p2) == 1.2 + 2.2 + 0.5
+    assert find_inconsistent_production_times(db) == []
+
+
+def test_bulk_links_reports_errors(client, db):
+    product_ids, workshop_ids = seed(db, products_count=1, workshops_count=1)
+    p1, w1 = product_ids[0], workshop_ids[0]
+
+    data = client.post("/api/production/links/bulk", json={
+        "delete": [{"product_id": p1, "workshop_id": 999}],
+        "upsert": [
+            {"product_id": 999, "workshop_id": w1, "manufacturing_time_hours": 1},
+            {"product_id": p1, "workshop_id": 999, "manufacturing_time_hours": 1},
+            {"product_id": p1, "workshop_id": w1, "manufacturing_time_hours": 4},
+            {"product_id": p1, "workshop_id": w1, "manufacturing_time_hours": 5},
+        ],
+    }).json()
+
+    assert data["applied"] is True and data["updated"] == 1 and data["errors"] == 4
+    assert [r["error"] for r in data["results"]] == [
+        "Связь продукт-цех не найдена",
+        "Продукт не найден",
+        "Цех не найден",
+        None,
+        "Связь уже указана в этом запросе",
+    ]
+    db.expire_all()
+    assert links(db) == {(p1, w1): 4}
+
+
+def test_bulk_links_all_or_nothing(client, db):
+    product_ids, workshop_ids = seed(db, products_count=1, workshops_count=2)
+    before = links(db)
+
+    data = client.post("/api/production/links/bulk", json={
+        "delete": [{"product_id": product_ids[0], "workshop_id": workshop_ids[0]}],
+        "upsert": [{"product_id": 999, "workshop_id": workshop_ids[1], "manufacturing_time_hours": 1}],
+        "all_or_nothing": True,
+    }).json()
+
+    assert data["applied"] is False
+    assert [r["status"] for r in data["results"]] == ["skipped", "error"]
+    db.expire_all()
+    assert links(db) == before
+
+
+def test_bulk_links_query_count_is_constant(client, db, query_counter):
+    product_ids, workshop_ids = seed(db, products_count=300, workshops_count=2)
+
+    query_counter.clear()
+    data = client.post("/api/production/links/bulk", json={
+        "delete": [{"product_id": p, "workshop_id": workshop_ids[0]} for p in product_ids[:100]],
+        "upsert": [
+            {"product_id": p, "workshop_id": workshop_ids[1], "manufacturing_time_hours": 7}
+            for p in product_ids
+        ],
+    }).json()
+
+    assert (data["deleted"], data["updated"]) == (100, 300)
+    # Проверки, executemany удаления и вставки, пересчет времени
+    assert len(query_counter) <= 12
+    db.expire_all()
+    assert find_inconsistent_production_times(db) == []
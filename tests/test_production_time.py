@@ -0,0 +1,90 @@
+"""
+Сохраненное время изготовления продукции
+"""
+import pytest
+
+from app.services.production_time import (
+    calculate_total_production_time,
+    find_inconsistent_production_times,
+    refresh_production_times
+)
+from app.database.database import product_workshop_table
+from tests.conftest import seed_catalog
+
+
+def test_links_keep_stored_total_in_sync(client, db):
+    products, workshops = seed_catalog(db, products_count=2, workshops_count=2)
+    refresh_production_times(db)
+    db.commit()
+    product_id = products[0].id
+    
+    # 1.2 + 2.2 = 3.4 -> 3
+    assert client.get(f"/api/products/{product_id}").json()["production_time"] == 3
+    
+    client.delete(f"/api/production/product/{product_id}/workshop/{workshops[0].id}")
+    assert client.get(f"/api/products/{product_id}").json()["production_time"] == 2
+    
+    client.post(
+        f"/api/production/product/{product_id}/workshop/{workshops[0].id}",
+        params={"manufacturing_time_hours": 5.0}
+    )
+    assert client.get(f"/api/products/{product_id}").json()["production_time"] == 7
+    
+    db.expire_all()
+    assert find_inconsistent_production_times(db) == []
+
+
+def test_rebuild_fixes_stale_totals(db):
+    products, _ = seed_catalog(db, products_count=3, workshops_count=2)
+    
+    # До пересчета записей нет - время считается по связям
+    assert len(find_inconsistent_production_times(db)) == 3
+    assert calculate_total_production_time(db, products[0].id) == 3
+    
+    refresh_production_times(db)
+    db.execute(product_workshop_table.delete().where(
+        product_workshop_table.c.product_id == products[1].id
+    ))
+    db.commit()
+    
+    assert [row[0] for row in find_inconsistent_production_times(db)] == [products[1].id]
+    
+    refresh_production_times(db, [products[1].id])
+    db.commit()
+    assert find_inconsistent_production_times(db) == []
+    assert calculate_total_production_time(db, products[1].id) == 0
+
+
+def test_batch_production_time_matches_single(client, db, query_counter):
+    products, workshops = seed_catalog(db, products_count=30, workshops_count=3)
+    db.execute(product_workshop_table.delete().where(
+        product_workshop_table.c.product_id == products[0].id
+    ))
+    db.commit()
+    ids = [p.id for p in products] + [999999]
+    
+    query_counter.clear()
+    response = client.post("/api/calculations/production-time/batch", json={"product_ids": ids})
+    batch_queries = len(query_counter)
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["not_found"] == [999999]
+    assert [item["product_id"] for item in body["items"]] == ids[:-1]
+    assert batch_queries == 1
+    
+    for item in body["items"]:
+        assert item["production_time"] == calculate_total_production_time(db, item["product_id"])
+
+
+@pytest.mark.parametrize("path", [
+    "/api/calculations/production-time/batch",
+    "/api/async/calculations/production-time/batch",
+])
+@pytest.mark.parametrize("product_id", [10 ** 20, 2 ** 63, 0])
+def test_batch_production_time_rejects_ids_out_of_range(client, db, path, product_id):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    
+    response = client.post(path, json={"product_ids": [1, product_id]})
+    
+    assert response.status_code == 422
@@ -0,0 +1,123 @@
+"""
+Пакетное создание, изменение и удаление продукции
+"""
+from sqlalchemy import func, select
+
+from app.database.database import Product, product_workshop_table
+from tests.conftest import seed_catalog
+
+
+def new_product(article: str, product_type_id: int = 1, material_id: int = 1) -> dict:
+    return {
+        "article": article,
+        "name": f"Новый продукт {article}",
+        "product_type_id": product_type_id,
+        "material_id": material_id,
+        "min_partner_price": 1500.555,
+    }
+
+
+def test_bulk_mixed_operations(client, db):
+    products, _ = seed_catalog(db, products_count=4)
+    ids = [product.id for product in products]
+
+    response = client.post("/api/products/bulk", json={
+        "delete": [ids[0]],
+        # Артикул удаляемого продукта можно занять в том же запросе
+        "update": [{"id": ids[1], "article": "1000", "min_partner_price": 2000}],
+        "create": [new_product("1001"), new_product("2000", product_type_id=2)],
+    })
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["applied"] is True
+    assert (data["deleted"], data["updated"], data["created"], data["errors"]) == (1, 1, 2, 0)
+    assert [(r["operation"], r["index"], r["status"]) for r in data["results"]] == [
+        ("delete", 0, "deleted"),
+        ("update", 0, "updated"),
+        ("create", 0, "created"),
+        ("create", 1, "created"),
+    ]
+
+    db.expire_all()
+    assert db.get(Product, ids[0]) is None
+    assert db.scalar(select(func.count()).select_from(product_workshop_table)
+                     .where(product_workshop_table.c.product_id == ids[0])) == 0
+    updated = db.get(Product, ids[1])
+    assert (updated.article, updated.min_partner_price, updated.name) == ("1000", 2000, "Продукт 1")
+
+    created = db.get(Product, data["results"][3]["id"])
+    assert (created.article, created.product_type_id, created.min_partner_price) == ("2000", 2, 1500.56)
+
+
+def test_bulk_reports_item_errors(client, db):
+    products, _ = seed_catalog(db, products_count=2)
+
+    data = client.post("/api/products/bulk", json={
+        "delete": [999],
+        "update": [{"id": products[0].id, "material_id": 99}],
+        "create": [
+            new_product("1001"),
+            new_product("3000", product_type_id=42),
+            new_product("3001"),
+            new_product("3001"),
+        ],
+    }).json()
+
+    assert data["applied"] is True
+    assert data["created"] == 1 and data["errors"] == 5
+    assert [(r["operation"], r["index"], r["status"], r["error"]) for r in data["results"]] == [
+        ("delete", 0, "error", "Продукт не найден"),
+        ("update", 0, "error", "Материал не найден"),
+        ("create", 0, "error", "Продукт с таким артикулом уже существует"),
+        ("create", 1, "error", "Тип продукции не найден"),
+        ("create", 2, "created", None),
+        ("create", 3, "error", "Продукт с таким артикулом уже существует"),
+    ]
+
+
+def test_bulk_all_or_nothing_applies_nothing(client, db):
+    products, _ = seed_catalog(db, products_count=2)
+
+    data = client.post("/api/products/bulk", json={
+        "delete": [products[0].id],
+        "create": [new_product("4000"), new_product("1001")],
+        "all_or_nothing": True,
+    }).json()
+
+    assert data["applied"] is False
+    assert (data["deleted"], data["created"], data["errors"]) == (0, 0, 1)
+    assert [r["status"] for r in data["results"]] == ["skipped", "skipped", "error"]
+    assert db.scalar(select(func.count()).select_from(Product)) == 2
+
+
+def test_bulk_query_count_is_constant(client, db, query_counter):
+    products, _ = seed_catalog(db, products_count=300, workshops_count=1)
+    ids = [product.id for product in products]
+    client.get("/api/catalog/product-types")   # прогрев кэша справочников
+
+    query_counter.clear()
+    data = client.post("/api/products/bulk", json={
+        "delete": ids[:100],
+        "update": [{"id": product_id, "min_partner_price": 10} for product_id in ids[100:300]],
+        "create": [new_product(str(5000 + i)) for i in range(300)],
+    }).json()
+
+    assert (data["deleted"], data["updated"], data["created"]) == (100, 200, 300)
+    # Предзагрузка ID и артикулов, 3 удаления, executemany изменений и вставок
+    # (не зависит от числа элементов в пределах пачки)
+    assert len(query_counter) <= 12
+    assert db.scalar(select(func.count()).select_from(Product)) == 500
+
+
+def test_bulk_invalidates_products_list(client, db):
+    products, _ = seed_catalog(db, products_count=1)
+    assert len(client.get("/api/products/").json()) == 1
+
+    client.post("/api/products/bulk", json={
+        "update": [{"id": products[0].id, "name": "Переименованный"}],
+        "create": [new_product("6000")],
+    })
+
+    listing = client.get("/api/products/").json()
+    assert [item["product_name"] for item in listing] == ["Переименованный", "Новый продукт 6000"]
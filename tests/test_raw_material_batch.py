@@ -0,0 +1,155 @@
+"""
+Пакетный расчет сырья
+"""
+import json
+
+from app.services.raw_material_calculation import calculate_raw_material
+from tests.conftest import seed_catalog
+
+
+def _rows(db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    return [
+        # type, material, quantity, param1, param2
+        (1, 1, 10, 2.5, 1.8),
+        (2, 2, 3, 0.7, 1.35),
+        (2, 1, 1, 1.1, 2.2),
+        (99, 1, 10, 2.5, 1.8),
+        (1, 99, 10, 2.5, 1.8),
+        (1, 1, 0, 2.5, 1.8),
+        (1, 1, 10, -2.5, 1.8),
+    ]
+
+
+def test_batch_matches_single_calculation(client, db):
+    rows = _rows(db)
+    payload = {
+        "product_type_id": [r[0] for r in rows],
+        "material_type_id": [r[1] for r in rows],
+        "product_quantity": [r[2] for r in rows],
+        "param1": [r[3] for r in rows],
+        "param2": [r[4] for r in rows],
+    }
+    
+    body = client.post("/api/calculations/raw-material/batch", json=payload).json()
+    
+    expected = [calculate_raw_material(db, *row) for row in rows]
+    assert body["raw_material_quantity"][:3] == expected[:3]
+    assert body["raw_material_quantity"][0] == 159
+    assert body["errors"] == [
+        None, None, None,
+        "PRODUCT_TYPE_NOT_FOUND",
+        "MATERIAL_TYPE_NOT_FOUND",
+        "INVALID_QUANTITY",
+        "INVALID_PARAMS",
+    ]
+    assert all(value == -1 for value in expected[3:])
+    assert body["error_rows"] == 4
+
+
+def test_batch_ndjson(client, db):
+    rows = _rows(db)[:2]
+    lines = [
+        json.dumps(dict(zip(
+            ["product_type_id", "material_type_id", "product_quantity", "param1", "param2"], row
+        )))
+        for row in rows
+    ]
+    lines.insert(1, "{not json")
+    
+    response = client.post(
+        "/api/calculations/raw-material/batch",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    body = response.json()
+    assert body["raw_material_quantity"] == [159, None, calculate_raw_material(db, *rows[1])]
+    assert body["errors"] == [None, "INVALID_ROW", None]
+
+
+def test_batch_rejects_columns_of_different_length(client, db):
+    payload = {
+        "product_type_id": [1, 2],
+        "material_type_id": [1],
+        "product_quantity": [1, 1],
+        "param1": [1.0, 1.0],
+        "param2": [1.0, 1.0],
+    }
+    
+    response = client.post("/api/calculations/raw-material/batch", json=payload)
+    assert response.status_code == 422
+
+
+def test_batch_ndjson_rejects_invalid_utf8(client):
+    response = client.post(
+        "/api/calculations/raw-material/batch",
+        content=b'{"product_type_id": 1}\n\xff\xfe',
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+
+
+def test_batch_ids_out_of_int64_range_are_not_found(client, db):
+    row = _rows(db)[0]
+    payload = {
+        "product_type_id": [2 ** 70, row[0]],
+        "material_type_id": [row[1], 2 ** 70],
+        "product_quantity": [1, 10 ** 400],
+        "param1": [1.0, 1.0],
+        "param2": [1.0, 1.0],
+    }
+    
+    response = client.post("/api/calculations/raw-material/batch", json=payload)
+    
+    assert response.status_code == 200
+    assert response.json()["errors"] == ["PRODUCT_TYPE_NOT_FOUND", "MATERIAL_TYPE_NOT_FOUND"]
+
+
+def test_batch_rounds_params_like_single_request(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    rows = [(1, 1, 1000, 1.00004, 1.0), (1, 1, 1000, 2.50004, 1.0), (2, 2, 7, 0.123456, 3.999951)]
+    payload = {
+        name: [row[position] for row in rows]
+        for position, name in enumerate(
+            ["product_type_id", "material_type_id", "product_quantity", "param1", "param2"]
+        )
+    }
+    
+    body = client.post("/api/calculations/raw-material/batch", json=payload).json()
+    
+    single = [
+        client.post("/api/calculations/raw-material", json=dict(zip(payload, row))).json()
+        for row in rows
+    ]
+    assert body["raw_material_quantity"] == [item["raw_material_quantity"] for item in single]
+    # Без округления параметров первая строка дала бы на единицу больше
+    assert calculate_raw_material(db, *rows[0]) == body["raw_material_quantity"][0] + 1
+
+
+def test_batch_rejects_truncated_json(client, db):
+    response = client.post(
+        "/api/calculations/raw-material/batch",
+        content=b'{"product_type_id": [1], "material_type_id": [1',
+        headers={"Content-Type": "application/json"}
+    )
+    
+    assert response.status_code == 422
+    assert all("input" not in error for error in response.json()["detail"])
+
+
+def test_batch_ndjson_marks_overflowing_numbers_invalid(client, db):
+    seed_catalog(db, products_count=1, workshops_count=1)
+    lines = [
+        '{"product_type_id":1,"material_type_id":1,"product_quantity":1e400,"param1":1,"param2":1}',
+        '{"product_type_id":1,"material_type_id":1,"product_quantity":1,"param1":1,"param2":1}',
+    ]
+    
+    response = client.post(
+        "/api/calculations/raw-material/batch",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["errors"] == ["INVALID_ROW", None]
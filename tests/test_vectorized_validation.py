@@ -0,0 +1,148 @@
+"""
+Векторная проверка столбцов: тот же результат, что у построчной
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import EXCEL_FILES
+from app.database.database import MaterialType
+
+
+CELLS = [
+    None, np.nan, "", "   ", "abc", " 42 ", "1 000", "12,5", "1_000", "0,8%", "80%", "-5",
+    "nan", "inf", float("inf"), 2 ** 70, True, 3, -3, 0, 3.7, "3.7", "x" * 120,
+    # Значения у границы округления: Decimal(str(value)) против двоичного
+    0.125, 2.675, 1.005, 0.005, -0.004, 0.0055, 0.008, 0.00999, 100.00001, 1e20,
+    pd.Timestamp("2024-01-01"),
+]
+
+CHECKS = [
+    ("string", {"max_length": 100}),
+    ("integer", {"min_value": 1}),
+    ("integer", {"min_value": 0, "max_value": 1000}),
+    ("float", {"precision": 2}),
+    ("float", {"min_value": 0, "max_value": 500, "precision": 1}),
+    ("percentage", {}),
+    ("positive_float", {"precision": 2}),
+    ("positive_integer", {}),
+]
+
+
+def scalar_result(validate, value):
+    try:
+        return validate(value), None
+    except ValueError as e:
+        return None, str(e)
+    except Exception as e:
+        return None, f"Неожиданная ошибка: {e}"
+
+
+@pytest.mark.parametrize("check,options", CHECKS)
+@pytest.mark.parametrize("column", [
+    pd.Series(CELLS, dtype=object),
+    pd.Series([0.125, 2.675, -1.5, np.nan, 1234.565, 0.004, 250.0]),
+    pd.Series([5, -2, 0, 1_000_000]),
+], ids=["object", "float64", "int64"])
+def test_column_validators_match_cell_validators(import_data, check, options, column):
+    validator = import_data.DataTypeValidator
+    result = getattr(validator, f"validate_{check}_column")(column, "Поле", **options)
+
+    assert list(result.index) == list(column.index)
+    for position, cell in enumerate(column.tolist()):
+        expected_value, expected_error = scalar_result(
+            lambda value: getattr(validator, f"validate_{check}")(value, "Поле", **options), cell
+        )
+        value, error = result["value"].iloc[position], result["error"].iloc[position]
+        assert error == expected_error, cell
+        if expected_error is None:
+            assert value == expected_value or (value != value and expected_value != expected_value)
+            assert type(value) is type(expected_value) or isinstance(value, float)
+
+
+def test_rounding_matches_decimal_on_random_values(import_data):
+    rng = np.random.default_rng(7)
+    column = pd.Series([
+        round(value, digits)
+        for value, digits in zip(rng.uniform(-1000, 300_000, 20_000), rng.integers(0, 5, 20_000))
+    ])
+    validator = import_data.DataTypeValidator
+
+    result = validator.validate_float_column(column, "Цена", precision=2)
+
+    expected = [validator.validate_float(value, "Цена", precision=2) for value in column]
+    assert result["error"].isna().all()
+    assert result["value"].tolist() == expected
+
+
+def test_validate_frame_matches_parse_row(import_data):
+    df = pd.DataFrame({
+        "Основной материал": ["МДФ", None, "Фанера", "МДФ", "МДФ"],
+        "Тип продукции": ["Шкафы", "Шкафы", "", "Кровати", "Шкафы"],
+        "Наименование продукции": ["Шкаф", "Стол", "Кровать", "Комод", "Полка"],
+        "Артикул": [1001, 1002, 1003, "абв", 1005.0],
+        "Минимальная стоимость для партнера": [100.5, 200, 300, 400, -1],
+    })
+
+    records, errors = import_data.validate_frame(df, import_data.PRODUCT_RULES)
+
+    expected_errors = []
+    for idx, row in df.iterrows():
+        try:
+            data = import_data.parse_row(row, import_data.PRODUCT_RULES)
+        except ValueError as e:
+            expected_errors.append((idx + 2, str(e)))
+        else:
+            assert records.loc[idx].to_dict() == data
+    assert list(zip(errors["row"], errors["error"])) == expected_errors
+    assert [row for row, _ in expected_errors] == [3, 4, 5, 6]
+    assert list(records.index) == [0]
+
+
+def test_validate_frame_reports_missing_column(import_data):
+    df = pd.DataFrame({"Тип материала": ["Фанера", "МДФ"]})
+
+    records, errors = import_data.validate_frame(df, import_data.MATERIAL_TYPE_RULES)
+
+    assert records.empty
+    assert errors["row"].tolist() == [2, 3]
+    assert set(errors["error"]) == {"Отсутствует столбец: 'Процент потерь сырья'"}
+
+
+def test_import_logs_same_row_errors(import_data, tmp_path, monkeypatch, engine, caplog):
+    path = tmp_path / "materials.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Тип материала", "Процент потерь сырья"])
+    sheet.append(["Фанера", 0.0055])
+    sheet.append(["МДФ", "много"])
+    sheet.append([None, 0.003])
+    sheet.append(["ДСП", "0,70%"])
+    workbook.save(path)
+    monkeypatch.setitem(EXCEL_FILES, "material_types", path)
+
+    with caplog.at_level(logging.INFO, logger=import_data.logger.name), Session(engine) as db:
+        import_data.import_material_types(db)
+        materials = dict(db.execute(select(MaterialType.name, MaterialType.loss_percentage)).all())
+
+    assert materials == {"Фанера": 0.55, "ДСП": 0.7}
+    messages = [record.getMessage() for record in caplog.records]
+    assert "Строка 3: Поле 'Процент потерь сырья': не удалось преобразовать 'много' в число" in messages
+    assert "Строка 4: Поле 'Тип материала' не может быть пустым" in messages
+    assert "Импортировано 2 типов материалов, ошибок: 2" in messages
+
+
+def test_import_validator_converts_percentages_like_import():
+    from app.scripts.validate_import import ImportValidator
+
+    validator = ImportValidator()
+    cells = [0.008, "0,80%", "2%", None, "abc", 5, 0.5]
+
+    converted = validator._convert_percentages_like_import(pd.Series(cells))
+
+    assert converted.tolist() == [validator._convert_percentage_like_import(cell) for cell in cells]
@@ -0,0 +1,30 @@
+"""
+Продукты цеха: один запрос на список независимо от числа продуктов
+"""
+from tests.conftest import seed_catalog
+
+
+def test_workshop_products_contents(client, db):
+    _, workshops = seed_catalog(db, products_count=4, workshops_count=2)
+    
+    data = client.get(f"/api/workshops/{workshops[1].id}/products").json()
+    
+    assert data["workshop_name"] == workshops[1].name
+    assert [item["article"] for item in data["products"]] == ["1000", "1001", "1002", "1003"]
+    first = data["products"][0]
+    assert first["product_type_name"] == "Гостиные"
+    assert first["material_name"] == "Мебельный щит из массива дерева"
+    assert first["manufacturing_time_hours"] == 2.2
+
+
+def test_workshop_products_query_count_is_constant(client, db, query_counter):
+    _, workshops = seed_catalog(db, products_count=200, workshops_count=2)
+    workshop_id = workshops[0].id
+    
+    query_counter.clear()
+    response = client.get(f"/api/workshops/{workshop_id}/products")
+    assert response.status_code == 200
+    assert len(response.json()["products"]) == 200
+    
+    # Цех и список продуктов
+    assert len(query_counter) == 2
@@ -0,0 +1,55 @@
+"""
+Отчет о производстве в цехах: агрегаты в SQL
+"""
+from app.database.database import Workshop
+from tests.conftest import seed_catalog
+
+
+def test_single_workshop_report(client, db, query_counter):
+    _, workshops = seed_catalog(db, products_count=5, workshops_count=2)
+    workshop_id = workshops[1].id
+    
+    query_counter.clear()
+    report = client.get(f"/api/workshops/{workshop_id}/production-report").json()
+    # Цех, агрегаты, список продуктов
+    assert len(query_counter) == 3
+    
+    data = report["production_data"]
+    assert report["workshop"]["name"] == "Цех 1"
+    assert data["total_products"] == 5
+    assert data["total_manufacturing_hours"] == 11.0
+    assert data["average_hours_per_product"] == 2.2
+    assert data["by_product_type"] == [
+        {"name": "Гостиные", "products": 3, "total_hours": 6.6, "average_hours": 2.2},
+        {"name": "Прихожие", "products": 2, "total_hours": 4.4, "average_hours": 2.2},
+    ]
+    assert [group["products"] for group in data["by_material"]] == [2, 3]
+    assert len(data["products"]) == 5
+    assert data["products"][0]["product_type"] == "Гостиные"
+
+
+def test_all_workshops_report(client, db, query_counter):
+    seed_catalog(db, products_count=4, workshops_count=3)
+    db.add(Workshop(name="Пустой цех", workshop_type="Сборка", employee_count=2))
+    db.commit()
+    
+    query_counter.clear()
+    report = client.get("/api/workshops/reports/production").json()
+    # Цехи и агрегаты
+    assert len(query_counter) == 2
+    
+    assert report["total_workshops"] == 4
+    totals = [w["production_data"]["total_manufacturing_hours"] for w in report["workshops"]]
+    assert totals == [4.8, 8.8, 12.8, 0.0]
+    assert report["total_manufacturing_hours"] == 26.4
+    assert report["workshops"][3]["production_data"]["by_material"] == []
+
+
+def test_workshop_detail_page_shows_products(client, db):
+    _, workshops = seed_catalog(db, products_count=2, workshops_count=1)
+    
+    page = client.get(f"/workshops/{workshops[0].id}")
+    
+    assert page.status_code == 200
+    assert "Продукт 1" in page.text
+    assert "По типам продукции" in page.text